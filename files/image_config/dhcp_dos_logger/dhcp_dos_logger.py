@@ -19,6 +19,8 @@ is_multi_asic = multi_asic.is_multi_asic()
 if is_multi_asic:
     SonicDBConfig.initializeGlobalConfig()
     ports_table = multi_asic.get_table('PORT')
+    # Ports are looked up on every poll, keep an index instead of reading PORT tables
+    multi_asic.enable_port_namespace_index()
 else:
     config_db = ConfigDBConnector()
     config_db.connect()
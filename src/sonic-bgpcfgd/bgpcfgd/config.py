@@ -1,32 +1,169 @@
+import hashlib
+import re
+import time
+
+from .log import log_info
+
+
+class ConfigIndex(object):
+    """ Lookup tables built from one pass over FRR running configuration """
+    RE_PEER_GROUP = re.compile(r'^\s*neighbor\s+(\S+)\s+peer-group\s*$')
+    RE_NEIGHBOR_RM_IN = re.compile(r'^\s*neighbor (\S+) route-map (\S+) in$')
+    RE_ROUTE_MAP_ENTRY = re.compile(r'^route-map (\S+) (permit|deny) \d+$')
+    RE_CALL = re.compile(r'^\s*call (\S+)$')
+    RE_PREFIX_LIST = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq \d+ (.*)$')
+    RE_COMMUNITY = re.compile(r'^bgp community-list standard (\S+) permit (.*)$')
+
+    def __init__(self, lines):
+        """
+        Constructor
+        :param lines: FRR running configuration as a list of lines
+        """
+        self.peer_groups = set()
+        self.route_maps = set()        # names of all route-maps
+        self.neighbor_rm_in = {}       # neighbor or peer-group -> inbound route-map
+        self.route_map_calls = {}      # route-map -> name of the called route-map
+        self.prefix_lists = {}         # (family, name) -> list of rules
+        self.communities = {}          # community-list name -> value
+        self.__parse(lines)
+
+    def __parse(self, lines):
+        """
+        Parse running configuration into the lookup tables
+        :param lines: FRR running configuration as a list of lines
+        """
+        inside_name = None
+        for line in lines:
+            s_line = line.strip()
+            if inside_name:
+                result = self.RE_CALL.match(line)
+                if result:
+                    self.route_map_calls[inside_name] = result.group(1)
+                    inside_name = None
+                    continue
+            result = self.RE_ROUTE_MAP_ENTRY.match(line)
+            if result:
+                self.route_maps.add(result.group(1))
+                if result.group(2) == 'permit':
+                    inside_name = result.group(1)
+                continue
+            result = self.RE_PEER_GROUP.match(line)
+            if result:
+                self.peer_groups.add(result.group(1))
+                continue
+            result = self.RE_NEIGHBOR_RM_IN.match(line)
+            if result:
+                self.neighbor_rm_in.setdefault(result.group(1), result.group(2))
+                continue
+            result = self.RE_PREFIX_LIST.match(s_line)
+            if result:
+                self.prefix_lists.setdefault((result.group(1), result.group(2)), []).append(result.group(3))
+                continue
+            result = self.RE_COMMUNITY.match(s_line)
+            if result:
+                self.communities.setdefault(result.group(1), result.group(2))
+
+    def get_peer_groups(self):
+        """ Return a set of configured peer-group names """
+        return self.peer_groups
+
+    def get_peer_group_to_route_map(self, peer_groups):
+        """
+        Get inbound route-maps of the peer-groups
+        :param peer_groups: a list of peer-group names
+        :return: a dictionary: key - peer-group name, value - name of the inbound route-map
+        """
+        return {pg: self.neighbor_rm_in[pg] for pg in peer_groups if pg in self.neighbor_rm_in}
+
+    def get_route_map_calls(self, rms):
+        """
+        Get route-map call names for the route-maps
+        :param rms: a set with route-map names
+        :return: a dictionary: key - route-map name, value - name of a route-map call defined for the route-map
+        """
+        return {rm: self.route_map_calls[rm] for rm in rms if rm in self.route_map_calls}
+
+    def get_prefix_list(self, family, name):
+        """
+        Get rules of the prefix-list
+        :param family: 'ip' or 'ipv6'
+        :param name: name of the prefix-list
+        :return: a list of the prefix-list rules without sequence numbers. None if the prefix-list doesn't exist
+        """
+        return self.prefix_lists.get((family, name))
+
+    def get_community(self, name):
+        """
+        Get value of the standard community-list
+        :param name: name of the community-list
+        :return: the community value. None if the community-list doesn't exist
+        """
+        return self.communities.get(name)
+
+
 class ConfigMgr(object):
     """ The class represents frr configuration """
+    # Seconds after which push_entity() reads FRR config to check that a skipped entity is still there
+    ENTITY_VERIFY_INTERVAL = 60
+
     def __init__(self, frr):
         self.frr = frr
         self.current_config = None
         self.current_config_raw = None
+        self.current_config_hash = None
+        self.current_index = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.pushed_entities = {}   # entity -> the last text committed to FRR
+        self.pushed_entity_refs = {}  # entity -> (peer-groups, route-maps) defined by its committed text
+        self.pending_entities = {}  # entity -> text scheduled for the next commit
+        self.verified_config_hash = None  # hash of the last config the pushed entities were checked against
+        self.verified_time = time.monotonic()  # time of the last check of the pushed entities
+        self.parsed_config = None   # (hash, raw, canonical, index) of the last parsed config
 
     def reset(self):
         """ Reset stored config """
-        self.current_config = None
-        self.current_config_raw = None
+        self.invalidate()
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.pending_entities = {}
 
-    def update(self):
-        """ Read current config from FRR """
+    def invalidate(self):
+        """ Drop stored config, so the next update() reads it from FRR again """
+        if self.current_config is not None:
+            self.parsed_config = (self.current_config_hash, self.current_config_raw, self.current_config,
+                                  self.current_index)
         self.current_config = None
         self.current_config_raw = None
+        self.current_config_hash = None
+        self.current_index = None
+
+    def update(self):
+        """
+        Read current config from FRR. The stored config is used until commit() drops it at the end of every Runner
+        event or batch. The config is parsed again only when its text was changed
+        """
+        if self.current_config is not None:
+            return
         out = self.frr.get_config()
-        text = []
-        for line in out.split('\n'):
-            if line.lstrip().startswith('!'):
-                continue
-            text.append(line)
-        text += ["     "]  # Add empty line to have something to work on, if there is no text
-        self.current_config_raw = text
-        self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        config_hash = hashlib.sha1(out.encode('utf-8')).hexdigest()
+        if self.parsed_config is not None and self.parsed_config[0] == config_hash:
+            _, self.current_config_raw, self.current_config, self.current_index = self.parsed_config
+        else:
+            text = []
+            for line in out.split('\n'):
+                if line.lstrip().startswith('!'):
+                    continue
+                text.append(line)
+            text += ["     "]  # Add empty line to have something to work on, if there is no text
+            self.current_index = None
+            self.current_config_raw = text
+            self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        self.current_config_hash = config_hash
+        if self.pushed_entities and self.current_config_hash != self.verified_config_hash:
+            self.forget_missing_entities()
+            self.verified_config_hash = self.current_config_hash
+        self.verified_time = time.monotonic()
 
     def push_list(self, cmdlist):
         """
@@ -43,6 +180,45 @@ class ConfigMgr(object):
         self.changes += cmd + "\n"
         return True
 
+    def push_entity(self, entity, cmd):
+        """
+        Prepare changes of an entity for FRR. The changes are skipped if the same text
+        was already committed for the entity
+        :param entity: hashable name of the entity, the text belongs to
+        :param cmd: configuration of the entity. Type: String
+        :return: True if the text was scheduled, False if it was skipped
+        """
+        if entity not in self.pending_entities and self.pushed_entities.get(entity) == cmd and \
+           time.monotonic() - self.verified_time >= self.ENTITY_VERIFY_INTERVAL:
+            # Check from time to time that the skipped text was not removed from FRR outside of bgpcfgd
+            self.invalidate()
+            self.update()
+        if self.pending_entities.get(entity, self.pushed_entities.get(entity)) == cmd:
+            return False
+        self.pending_entities[entity] = cmd
+        return self.push(cmd)
+
+    def forget_entity(self, entity):
+        """
+        Forget the last committed text of the entity, so the next push_entity() is never skipped
+        :param entity: name of the entity
+        """
+        self.pushed_entities.pop(entity, None)
+        self.pushed_entity_refs.pop(entity, None)
+        self.pending_entities.pop(entity, None)
+
+    def forget_missing_entities(self):
+        """
+        Forget the committed text of entities which peer-groups or route-maps are missing in the current config,
+        for example after they were removed with vtysh. The next push_entity() of such entity restores it
+        """
+        index = self.get_index()
+        for entity, (peer_groups, route_maps) in list(self.pushed_entity_refs.items()):
+            if peer_groups <= index.peer_groups and route_maps <= index.route_maps:
+                continue
+            log_info("ConfigMgr::'%s' is missing in FRR config and will be pushed again" % str(entity))
+            self.forget_entity(entity)
+
     def restart_peer_groups(self, peer_groups):
         """
         Schedule peer_groups for restart on commit
@@ -56,15 +232,34 @@ class ConfigMgr(object):
         :return: True if change was applied successfully, False otherwise
         """
         if self.changes.strip() == "":
+            # FRR may be changed outside of bgpcfgd, the next event reads the config again
+            self.invalidate()
             return True
         rc_write = self.frr.write(self.changes)
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
+        for entity, cmd in self.pending_entities.items():
+            if rc_write:
+                pushed = ConfigIndex(cmd.split('\n'))
+                self.pushed_entities[entity] = cmd
+                self.pushed_entity_refs[entity] = (pushed.peer_groups, pushed.route_maps)
+            else:
+                self.pushed_entities.pop(entity, None)
+                self.pushed_entity_refs.pop(entity, None)
         self.reset()
         return rc_write and rc_restart
 
     def get_text(self):
         return self.current_config_raw
 
+    def get_index(self):
+        """
+        Get lookup tables for the current config. The tables are built on the first call after the config was changed
+        :return: ConfigIndex object
+        """
+        if self.current_index is None:
+            self.current_index = ConfigIndex(self.current_config_raw or [])
+        return self.current_index
+
     @staticmethod
     def to_canonical(raw_config):
         """
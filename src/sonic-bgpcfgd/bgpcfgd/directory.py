@@ -3,12 +3,21 @@ from collections import defaultdict
 from .log import log_err
 
 
+class PathNode(object):
+    """ A node of the subscription trie. Children are keyed by path components """
+    __slots__ = ['handlers', 'children']
+
+    def __init__(self):
+        self.handlers = []
+        self.children = {}
+
+
 class Directory(object):
     """ This class stores values and notifies callbacks which were registered to be executed as soon
         as some value is changed. This class works as DB cache mostly """
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
-        self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.notify = {}  # registered callbacks: slot -> trie of PathNode, keyed by path components
 
     @staticmethod
     def get_slot_name(db, table):
@@ -70,17 +79,70 @@ class Directory(object):
         :return:
         """
         slot = self.get_slot_name(db, table)
+        old_value = self.data[slot].get(key)
+        # the same object could be modified in place, so its previous content is unknown
+        old_exists = key in self.data[slot] and old_value is not value
         self.data[slot][key] = value
         if slot in self.notify:
+            root = self.notify[slot]
             handlers_to_run = []
+            if self.is_changed(old_exists, old_value, value):
+                handlers_to_run += root.handlers
+            if key in root.children:
+                self.collect_handlers(root.children[key], old_exists, old_value, value, handlers_to_run)
 
-            for path in self.notify[slot].keys():
-                if self.path_exist(db, table, path):
-                    handlers_to_run += self.notify[slot][path]
-
+            seen = set()
             for handler in handlers_to_run:
+                if handler in seen:
+                    continue
+                seen.add(handler)
                 handler()
 
+    @staticmethod
+    def is_changed(old_exists, old_value, new_value):
+        """
+        Check if a value was added or changed
+        :param old_exists: True if the value existed before
+        :param old_value: the previous value
+        :param new_value: the new value
+        :return: True if the value was changed
+        """
+        return not old_exists or old_value != new_value
+
+    @staticmethod
+    def get_child(value, component):
+        """
+        Get a child of a value by a path component
+        :param value: a value from the storage
+        :param component: a path component
+        :return: a pair: True if the child was found, the child value if it was found
+        """
+        try:
+            if component in value:
+                return True, value[component]
+        except (TypeError, KeyError, IndexError):
+            pass
+        return False, None
+
+    def collect_handlers(self, node, old_exists, old_value, new_value, handlers):
+        """
+        Collect handlers of the trie node and its children, which paths were added or changed
+        :param node: PathNode for the value
+        :param old_exists: True if the value existed before put()
+        :param old_value: the value before put()
+        :param new_value: the value after put()
+        :param handlers: a list to add handlers to
+        """
+        if not self.is_changed(old_exists, old_value, new_value):
+            return
+        handlers += node.handlers
+        for component, child in node.children.items():
+            new_child_exists, new_child = self.get_child(new_value, component)
+            if not new_child_exists:
+                continue
+            old_child_exists, old_child = self.get_child(old_value, component) if old_exists else (False, None)
+            self.collect_handlers(child, old_child_exists, old_child, new_child, handlers)
+
     def get(self, db, table, key):
         """
         Get a value from the storage
@@ -160,11 +222,28 @@ class Directory(object):
         """
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
-            self.notify[slot][path].append(handler)
+            node = self.notify.setdefault(slot, PathNode())
+            for component in self.split_path(path):
+                node = node.children.setdefault(component, PathNode())
+            node.handlers.append(handler)
 
     def unsubscribe(self, deps):
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
             if slot in self.notify:
-                if path in self.notify[slot]:
-                    del self.notify[slot][path]
\ No newline at end of file
+                node = self.notify[slot]
+                for component in self.split_path(path):
+                    if component not in node.children:
+                        break
+                    node = node.children[component]
+                else:
+                    node.handlers = []
+
+    @staticmethod
+    def split_path(path):
+        """
+        Split a path into components
+        :param path: storage path as a string where each internal key is separated by '/'
+        :return: a list of path components. Empty list for the empty path
+        """
+        return path.split("/") if path != '' else []
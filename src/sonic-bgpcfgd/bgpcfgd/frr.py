@@ -1,17 +1,117 @@
 import os
 import datetime
+import re
+import select
+import subprocess
 import time
 import tempfile
 
-from bgpcfgd.log import log_err, log_info, log_warn, log_crit
+from bgpcfgd.log import log_debug, log_err, log_info, log_warn, log_crit
 from .vars import g_debug
 from .utils import run_command
 
 
+class VtyshSession(object):
+    """ Long-lived vtysh process. Command batches are streamed over its stdin """
+    COMMAND = ["stdbuf", "-oL", "vtysh"]
+    MARKER = "BGPCFGD-BATCH-%d-DONE"
+
+    def __init__(self, timeout=60):
+        """
+        Constructor
+        :param timeout: number of seconds to wait for a batch to complete
+        """
+        self.timeout = timeout
+        self.proc = None
+        self.seq = 0
+
+    def is_alive(self):
+        """ Return True if the vtysh process is running """
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        """ Start the vtysh process, if it is not running yet """
+        if self.is_alive():
+            return
+        self.proc = subprocess.Popen(self.COMMAND, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, bufsize=0)
+
+    def close(self):
+        """ Stop the vtysh process """
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def execute(self, commands, config_mode):
+        """
+        Execute a batch of commands in one exchange with vtysh
+        :param commands: list of commands to execute
+        :param config_mode: execute commands inside of 'configure terminal' when True
+        :return: Tuple: True if no command reported an error, output of the batch
+        """
+        self.start()
+        self.seq += 1
+        marker = self.MARKER % self.seq
+        lines = ["configure terminal"] if config_mode else []
+        lines += commands
+        lines += ["end", "echo %s" % marker]
+        self.proc.stdin.write(("\n".join(lines) + "\n").encode('utf-8'))
+        out = self.__read_until(marker)
+        errors = [line for line in out.split('\n') if line.lstrip().startswith('%')]
+        return len(errors) == 0, out
+
+    def __read_until(self, marker):
+        """
+        Read vtysh output until the line with the marker is received
+        :param marker: the marker which finishes the batch output
+        :return: output of the batch without the marker
+        """
+        marker_re = re.compile(r'^%s\r?$' % re.escape(marker), re.MULTILINE)
+        fd = self.proc.stdout.fileno()
+        stop_time = time.monotonic() + self.timeout
+        buf = b""
+        while True:
+            left = stop_time - time.monotonic()
+            if left <= 0:
+                raise RuntimeError("vtysh session didn't finish the batch in %d seconds" % self.timeout)
+            ready, _, _ = select.select([fd], [], [], left)
+            if not ready:
+                continue
+            data = os.read(fd, 65536)
+            if not data:
+                raise RuntimeError("vtysh session was closed unexpectedly")
+            buf += data
+            text = buf.decode('utf-8', errors='replace')
+            found = marker_re.search(text)
+            if found:
+                return text[:found.start()]
+
+
 class FRR(object):
     """Proxy object with FRR"""
-    def __init__(self, daemons):
+    def __init__(self, daemons, use_session=False):
+        """
+        Constructor
+        :param daemons: list of FRR daemons which must be running
+        :param use_session: send configuration through a persistent vtysh session when True.
+                            The one-shot vtysh process is used as a fallback
+        """
         self.daemons = daemons
+        self.session = VtyshSession() if use_session else None
+        self.counters = {
+            "commits": 0,
+            "failures": 0,
+            "session_fallbacks": 0,
+            "last_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+            "total_latency_ms": 0.0,
+        }
 
     def wait_for_daemons(self, seconds):
         """
@@ -38,8 +138,21 @@ class FRR(object):
             return ""
         return out
 
+    def write(self, config_text):
+        """
+        Write configuration into FRR
+        :param config_text: configuration in FRR format
+        :return: True if the configuration was applied successfully, False otherwise
+        """
+        start = time.monotonic()
+        res = self.__session_execute(config_text.split('\n'), True)
+        if res is None:
+            res = self.__write_file(config_text)
+        self.__update_counters(start, res)
+        return res
+
     @staticmethod
-    def write(config_text):
+    def __write_file(config_text):
         fd, tmp_filename = tempfile.mkstemp(dir='/tmp')
         os.close(fd)
         with open(tmp_filename, 'w') as fp:
@@ -54,17 +167,63 @@ class FRR(object):
                 os.remove(tmp_filename)
         return ret_code == 0
 
-    @staticmethod
-    def restart_peer_groups(peer_groups):
+    def restart_peer_groups(self, peer_groups):
         """ Restart peer-groups which support BBR
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
-        res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
-            if rc != 0:
-                log_value = peer_group, rc, out, err
-                log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
-            res = res and (rc == 0)
+        if not peer_groups:
+            return True
+        commands = ["clear bgp peer-group %s soft in" % peer_group for peer_group in sorted(set(peer_groups))]
+        res = self.__session_execute(commands, False)
+        if res is not None:
+            if not res:
+                log_crit("Can't restart bgp peer-groups '%s' through vtysh session" % ", ".join(sorted(set(peer_groups))))
+            return res
+        command = ["vtysh"]
+        for cmd in commands:
+            command += ["-c", cmd]
+        rc, out, err = run_command(command)
+        if rc != 0:
+            log_value = ", ".join(sorted(set(peer_groups))), rc, out, err
+            log_crit("Can't restart bgp peer-groups '%s'. rc='%d', out='%s', err='%s'" % log_value)
+        return rc == 0
+
+    def get_counters(self):
+        """ Return a copy of commit counters """
+        return dict(self.counters)
+
+    def __session_execute(self, commands, config_mode):
+        """
+        Execute commands through the persistent vtysh session
+        :param commands: list of commands to execute
+        :param config_mode: execute commands in configuration mode when True
+        :return: True or False as a result of the commands. None if the session can't be used
+        """
+        if self.session is None:
+            return None
+        try:
+            res, out = self.session.execute(commands, config_mode)
+        except (OSError, RuntimeError) as e:
+            log_warn("vtysh session failed: '%s'. Fall back to the vtysh process" % str(e))
+            self.session.close()
+            self.counters["session_fallbacks"] += 1
+            return None
+        if not res:
+            log_err("vtysh session reported errors for commands '%s': '%s'" % (str(commands), out))
         return res
+
+    def __update_counters(self, start, res):
+        """
+        Update commit counters
+        :param start: monotonic timestamp of the commit start
+        :param res: result of the commit
+        """
+        latency = (time.monotonic() - start) * 1000.0
+        self.counters["commits"] += 1
+        if not res:
+            self.counters["failures"] += 1
+        self.counters["last_latency_ms"] = latency
+        self.counters["max_latency_ms"] = max(self.counters["max_latency_ms"], latency)
+        self.counters["total_latency_ms"] += latency
+        log_debug("FRR commit #%d took %.3f ms" % (self.counters["commits"], latency))
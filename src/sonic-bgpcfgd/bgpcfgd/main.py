@@ -43,7 +43,9 @@ def do_work():
     st_rt_timer = StaticRouteTimer()
     thr = threading.Thread(target = st_rt_timer.run)
     thr.start()
-    frr = FRR(["bgpd", "zebra", "staticd"])
+    constants = read_constants()
+    use_session = constants.get("bgp", {}).get("vtysh_session", {}).get("enabled", False)
+    frr = FRR(["bgpd", "zebra", "staticd"], use_session)
     frr.wait_for_daemons(seconds=20)
 
     # Wait for mgmtd initial config load to avoid "Lock already taken on DS" error
@@ -67,7 +69,7 @@ def do_work():
         'directory': Directory(),
         'cfg_mgr':   ConfigMgr(frr),
         'tf':        TemplateFabric(),
-        'constants': read_constants(),
+        'constants': constants,
         'state_db_conn': swsscommon.DBConnector("STATE_DB", 0)
     }
     managers = [
@@ -131,7 +133,11 @@ def do_work():
 
     managers.append(PrefixListMgr(common_objs, "CONFIG_DB", "PREFIX_LIST"))
 
-    runner = Runner(common_objs['cfg_mgr'])
+    batch = constants.get("bgp", {}).get("runner_batch", {})
+    if batch.get("enabled", False):
+        runner = Runner(common_objs['cfg_mgr'], batch.get("max_ops", 500), batch.get("window_ms", 50))
+    else:
+        runner = Runner(common_objs['cfg_mgr'])
     for mgr in managers:
         runner.add_manager(mgr)
     runner.run()
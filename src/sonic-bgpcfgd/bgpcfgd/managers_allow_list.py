@@ -332,20 +332,12 @@ class BGPAllowListMgr(Manager):
         """
         assert af == self.V4 or af == self.V6
         family = self.__af_to_family(af)
-        match_string = '%s prefix-list %s seq ' % (family, pl_name)
-        conf = self.cfg_mgr.get_text()
-        if not any(line.strip().startswith(match_string) for line in conf):
+        config_list = self.cfg_mgr.get_index().get_prefix_list(family, pl_name)
+        if config_list is None:
             return False, False  # if the prefix list is not exists, it is not correct
         expect_set = set(self.__normalize_ipnetwork(af, constant_list))
         expect_set.update(set(self.__normalize_ipnetwork(af, allow_list)))
 
-        config_list = []
-        for line in conf:
-            if line.startswith(match_string):
-                found = line[len(match_string):].strip().split(' ')
-                rule = " ".join(found[1:])
-                config_list.append(rule)
-
         # Return double Ture, when running configuraiton is identical with config db + constants.
         return True, expect_set == set(self.__normalize_ipnetwork(af, config_list))
 
@@ -398,12 +390,9 @@ class BGPAllowListMgr(Manager):
                           Second element: community value if the first element is True no value otherwise
         """
         log_debug("BGPAllowListMgr::__is_community_presented. community='%s'" % community_name)
-        match_string = 'bgp community-list standard %s permit ' % community_name
-        conf = self.cfg_mgr.get_text()
-        found = [line.strip() for line in conf if line.strip().startswith(match_string)]
-        if not found:
+        community_value = self.cfg_mgr.get_index().get_community(community_name)
+        if community_value is None:
             return False, None
-        community_value = found[0].replace(match_string, '')
         return True, community_value
 
     def __update_allow_route_map_entry(self, af, allow_address_pl_name, community_name, route_map_name):
@@ -592,63 +581,6 @@ class BGPAllowListMgr(Manager):
         log_debug("BGPAllowListMgr::__find_next_seq_number '%d' has_community='%s'" % info)
         return sequence_number
 
-    def __extract_peer_group_names(self):
-        """
-        Extract names of all peer-groups defined in the config
-        :return: list of peer-group names
-        """
-        # Find all peer-groups entries
-        re_peer_group = re.compile(r'^\s*neighbor (\S+) peer-group$')
-        peer_groups = []
-        for line in self.cfg_mgr.get_text():
-            result = re_peer_group.match(line)
-            if result:
-                peer_groups.append(result.group(1))
-        return peer_groups
-
-    def __get_peer_group_to_route_map(self, peer_groups):
-        """
-        Extract names of route-maps which is connected to peer-groups defines as peer_groups
-        :peer_groups: a list of peer-group names
-        :return: dictionary where key is a peer-group, value is a route-map name which is defined as route-map in
-                 for the peer_group.
-        """
-        pg_2_rm = {}
-        for pg in peer_groups:
-            re_peer_group_rm = re.compile(r'^\s*neighbor %s route-map (\S+) in$' % pg)
-            for line in self.cfg_mgr.get_text():
-                result = re_peer_group_rm.match(line)
-                if result:
-                    pg_2_rm[pg] = result.group(1)
-                    break
-        return pg_2_rm
-
-    def __get_route_map_calls(self, rms):
-        """
-        Find mapping between route-maps and route-map call names, defined for the route-maps
-        :rms: a set with route-map names
-        :return: a dictionary: key - name of a route-map, value - name of a route-map call defined for the route-map
-        """
-        rm_2_call = {}
-        re_rm = re.compile(r'^route-map (\S+) permit \d+$')
-        re_call = re.compile(r'^\s*call (\S+)$')
-        inside_name = None
-        for line in self.cfg_mgr.get_text():
-            if inside_name:
-                inside_result = re_call.match(line)
-                if inside_result:
-                    rm_2_call[inside_name] = inside_result.group(1)
-                    inside_name = None
-                    continue
-            result = re_rm.match(line)
-            if not result:
-                continue
-            inside_name = None
-            if result.group(1) not in rms:
-                continue
-            inside_name = result.group(1)
-        return rm_2_call
-
     def __get_routemap_tag(self):
         """
         Find if any user define tag is provided to be used when allow prefifx list is matched
@@ -690,9 +622,9 @@ class BGPAllowListMgr(Manager):
         :return: a list of peer-groups which a used by devices with requested deployment_id number
         """
         self.cfg_mgr.update()
-        peer_groups = self.__extract_peer_group_names()
-        pg_2_rm = self.__get_peer_group_to_route_map(peer_groups)
-        rm_2_call = self.__get_route_map_calls(set(pg_2_rm.values()))
+        index = self.cfg_mgr.get_index()
+        pg_2_rm = index.get_peer_group_to_route_map(index.get_peer_groups())
+        rm_2_call = index.get_route_map_calls(set(pg_2_rm.values()))
         ret = self.__get_peer_group_to_restart(deployment_id, pg_2_rm, rm_2_call, neighbor_type)
         return list(ret)
 
@@ -22,9 +22,9 @@ class BGPPeerGroupMgr(object):
         """
         self.cfg_mgr = common_objs['cfg_mgr']
         self.constants = common_objs['constants']
-        tf = common_objs['tf']
-        self.policy_template = tf.from_file(base_template + "policies.conf.j2")
-        self.peergroup_template = tf.from_file(base_template + "peer-group.conf.j2")
+        self.tf = common_objs['tf']
+        self.policy_template = self.tf.from_file(base_template + "policies.conf.j2")
+        self.peergroup_template = self.tf.from_file(base_template + "peer-group.conf.j2")
         self.device_global_cfgmgr = DeviceGlobalCfgMgr(common_objs, "CONFIG_DB", swsscommon.CFG_BGP_DEVICE_GLOBAL_TABLE_NAME)
 
     def update(self, name, **kwargs):
@@ -44,11 +44,11 @@ class BGPPeerGroupMgr(object):
         :param kwargs: dictionary with parameters for rendering
         """
         try:
-            policy = self.policy_template.render(**kwargs)
+            policy = self.tf.render(self.policy_template, **kwargs)
         except jinja2.TemplateError as e:
             log_err("Can't render policy template name: '%s': %s" % (name, str(e)))
             return False
-        self.update_entity(policy, "Routing policy for peer '%s'" % name)
+        self.update_entity(("policy", self.policy_template.name), policy, "Routing policy for peer '%s'" % name)
         return True
 
     def update_pg(self, name, **kwargs):
@@ -58,7 +58,7 @@ class BGPPeerGroupMgr(object):
         :param kwargs: dictionary with parameters for rendering
         """
         try:
-            pg = self.peergroup_template.render(**kwargs)
+            pg = self.tf.render(self.peergroup_template, **kwargs)
             tsa_rm = self.device_global_cfgmgr.check_state_and_get_tsa_routemaps(pg)
             idf_isolation_rm = self.device_global_cfgmgr.check_state_and_get_idf_isolation_routemaps()
         except jinja2.TemplateError as e:
@@ -69,18 +69,22 @@ class BGPPeerGroupMgr(object):
             cmd = ('router bgp %s\n' % kwargs['bgp_asn']) + pg + tsa_rm + idf_isolation_rm + "\nexit"
         else:
             cmd = ('router bgp %s vrf %s\n' % (kwargs['bgp_asn'], kwargs['vrf'])) + pg + tsa_rm + idf_isolation_rm + "\nexit"
-        self.update_entity(cmd, "Peer-group for peer '%s'" % name)
+        self.update_entity(("peer-group", self.peergroup_template.name, kwargs['vrf']), cmd, "Peer-group for peer '%s'" % name)
         return True
 
-    def update_entity(self, cmd, txt):
+    def update_entity(self, entity, cmd, txt):
         """
-        Send commands to FRR
+        Send commands to FRR. The commands are skipped, if the same text was already pushed for the entity
+        and the entity is still present in FRR config
+        :param entity: name of the updated entity
         :param cmd: commands to send in a raw form
         :param txt: text for the syslog output
         :return:
         """
-        self.cfg_mgr.push(cmd)
-        log_info("%s has been scheduled to be updated" % txt)
+        if self.cfg_mgr.push_entity(entity, cmd):
+            log_info("%s has been scheduled to be updated" % txt)
+        else:
+            log_debug("%s is up-to-date" % txt)
         return True
 
 
@@ -1,4 +1,5 @@
-from collections import defaultdict
+import time
+from collections import defaultdict, OrderedDict
 from swsscommon import swsscommon
 
 from .log import log_debug, log_crit
@@ -20,13 +21,31 @@ class Runner(object):
     """
     SELECT_TIMEOUT = 1000
 
-    def __init__(self, cfg_manager):
-        """ Constructor """
+    def __init__(self, cfg_manager, batch_size=0, batch_window_ms=50):
+        """
+        Constructor
+        :param cfg_manager: ConfigMgr object
+        :param batch_size: maximum number of events dispatched before FRR commit. 0 disables batching
+        :param batch_window_ms: maximum time in milliseconds to collect events before FRR commit
+        """
         self.cfg_manager = cfg_manager
+        self.batch_size = batch_size
+        self.batch_window_ms = batch_window_ms
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
         self.subscribers = set()
+        self.subscribers_by_fd = {}
+        self.metrics = {
+            "batches": 0,
+            "events": 0,
+            "dispatched": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_commit_ms": 0.0,
+            "max_commit_ms": 0.0,
+            "total_commit_ms": 0.0,
+        }
 
     def add_manager(self, manager):
         """
@@ -48,11 +67,15 @@ class Runner(object):
             conn = self.db_connectors[db]
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
             self.subscribers.add(subscriber)
+            self.subscribers_by_fd[subscriber.getFd()] = subscriber
             self.selector.addSelectable(subscriber)
         self.callbacks[db][table_name].append(manager.handler)
 
     def run(self):
         """ Main loop """
+        if self.batch_size > 0:
+            self.run_batched()
+            return
         while g_run:
             state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
             if state == self.selector.TIMEOUT:
@@ -71,3 +94,104 @@ class Runner(object):
             rc = self.cfg_manager.commit()
             if not rc:
                 log_crit("Runner::commit was unsuccessful")
+
+    def run_batched(self):
+        """ Main loop. Events are collected into batches, and FRR is committed once per batch """
+        while g_run:
+            state, selectable = self.selector.select(Runner.SELECT_TIMEOUT)
+            if state == self.selector.TIMEOUT:
+                continue
+            elif state == self.selector.ERROR:
+                raise Exception("Received error from select")
+            batch = OrderedDict()
+            n_events = self.drain(selectable, batch)
+            deadline = time.monotonic() + self.batch_window_ms / 1000.0
+            while n_events < self.batch_size:
+                left_ms = int((deadline - time.monotonic()) * 1000)
+                if left_ms <= 0:
+                    break
+                state, selectable = self.selector.select(left_ms)
+                if state == self.selector.TIMEOUT:
+                    break
+                elif state == self.selector.ERROR:
+                    raise Exception("Received error from select")
+                n_events += self.drain(selectable, batch)
+            self.dispatch_batch(batch, n_events)
+
+    def drain(self, selectable, batch):
+        """
+        Read all pending events from the subscriber which fired and coalesce them into the batch
+        :param selectable: the selectable object returned by select()
+        :param batch: OrderedDict: (db, table, key) -> list of pending (op, fvs)
+        :return: number of events read
+        """
+        subscriber = self.subscribers_by_fd.get(selectable.getFd())
+        if subscriber is None:
+            return 0
+        db = subscriber.getDbConnector().getDbId()
+        table_name = subscriber.getTableName()
+        events = subscriber.pops()
+        for key, op, fvs in events:
+            log_debug("Received message : '%s'" % str((key, op, fvs)))
+            self.coalesce(batch, (db, table_name, key), op, dict(fvs))
+        return len(events)
+
+    @staticmethod
+    def coalesce(batch, batch_key, op, data):
+        """
+        Add an event into the batch. A newer SET replaces a pending SET of the same key,
+        a DEL replaces all pending events of the key. DEL followed by SET is kept as is.
+        The key keeps the position of its first event, so the order between keys is preserved
+        :param batch: OrderedDict: (db, table, key) -> list of pending (op, data)
+        :param batch_key: tuple (db, table, key)
+        :param op: operation: SET or DEL
+        :param data: dictionary with values of the event
+        """
+        pending = batch.setdefault(batch_key, [])
+        if op == swsscommon.DEL_COMMAND:
+            pending[:] = [(op, data)]
+        elif pending and pending[-1][0] != swsscommon.DEL_COMMAND:
+            pending[-1] = (op, data)
+        else:
+            pending.append((op, data))
+
+    def dispatch_batch(self, batch, n_events):
+        """
+        Run handlers for all events in the batch and commit changes into FRR
+        :param batch: OrderedDict: (db, table, key) -> list of pending (op, data)
+        :param n_events: number of events received for the batch
+        """
+        n_dispatched = 0
+        for (db, table_name, key), pending in batch.items():
+            for op, data in pending:
+                n_dispatched += 1
+                for callback in self.callbacks[db][table_name]:
+                    callback(key, op, data)
+        start = time.monotonic()
+        rc = self.cfg_manager.commit()
+        commit_ms = (time.monotonic() - start) * 1000.0
+        if not rc:
+            log_crit("Runner::commit was unsuccessful")
+        self.update_metrics(n_events, n_dispatched, commit_ms)
+
+    def update_metrics(self, n_events, n_dispatched, commit_ms):
+        """
+        Update batch metrics
+        :param n_events: number of events received for the batch
+        :param n_dispatched: number of events dispatched after coalescing
+        :param commit_ms: duration of FRR commit in milliseconds
+        """
+        self.metrics["batches"] += 1
+        self.metrics["events"] += n_events
+        self.metrics["dispatched"] += n_dispatched
+        self.metrics["last_batch_size"] = n_events
+        self.metrics["max_batch_size"] = max(self.metrics["max_batch_size"], n_events)
+        self.metrics["last_commit_ms"] = commit_ms
+        self.metrics["max_commit_ms"] = max(self.metrics["max_commit_ms"], commit_ms)
+        self.metrics["total_commit_ms"] += commit_ms
+        info = self.metrics["batches"], n_events, n_dispatched, commit_ms
+        log_debug("Runner::batch #%d: events=%d dispatched=%d commit=%.3f ms" % info)
+
+    def get_metrics(self):
+        """ Return a copy of batch metrics """
+        return dict(self.metrics)
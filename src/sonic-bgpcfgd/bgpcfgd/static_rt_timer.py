@@ -1,19 +1,24 @@
 from .log import log_err, log_info, log_debug
 from swsscommon import swsscommon
+import heapq
 import time
 
 class StaticRouteTimer(object):
-    """ This class checks the static routes and deletes those entries that have not been refreshed """
+    """ This class checks the static routes and deletes those entries that have not been refreshed.
+        Routes are kept in a deadline-ordered index, which is maintained from APPL_DB STATIC_ROUTE notifications """
     def __init__(self):
         self.db = swsscommon.SonicV2Connector()
         self.db.connect(self.db.APPL_DB)
         self.timer = None
-        self.start = None
+        self.deadlines = {}  # route key -> deadline of the route
+        self.refreshed = {}  # route key -> True if the route was refreshed since the last check
+        self.heap = []       # (deadline, route key). Entries which don't match self.deadlines are stale
 
     DEFAULT_TIMER = 180
     DEFAULT_SLEEP = 60
     # keep same range as value defined in sonic-restapi/sonic_api.yaml
     MAX_TIMER     = 172800
+    TABLE_NAME    = "STATIC_ROUTE"
 
     def set_timer(self):
         """ Check for custom route expiry time in STATIC_ROUTE_EXPIRY_TIME """
@@ -22,39 +27,132 @@ class StaticRouteTimer(object):
             if timer.isdigit():
                 timer = int(timer)
                 if timer > 0 and timer <= self.MAX_TIMER:
+                    if timer != self.timer:
+                        log_info("Static route expiry set to {}s".format(timer))
                     self.timer = timer
                     return
                 log_err("Custom static route expiry time of {}s is invalid!".format(timer))
         return
 
-    def alarm(self):
-        """ Clear unrefreshed static routes """
-        static_routes = self.db.keys(self.db.APPL_DB, "STATIC_ROUTE:*")
-        if static_routes is not None:
-            for sr in static_routes:
-                expiry = self.db.get(self.db.APPL_DB, sr, "expiry")
-                if expiry == "false":
-                    continue
-                refresh = self.db.get(self.db.APPL_DB, sr, "refresh")
-                if refresh == "true":
-                    self.db.set(self.db.APPL_DB, sr, "refresh", "false")
-                    log_debug("Refresh status of static route {} is set to false".format(sr))
-                else:
-                    self.db.delete(self.db.APPL_DB, sr)
-                    log_debug("Static route {} deleted".format(sr))
-        self.start = time.time()
-        return
+    def get_period(self):
+        """ Return number of seconds a route lives without being refreshed """
+        return self.timer if self.timer else self.DEFAULT_TIMER
+
+    def update_route(self, key, op, data, now):
+        """
+        Update the index with a STATIC_ROUTE notification
+        :param key: key of the route without the table name
+        :param op: operation: SET or DEL
+        :param data: fields of the route
+        :param now: current monotonic time
+        """
+        if op == swsscommon.DEL_COMMAND or data.get("expiry") == "false":
+            self.forget_route(key)
+            return
+        self.refreshed[key] = data.get("refresh") == "true"
+        if key not in self.deadlines:
+            self.schedule_route(key, now + self.get_period())
+
+    def schedule_route(self, key, deadline):
+        """
+        Set a new deadline for the route
+        :param key: key of the route without the table name
+        :param deadline: monotonic time when the route must be checked
+        """
+        self.deadlines[key] = deadline
+        heapq.heappush(self.heap, (deadline, key))
+
+    def forget_route(self, key):
+        """
+        Remove the route from the index
+        :param key: key of the route without the table name
+        """
+        self.deadlines.pop(key, None)
+        self.refreshed.pop(key, None)
+
+    def next_deadline(self):
+        """ Return the earliest deadline in the index. None if there are no routes to check """
+        while self.heap:
+            deadline, key = self.heap[0]
+            if self.deadlines.get(key) == deadline:
+                return deadline
+            heapq.heappop(self.heap)
+        return None
+
+    def pop_expired(self, now):
+        """
+        Remove routes which deadlines have passed from the index
+        :param now: current monotonic time
+        :return: list of expired route keys
+        """
+        expired = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            _, key = heapq.heappop(self.heap)
+            expired.append(key)
+        return expired
+
+    def expire(self, now, pipe):
+        """
+        Clear unrefreshed static routes which deadlines have passed. Refresh status of the other routes is reset
+        :param now: current monotonic time
+        :param pipe: redis pipeline for APPL_DB
+        :return: tuple: number of refreshed routes, number of deleted routes
+        """
+        n_refreshed, n_deleted = 0, 0
+        for key in self.pop_expired(now):
+            command = swsscommon.RedisCommand()
+            db_key = "%s:%s" % (self.TABLE_NAME, key)
+            if self.refreshed[key]:
+                command.formatHSET(db_key, {"refresh": "false"})
+                self.refreshed[key] = False
+                self.schedule_route(key, now + self.get_period())
+                n_refreshed += 1
+            else:
+                command.formatDEL(db_key)
+                self.forget_route(key)
+                n_deleted += 1
+            pipe.push(command)
+        if n_refreshed or n_deleted:
+            pipe.flush()
+            log_debug("Static route timer: {} routes refreshed, {} routes deleted".format(n_refreshed, n_deleted))
+        return n_refreshed, n_deleted
+
+    def get_timeout(self, now):
+        """
+        Return number of milliseconds until the next deadline. The timer configuration is re-read at least every DEFAULT_SLEEP seconds
+        :param now: current monotonic time
+        """
+        timeout = self.DEFAULT_SLEEP
+        deadline = self.next_deadline()
+        if deadline is not None:
+            timeout = min(max(deadline - now, 0), timeout)
+        return int(timeout * 1000)
 
     def run(self):
-        self.start = time.time()
+        conn = swsscommon.DBConnector("APPL_DB", 0)
+        pipe = swsscommon.RedisPipeline(conn)
+        subscriber = swsscommon.SubscriberStateTable(conn, self.TABLE_NAME)
+        selector = swsscommon.Select()
+        selector.addSelectable(subscriber)
         while True:
             self.set_timer()
-            if self.timer:
-                log_info("Static route expiry set to {}s".format(self.timer))
-                time.sleep(self.timer)
-                self.alarm()
-            else:
-                time.sleep(self.DEFAULT_SLEEP)
-                if time.time() - self.start >= self.DEFAULT_TIMER:
-                    self.alarm()
+            selector.select(self.get_timeout(time.monotonic()))
+            self.drain_notifications(selector, subscriber)
+            self.expire(time.monotonic(), pipe)
 
+    def drain_notifications(self, selector, subscriber):
+        """
+        Apply all pending STATIC_ROUTE notifications, so a refresh which has already arrived can't be expired
+        :param selector: swsscommon Select object with the subscriber
+        :param subscriber: SubscriberStateTable of STATIC_ROUTE
+        """
+        while True:
+            now = time.monotonic()
+            for key, op, fvs in subscriber.pops():
+                self.update_route(key, op, dict(fvs), now)
+            state, _ = selector.select(0)
+            if state != selector.OBJECT:
+                break
@@ -1,7 +1,9 @@
 from collections import OrderedDict
 from functools import partial
 
+import hashlib
 import jinja2
+import jinja2.meta
 import netaddr
 import os
 
@@ -9,6 +11,8 @@ from .log import log_err
 
 class TemplateFabric(object):
     """ Fabric for rendering jinja2 templates """
+    RENDER_CACHE_SIZE = 1024
+
     def __init__(self, template_path = '/usr/share/sonic/templates'):
         j2_template_paths = [template_path]
         j2_loader = jinja2.FileSystemLoader(j2_template_paths)
@@ -20,6 +24,76 @@ class TemplateFabric(object):
         for attr in ['ip', 'network', 'prefixlen', 'netmask']:
             j2_env.filters[attr] = partial(self.prefix_attr, attr)
         self.env = j2_env
+        self.render_cache = OrderedDict()  # (template, hash of used kwargs) -> rendered text
+        self.template_variables = {}  # template name -> names of the variables used by the template, None if unknown
+
+    def render(self, template, **kwargs):
+        """
+        Render a template. Results are cached by the template and a hash of the normalized kwargs the template uses,
+        so the cache is only useful for templates which don't depend on per-neighbor parameters
+        :param template: Jinja2 template object
+        :param kwargs: dictionary with parameters for rendering
+        :return: rendered text
+        """
+        names = self.get_template_variables(template.name)
+        if names is not None:
+            key = template, self.kwargs_hash({k: v for k, v in kwargs.items() if k in names})
+        else:
+            key = template, self.kwargs_hash(kwargs)
+        if key in self.render_cache:
+            self.render_cache.move_to_end(key)
+            return self.render_cache[key]
+        text = template.render(**kwargs)
+        self.render_cache[key] = text
+        if len(self.render_cache) > self.RENDER_CACHE_SIZE:
+            self.render_cache.popitem(last=False)
+        return text
+
+    @staticmethod
+    def kwargs_hash(kwargs):
+        """
+        Calculate a hash of rendering parameters. Dictionaries are normalized, so the order of keys doesn't matter
+        :param kwargs: dictionary with parameters for rendering
+        :return: hex digest of the parameters
+        """
+        def normalize(value):
+            if isinstance(value, dict):
+                return tuple(sorted((repr(k), normalize(v)) for k, v in value.items()))
+            elif isinstance(value, (list, tuple)):
+                return tuple(normalize(v) for v in value)
+            elif isinstance(value, (set, frozenset)):
+                return tuple(sorted(repr(v) for v in value))
+            return repr(value)
+        return hashlib.sha1(repr(normalize(kwargs)).encode('utf-8')).hexdigest()
+
+    def get_template_variables(self, name):
+        """
+        Get names of the variables a template and the templates it includes or imports use
+        :param name: name of the template in the loader
+        :return: a set of variable names. None if they can't be found, for example for a template from a string
+        """
+        if name not in self.template_variables:
+            self.template_variables[name] = self.find_template_variables(name, set())
+        return self.template_variables[name]
+
+    def find_template_variables(self, name, visited):
+        if name is None:
+            return None
+        if name in visited:
+            return set()
+        visited.add(name)
+        try:
+            source = self.env.loader.get_source(self.env, name)[0]
+            ast = self.env.parse(source)
+        except jinja2.TemplateError:
+            return None
+        names = set(jinja2.meta.find_undeclared_variables(ast))
+        for ref in jinja2.meta.find_referenced_templates(ast):
+            ref_names = self.find_template_variables(ref, visited)
+            if ref_names is None:
+                return None
+            names |= ref_names
+        return names
 
     def from_file(self, filename):
         """
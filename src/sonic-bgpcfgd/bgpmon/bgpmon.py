@@ -23,9 +23,18 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     "previous" neighbor dictionary will be kept and used to determine if there
     is a need to perform update or the peer is stale to be removed from the
     state DB
+
+    With --mode event the daemon follows frr.log instead of checking its timestamp.
+    The neighbors of "%ADJCHANGE" records of bgpd (bgp log-neighbor-changes) are
+    updated right away with "show bgp neighbors <ip> json", so verbose FRR logging
+    doesn't cause a full summary every cycle. A full snapshot is still taken every
+    15 seconds if the log was written, like the polling mode, to catch transitions
+    which are not logged. New neighbors and lost log records also wait for it.
 """
+import argparse
 import json
 import os
+import re
 import sys
 import syslog
 from swsscommon import swsscommon
@@ -33,6 +42,91 @@ import time
 from sonic_py_common.general import getstatusoutput_noshell
 
 PIPE_BATCH_MAX_COUNT = 50
+FRR_LOG_FILE = "/var/log/frr/frr.log"
+POLL_INTERVAL = 15
+EVENT_POLL_INTERVAL = 1
+FULL_SYNC_INTERVAL = POLL_INTERVAL
+LOG_READ_MAX_BYTES = 1024 * 1024
+
+
+class FrrLogWatcher:
+    """Follow the FRR log file and report neighbors with adjacency changes"""
+    ADJCHANGE_RE = re.compile(rb'%ADJCHANGE: neighbor ([^\s(]+)')
+
+    def __init__(self, path=FRR_LOG_FILE):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+        # set when records were skipped. Stays set until a full snapshot is taken
+        self.records_lost = False
+        # set when the log was written. Stays set until a full snapshot is taken
+        self.active = False
+        try:
+            st = os.stat(path)
+            # start from the end. The first snapshot is taken anyway
+            self.inode, self.offset = st.st_ino, st.st_size
+        except (IOError, OSError):
+            pass
+
+    def get_changed_peers(self):
+        """Read records appended to the log since the previous call.
+        Returns:
+            set of neighbor addresses which had adjacency changes, or None
+            if the log can't be followed and a full snapshot is required
+        """
+        try:
+            st = os.stat(self.path)
+        except (IOError, OSError):
+            self.inode = None
+            return None
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            # log was rotated or truncated. Records could be lost, read the new file from the beginning next time
+            self.inode, self.offset, self.partial = st.st_ino, 0, b""
+            self.records_lost = True
+            self.active = True
+            return None
+        if st.st_size == self.offset:
+            return set()
+        if st.st_size - self.offset > LOG_READ_MAX_BYTES:
+            # too much to scan. Skip it and take a full snapshot instead
+            self.offset, self.partial = st.st_size, b""
+            self.records_lost = True
+            self.active = True
+            return None
+        try:
+            with open(self.path, 'rb') as fp:
+                fp.seek(self.offset)
+                data = fp.read(st.st_size - self.offset)
+        except (IOError, OSError):
+            return None
+        self.offset += len(data)
+        self.active = True
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        peers = set()
+        for line in lines:
+            found = self.ADJCHANGE_RE.search(line)
+            if found:
+                peers.add(found.group(1).decode('utf-8', errors='replace'))
+        return peers
+
+
+def is_full_sync_required(changed_peers, elapsed, log_active, records_lost=False):
+    """Decide if a new snapshot of all neighbor states must be taken in event mode.
+    Args:
+        changed_peers: result of FrrLogWatcher.get_changed_peers()
+        elapsed: seconds since the previous snapshot
+        log_active: True if the log was written since the previous snapshot
+        records_lost: True if log records were skipped since the previous snapshot
+    """
+    if elapsed < FULL_SYNC_INTERVAL:
+        # adjacency changes are updated per neighbor in between
+        return False
+    # the log can't be followed, adjacency changes could be lost with the skipped
+    # records, or like the polling mode, there is BGP activity in the log
+    return changed_peers is None or records_lost or log_active
+
 
 class BgpStateGet:
     def __init__(self):
@@ -120,6 +214,41 @@ class BgpStateGet:
         sys.exit(1)
 
 
+    # Update the neighbors reported by the log with their own "show bgp neighbors"
+    # instead of a full summary. Returns False if a full snapshot is required
+    # instead: a neighbor is not known yet, or its state can't be read or is Idle,
+    # for which the summary tells the reason, e.g. "Idle (Admin)"
+    def update_changed_neigh_states(self, peers):
+        if not peers.issubset(self.peer_l):
+            return False
+        new_states = {}
+        for peer in peers:
+            cmd = ["vtysh", "-H", "/dev/null", "-c", "show bgp neighbors {} json".format(peer)]
+            try:
+                rc, output = getstatusoutput_noshell(cmd)
+                if rc:
+                    syslog.syslog(syslog.LOG_WARNING, "*WARNING* Failed with rc:{} when execute: {}".format(rc, cmd))
+                    return False
+                peer_info = json.loads(output)[peer]
+                new_states[peer] = (peer_info["bgpState"], peer_info["remoteAs"], peer_info["localAs"])
+            except Exception as e:
+                syslog.syslog(syslog.LOG_WARNING, "*WARNING* Unexpected output: {} when execute: {}".format(e, cmd))
+                return False
+            if new_states[peer][0] == "Idle":
+                return False
+
+        data = {}
+        for peer, (state, remote_as, local_as) in new_states.items():
+            if self.peer_state.get(peer) != state:
+                peerType = "i-BGP" if remote_as == local_as else "e-BGP"
+                data["NEIGH_STATE_TABLE|%s" % peer] = {'state':state, 'peerType':peerType}
+                self.peer_state[peer] = state
+            if len(data) > PIPE_BATCH_MAX_COUNT:
+                self.flush_pipe(data)
+        if len(data) > 0:
+            self.flush_pipe(data)
+        return True
+
     # This method will take the caller's dictionary which contains the peer state operation
     # That need to be updated in StateDB using Redis pipeline.
     # The data{} will be cleared at the end of this method before returning to caller.
@@ -188,9 +317,39 @@ class BgpStateGet:
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
 
+def run_polling(bgp_state_get):
+    # periodically obtain the new neighbor information and update if necessary
+    while True:
+        time.sleep(POLL_INTERVAL)
+        if bgp_state_get.bgp_activity_detected():
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+
+def run_event_driven(bgp_state_get, watcher):
+    # obtain the new neighbor information when bgpd reports adjacency changes
+    last_sync = None
+    while True:
+        now = time.monotonic()
+        changed_peers = watcher.get_changed_peers()
+        full_sync = last_sync is None or is_full_sync_required(changed_peers, now - last_sync, watcher.active, watcher.records_lost)
+        if not full_sync and changed_peers:
+            syslog.syslog(syslog.LOG_DEBUG, "bgpmon: adjacency changed for {}".format(", ".join(sorted(changed_peers))))
+            full_sync = not bgp_state_get.update_changed_neigh_states(changed_peers)
+        if full_sync:
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+            watcher.records_lost = False
+            watcher.active = False
+            last_sync = now
+        time.sleep(EVENT_POLL_INTERVAL)
+
 def main():
+    parser = argparse.ArgumentParser(description="Populate BGP neighbor states into STATE_DB")
+    parser.add_argument("--mode", choices=["poll", "event"], default="poll",
+                        help="poll: check frr.log timestamp every {} seconds, event: follow frr.log for neighbor adjacency changes".format(POLL_INTERVAL))
+    args = parser.parse_args()
 
-    syslog.syslog(syslog.LOG_INFO, "bgpmon service started")
+    syslog.syslog(syslog.LOG_INFO, "bgpmon service started in {} mode".format(args.mode))
     bgp_state_get = None
     try:
         bgp_state_get = BgpStateGet()
@@ -198,12 +357,10 @@ def main():
         syslog.syslog(syslog.LOG_ERR, "{}: error exit 1, reason {}".format("THIS_MODULE", str(e)))
         sys.exit(1)
 
-    # periodically obtain the new neighbor information and update if necessary
-    while True:
-        time.sleep(15)
-        if bgp_state_get.bgp_activity_detected():
-            bgp_state_get.get_all_neigh_states()
-            bgp_state_get.update_neigh_states()
+    if args.mode == "event":
+        run_event_driven(bgp_state_get, FrrLogWatcher())
+    else:
+        run_polling(bgp_state_get)
 
 if __name__ == '__main__':
     main()
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock, patch
 
+from bgpcfgd.config import ConfigIndex
 from bgpcfgd.directory import Directory
 from bgpcfgd.template import TemplateFabric
 from copy import deepcopy
@@ -417,7 +418,7 @@ def test__get_available_peer_groups():
         'constants': global_constants,
     }
     m = BBRMgr(common_objs, "CONFIG_DB", "BGP_BBR")
-    m.cfg_mgr.get_text = MagicMock(return_value=[
+    m.cfg_mgr.get_index = MagicMock(return_value=ConfigIndex([
         '  neighbor PEER_V4 peer-group',
         '  neighbor PEER_V6 peer-group',
         '  address-family ipv4',
@@ -433,6 +434,6 @@ def test__get_available_peer_groups():
         '    neighbor PEER_V6 route-map TO_BGP_PEER_V6 out',
         '  exit-address-family',
         '     ',
-    ])
+    ]))
     res = m._BBRMgr__get_available_peer_groups()
     assert res == {"PEER_V4", "PEER_V6"}
@@ -74,3 +74,97 @@ def test_vtysh_fail_warning_includes_output(mocked_syslog, mocked_os_system, moc
     level, msg = mocked_syslog.call_args[0]
     assert level == syslog.LOG_WARNING
     assert "some vtysh error output here" in msg
+
+
+ADJ_UP = b"2024/01/01 00:00:01 BGP: [M7Q4P-46WDR] %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T2) in vrf default Up\n"
+ADJ_DOWN = b"2024/01/01 00:00:02 BGP: %ADJCHANGE: neighbor fc00::2 in vrf default Down Peer closed the session\n"
+NOISE = b"2024/01/01 00:00:03 ZEBRA: interface Ethernet0 changed\n"
+
+
+def test_log_watcher_reports_changed_peers(tmp_path):
+    log = tmp_path / "frr.log"
+    log.write_bytes(ADJ_UP)
+    watcher = bgpmon.bgpmon.FrrLogWatcher(str(log))
+    assert watcher.get_changed_peers() == set()
+    assert not watcher.active
+    with open(str(log), "ab") as fp:
+        fp.write(NOISE + ADJ_UP + ADJ_DOWN[:30])
+    assert watcher.get_changed_peers() == {"10.0.0.1"}
+    assert watcher.active
+    with open(str(log), "ab") as fp:
+        fp.write(ADJ_DOWN[30:] + NOISE)
+    assert watcher.get_changed_peers() == {"fc00::2"}
+    with open(str(log), "ab") as fp:
+        fp.write(NOISE)
+    assert watcher.get_changed_peers() == set()
+
+
+def test_log_watcher_rotation_requires_full_sync(tmp_path):
+    log = tmp_path / "frr.log"
+    log.write_bytes(NOISE * 10)
+    watcher = bgpmon.bgpmon.FrrLogWatcher(str(log))
+    log.write_bytes(ADJ_UP)
+    assert watcher.get_changed_peers() is None
+    assert watcher.records_lost
+    assert watcher.get_changed_peers() == {"10.0.0.1"}
+    watcher.records_lost = False
+    log.unlink()
+    assert watcher.get_changed_peers() is None
+    assert not watcher.records_lost
+
+
+@patch('bgpmon.bgpmon.LOG_READ_MAX_BYTES', 64)
+def test_log_watcher_skips_large_chunks(tmp_path):
+    log = tmp_path / "frr.log"
+    log.write_bytes(b"")
+    watcher = bgpmon.bgpmon.FrrLogWatcher(str(log))
+    log.write_bytes(NOISE * 10)
+    assert watcher.get_changed_peers() is None
+    assert watcher.get_changed_peers() == set()
+    assert watcher.records_lost
+
+
+def test_is_full_sync_required():
+    interval = bgpmon.bgpmon.FULL_SYNC_INTERVAL
+    assert interval <= bgpmon.bgpmon.POLL_INTERVAL
+    # adjacency changes are handled per neighbor
+    assert not bgpmon.bgpmon.is_full_sync_required({"10.0.0.1"}, 1, True)
+    assert not bgpmon.bgpmon.is_full_sync_required(set(), interval, False)
+    assert bgpmon.bgpmon.is_full_sync_required(set(), interval, True)
+    assert not bgpmon.bgpmon.is_full_sync_required(None, 1, True)
+    assert bgpmon.bgpmon.is_full_sync_required(None, interval, False)
+    # lost records are not resynced more often than the polling mode
+    assert not bgpmon.bgpmon.is_full_sync_required(set(), 1, True, records_lost=True)
+    assert bgpmon.bgpmon.is_full_sync_required(set(), interval, False, records_lost=True)
+
+
+def neighbor_output(peer, state, remote_as=65100, local_as=65000):
+    return (0, json.dumps({peer: {"bgpState": state, "remoteAs": remote_as, "localAs": local_as}}))
+
+
+def test_update_changed_neigh_states(bgp_mon):
+    bgp_mon.peer_l = {"10.0.0.1", "10.0.0.2"}
+    bgp_mon.peer_state = {"10.0.0.1": "Established", "10.0.0.2": "Established"}
+    bgp_mon.flush_pipe = MagicMock()
+    outputs = {"10.0.0.1": neighbor_output("10.0.0.1", "Active"),
+               "10.0.0.2": neighbor_output("10.0.0.2", "Established", 65000, 65000)}
+    with patch('bgpmon.bgpmon.getstatusoutput_noshell', side_effect=lambda cmd: outputs[cmd[-1].split()[3]]) as mocked_cmd:
+        assert bgp_mon.update_changed_neigh_states({"10.0.0.1", "10.0.0.2"})
+    assert sorted(c.args[0][-1] for c in mocked_cmd.call_args_list) == \
+        ["show bgp neighbors 10.0.0.1 json", "show bgp neighbors 10.0.0.2 json"]
+    bgp_mon.flush_pipe.assert_called_once_with({"NEIGH_STATE_TABLE|10.0.0.1": {'state': 'Active', 'peerType': 'e-BGP'}})
+    assert bgp_mon.peer_state == {"10.0.0.1": "Active", "10.0.0.2": "Established"}
+
+    # a new neighbor, an Idle neighbor or a failure needs the full summary, nothing is updated
+    bgp_mon.flush_pipe.reset_mock()
+    with patch('bgpmon.bgpmon.getstatusoutput_noshell') as mocked_cmd:
+        assert not bgp_mon.update_changed_neigh_states({"10.0.0.3"})
+        mocked_cmd.assert_not_called()
+        mocked_cmd.return_value = neighbor_output("10.0.0.1", "Idle")
+        assert not bgp_mon.update_changed_neigh_states({"10.0.0.1"})
+        mocked_cmd.return_value = (1, "")
+        assert not bgp_mon.update_changed_neigh_states({"10.0.0.1"})
+        mocked_cmd.return_value = (0, "{}")
+        assert not bgp_mon.update_changed_neigh_states({"10.0.0.1"})
+    bgp_mon.flush_pipe.assert_not_called()
+    assert bgp_mon.peer_state == {"10.0.0.1": "Active", "10.0.0.2": "Established"}
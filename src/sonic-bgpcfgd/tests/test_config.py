@@ -1,6 +1,6 @@
 from unittest.mock import MagicMock
 
-from bgpcfgd.config import ConfigMgr
+from bgpcfgd.config import ConfigIndex, ConfigMgr
 
 
 def test_constructor():
@@ -115,6 +115,141 @@ def test_restart_get_text():
     c.update()
     assert c.get_text() == [' text1', ' text2', ' text3', ' text4', '    ', '     ']
 
+def test_update_reads_config_once_per_event():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "router bgp 65100\n neighbor PEER_V4 peer-group\n")
+    c = ConfigMgr(frr)
+    c.update()
+    index = c.get_index()
+    assert index.get_peer_groups() == {"PEER_V4"}
+    c.update()
+    assert frr.get_config.call_count == 1
+    assert c.get_index() is index
+    # The event is over: the config is read again, but the same text is not parsed again
+    assert c.commit()
+    c.to_canonical = MagicMock()
+    c.update()
+    assert frr.get_config.call_count == 2
+    assert not c.to_canonical.called
+    assert c.get_index() is index
+    # The config was changed with vtysh
+    del c.to_canonical
+    frr.get_config = MagicMock(return_value = "router bgp 65100\n neighbor PEER_V6 peer-group\n")
+    assert c.commit()
+    c.update()
+    assert frr.get_config.call_count == 1
+    assert c.get_index().get_peer_groups() == {"PEER_V6"}
+
+def test_commit_resets_index():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value = "router bgp 65100\n neighbor PEER_V4 peer-group\n")
+    c = ConfigMgr(frr)
+    c.update()
+    c.push("no neighbor PEER_V4 peer-group")
+    c.commit()
+    assert c.current_config_hash is None
+    assert c.get_index().get_peer_groups() == set()
+
+def test_config_index():
+    index = ConfigIndex([
+        'router bgp 64601',
+        ' neighbor PEER_V4 peer-group',
+        ' neighbor PEER_V6 peer-group',
+        ' neighbor 10.0.0.1 peer-group PEER_V4',
+        ' address-family ipv4 unicast',
+        '  neighbor PEER_V4 route-map FROM_BGP_PEER_V4 in',
+        '  neighbor PEER_V4 route-map TO_BGP_PEER_V4 out',
+        '  neighbor 10.0.0.1 route-map RM_PEER in',
+        ' exit-address-family',
+        'bgp community-list standard COMMUNITY_1 permit 1010:2020',
+        'ip prefix-list PL_V4 seq 10 deny 0.0.0.0/0 le 17',
+        'ip prefix-list PL_V4 seq 20 permit 20.20.30.0/24 le 32',
+        'ipv6 prefix-list PL_V6 seq 10 deny ::/0 le 59',
+        'route-map FROM_BGP_PEER_V4 permit 100',
+        'route-map FROM_BGP_PEER_V4 permit 2',
+        ' call ALLOW_LIST_DEPLOYMENT_ID_0_V4',
+        ' on-match next',
+        'route-map TO_BGP_PEER_V4 permit 100',
+    ])
+    assert index.get_peer_groups() == {"PEER_V4", "PEER_V6"}
+    assert index.route_maps == {"FROM_BGP_PEER_V4", "TO_BGP_PEER_V4"}
+    assert index.get_peer_group_to_route_map(["PEER_V4", "PEER_V6"]) == {"PEER_V4": "FROM_BGP_PEER_V4"}
+    assert index.get_route_map_calls({"FROM_BGP_PEER_V4", "TO_BGP_PEER_V4"}) == {"FROM_BGP_PEER_V4": "ALLOW_LIST_DEPLOYMENT_ID_0_V4"}
+    assert index.get_prefix_list("ip", "PL_V4") == ["deny 0.0.0.0/0 le 17", "permit 20.20.30.0/24 le 32"]
+    assert index.get_prefix_list("ipv6", "PL_V6") == ["deny ::/0 le 59"]
+    assert index.get_prefix_list("ipv6", "PL_V4") is None
+    assert index.get_community("COMMUNITY_1") == "1010:2020"
+    assert index.get_community("COMMUNITY_2") is None
+
+def test_push_entity():
+    frr = MagicMock()
+    frr.write = MagicMock(return_value = True)
+    c = ConfigMgr(frr)
+    assert c.push_entity("pg", "router bgp 1\n neighbor PEER_V4 peer-group")
+    assert not c.push_entity("pg", "router bgp 1\n neighbor PEER_V4 peer-group")
+    assert c.changes == "router bgp 1\n neighbor PEER_V4 peer-group\n"
+    assert c.commit()
+    assert not c.push_entity("pg", "router bgp 1\n neighbor PEER_V4 peer-group")
+    assert c.changes == ""
+    assert c.push_entity("pg", "router bgp 1\n neighbor PEER_V6 peer-group")
+    assert c.commit()
+    c.forget_entity("pg")
+    assert c.push_entity("pg", "router bgp 1\n neighbor PEER_V6 peer-group")
+
+def test_push_entity_missing_in_frr():
+    frr = MagicMock()
+    frr.write = MagicMock(return_value = True)
+    pg = "router bgp 1\n neighbor PEER_V4 peer-group"
+    policy = "route-map FROM_BGP_PEER_V4 permit 100\n!\nroute-map TO_BGP_PEER_V4 deny 10"
+    c = ConfigMgr(frr)
+    assert c.push_entity("pg", pg)
+    assert c.push_entity("policy", policy)
+    assert c.commit()
+    frr.get_config = MagicMock(return_value = "router bgp 1\n neighbor PEER_V4 peer-group\n"
+                                              "route-map FROM_BGP_PEER_V4 permit 100\n"
+                                              "route-map TO_BGP_PEER_V4 deny 10\n")
+    c.update()
+    assert not c.push_entity("pg", pg)
+    assert not c.push_entity("policy", policy)
+    # The peer-group and a route-map were removed outside of bgpcfgd
+    frr.get_config = MagicMock(return_value = "router bgp 1\n"
+                                              "route-map FROM_BGP_PEER_V4 permit 100\n")
+    c.reset()
+    c.update()
+    assert c.push_entity("pg", pg)
+    assert c.push_entity("policy", policy)
+
+def test_push_entity_verified_on_timer():
+    frr = MagicMock()
+    frr.write = MagicMock(return_value = True)
+    pg = "router bgp 1\n neighbor PEER_V4 peer-group"
+    c = ConfigMgr(frr)
+    assert c.push_entity("pg", pg)
+    assert c.commit()
+    # FRR config is not read to skip an entity which was checked recently
+    assert not c.push_entity("pg", pg)
+    assert not frr.get_config.called
+    # The peer-group was removed outside of bgpcfgd
+    frr.get_config = MagicMock(return_value = "router bgp 1\n")
+    c.verified_time -= ConfigMgr.ENTITY_VERIFY_INTERVAL
+    assert c.push_entity("pg", pg)
+    assert frr.get_config.call_count == 1
+    assert c.commit()
+    frr.get_config = MagicMock(return_value = "router bgp 1\n neighbor PEER_V4 peer-group\n")
+    c.verified_time -= ConfigMgr.ENTITY_VERIFY_INTERVAL
+    assert not c.push_entity("pg", pg)
+    assert frr.get_config.call_count == 1
+    assert not c.push_entity("pg", pg)
+    assert frr.get_config.call_count == 1
+
+def test_push_entity_commit_failed():
+    frr = MagicMock()
+    frr.write = MagicMock(return_value = False)
+    c = ConfigMgr(frr)
+    assert c.push_entity("policy", "route-map A permit 10")
+    assert not c.commit()
+    assert c.push_entity("policy", "route-map A permit 10")
+
 def to_canonical_common(raw_text, expected_canonical):
     frr = MagicMock()
     c = ConfigMgr(frr)
@@ -55,3 +55,72 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_directory_notify_on_change():
+    directory = Directory()
+    handler_asn = MagicMock()
+    handler_slot = MagicMock()
+    directory.subscribe([("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn")], handler_asn)
+    directory.subscribe([("CONFIG_DB", "DEVICE_METADATA", "")], handler_slot)
+
+    # the path is missing
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "LeafRouter"})
+    assert handler_asn.call_count == 0
+    assert handler_slot.call_count == 1
+
+    # the path appears
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "LeafRouter", "bgp_asn": "65100"})
+    assert handler_asn.call_count == 1
+    assert handler_slot.call_count == 2
+
+    # the same value
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "LeafRouter", "bgp_asn": "65100"})
+    assert handler_asn.call_count == 1
+    assert handler_slot.call_count == 2
+
+    # another field was changed
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "ToRRouter", "bgp_asn": "65100"})
+    assert handler_asn.call_count == 1
+    assert handler_slot.call_count == 3
+
+    # the path value was changed
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "ToRRouter", "bgp_asn": "65200"})
+    assert handler_asn.call_count == 2
+
+    # another key of the slot
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "other", {"bgp_asn": "1"})
+    assert handler_asn.call_count == 2
+    assert handler_slot.call_count == 5
+
+    # the path appears again after removal
+    directory.remove("CONFIG_DB", "DEVICE_METADATA", "localhost")
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "ToRRouter", "bgp_asn": "65200"})
+    assert handler_asn.call_count == 3
+
+def test_directory_notify_dedup():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([
+        ("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn"),
+        ("CONFIG_DB", "DEVICE_METADATA", "localhost/type"),
+    ], handler)
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"type": "LeafRouter", "bgp_asn": "65100"})
+    assert handler.call_count == 1
+
+def test_directory_notify_same_object():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn")], handler)
+    data = {"bgp_asn": "65100"}
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", data)
+    data["bgp_asn"] = "65200"
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", data)
+    assert handler.call_count == 2
+
+def test_directory_unsubscribe():
+    directory = Directory()
+    handler = MagicMock()
+    directory.subscribe([("CONFIG_DB", "SRV6_MY_LOCATORS", "loc1")], handler)
+    directory.unsubscribe([("CONFIG_DB", "SRV6_MY_LOCATORS", "loc1"), ("CONFIG_DB", "SRV6_MY_LOCATORS", "loc2/x")])
+    directory.put("CONFIG_DB", "SRV6_MY_LOCATORS", "loc1", "value")
+    assert handler.call_count == 0
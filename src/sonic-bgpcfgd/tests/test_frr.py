@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import bgpcfgd.frr
 import pytest
 
@@ -58,11 +58,81 @@ def test_restart_peer_groups():
 @patch('bgpcfgd.frr.log_crit')
 def test_restart_peer_groups_fail(mocked_log_crit):
     return_value_map = {
-        "['vtysh', '-c', 'clear bgp peer-group pg_1 soft in']": (0, "", ""),
-        "['vtysh', '-c', 'clear bgp peer-group pg_2 soft in']": (1, "some output", "some error")
+        "['vtysh', '-c', 'clear bgp peer-group pg_1 soft in', '-c', 'clear bgp peer-group pg_2 soft in']": (1, "some output", "some error")
     }
     bgpcfgd.frr.run_command = lambda cmd: return_value_map[str(cmd)]
     f = bgpcfgd.frr.FRR(["abc", "cde"])
-    res = f.restart_peer_groups(["pg_1", "pg_2"])
+    res = f.restart_peer_groups(["pg_2", "pg_1"])
     assert not res, "Expect False return value"
-    mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+    mocked_log_crit.assert_called_with("Can't restart bgp peer-groups 'pg_1, pg_2'. rc='1', out='some output', err='some error'")
+
+def test_restart_peer_groups_one_command():
+    commands = []
+    def run_command(cmd):
+        commands.append(cmd)
+        return 0, "", ""
+    bgpcfgd.frr.run_command = run_command
+    f = bgpcfgd.frr.FRR(["abc", "cde"])
+    assert f.restart_peer_groups(["pg_1", "pg_2", "pg_1"])
+    assert commands == [["vtysh", "-c", "clear bgp peer-group pg_1 soft in", "-c", "clear bgp peer-group pg_2 soft in"]]
+
+def test_restart_peer_groups_empty():
+    bgpcfgd.frr.run_command = MagicMock()
+    f = bgpcfgd.frr.FRR(["abc", "cde"])
+    assert f.restart_peer_groups([])
+    bgpcfgd.frr.run_command.assert_not_called()
+
+def test_write_counters():
+    bgpcfgd.frr.run_command = lambda cmd: (1, "some output", "some error")
+    f = bgpcfgd.frr.FRR(["abc", "cde"])
+    f.write("config context")
+    bgpcfgd.frr.run_command = lambda cmd: (0, "some output", "")
+    f.write("config context")
+    counters = f.get_counters()
+    assert counters["commits"] == 2
+    assert counters["failures"] == 1
+    assert counters["max_latency_ms"] >= counters["last_latency_ms"] >= 0.0
+
+def test_write_session():
+    bgpcfgd.frr.run_command = MagicMock()
+    f = bgpcfgd.frr.FRR(["abc", "cde"], use_session=True)
+    f.session.execute = MagicMock(return_value=(True, ""))
+    assert f.write("router bgp 65100\n no neighbor 10.0.0.1")
+    f.session.execute.assert_called_with(["router bgp 65100", " no neighbor 10.0.0.1"], True)
+    bgpcfgd.frr.run_command.assert_not_called()
+
+def test_restart_peer_groups_session():
+    bgpcfgd.frr.run_command = MagicMock()
+    f = bgpcfgd.frr.FRR(["abc", "cde"], use_session=True)
+    f.session.execute = MagicMock(return_value=(True, ""))
+    assert f.restart_peer_groups(["pg_2", "pg_1"])
+    f.session.execute.assert_called_with(["clear bgp peer-group pg_1 soft in", "clear bgp peer-group pg_2 soft in"], False)
+    bgpcfgd.frr.run_command.assert_not_called()
+
+def test_write_session_fallback():
+    bgpcfgd.frr.run_command = lambda cmd: (0, "some output", "")
+    f = bgpcfgd.frr.FRR(["abc", "cde"], use_session=True)
+    f.session.execute = MagicMock(side_effect=RuntimeError("vtysh session was closed unexpectedly"))
+    assert f.write("config context")
+    assert f.get_counters()["session_fallbacks"] == 1
+
+def test_vtysh_session_execute():
+    s = bgpcfgd.frr.VtyshSession(timeout=5)
+    s.COMMAND = ["sh", "-c", "while read line; do case \"$line\" in echo*) echo \"${line#echo }\";; *bad*) echo \"% Unknown command: $line\";; esac; done"]
+    try:
+        res, out = s.execute(["router bgp 65100"], True)
+        assert res
+        assert out == ""
+        res, out = s.execute(["bad command"], True)
+        assert not res
+        assert out == "% Unknown command: bad command\n"
+    finally:
+        s.close()
+    assert not s.is_alive()
+
+def test_vtysh_session_closed():
+    s = bgpcfgd.frr.VtyshSession(timeout=5)
+    s.COMMAND = ["true"]
+    with pytest.raises((OSError, RuntimeError)):
+        s.execute(["router bgp 65100"], True)
+    s.close()
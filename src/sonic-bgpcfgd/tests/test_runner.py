@@ -0,0 +1,122 @@
+from unittest.mock import MagicMock, patch
+from collections import OrderedDict
+
+from . import swsscommon_test
+
+import sys
+sys.modules["swsscommon"] = swsscommon_test
+
+import bgpcfgd.runner
+from bgpcfgd.runner import Runner
+
+
+def get_swsscommon_mock():
+    mock = MagicMock(SET_COMMAND="SET", DEL_COMMAND="DEL")
+    mock.SonicDBConfig.getDbId = lambda db_name: {"CONFIG_DB": 4, "STATE_DB": 6}[db_name]
+    return mock
+
+def get_manager(db_name, table_name):
+    manager = MagicMock()
+    manager.get_database.return_value = db_name
+    manager.get_table_name.return_value = table_name
+    return manager
+
+@patch('bgpcfgd.runner.swsscommon', get_swsscommon_mock())
+def test_coalesce():
+    batch = OrderedDict()
+    Runner.coalesce(batch, (4, "T", "a"), "SET", {"f": "1"})
+    Runner.coalesce(batch, (4, "T", "b"), "SET", {"f": "1"})
+    Runner.coalesce(batch, (4, "T", "a"), "SET", {"f": "2"})
+    assert list(batch.items()) == [((4, "T", "a"), [("SET", {"f": "2"})]), ((4, "T", "b"), [("SET", {"f": "1"})])]
+    Runner.coalesce(batch, (4, "T", "a"), "DEL", {})
+    assert batch[(4, "T", "a")] == [("DEL", {})]
+    Runner.coalesce(batch, (4, "T", "a"), "SET", {"f": "3"})
+    Runner.coalesce(batch, (4, "T", "a"), "SET", {"f": "4"})
+    assert batch[(4, "T", "a")] == [("DEL", {}), ("SET", {"f": "4"})]
+    assert list(batch) == [(4, "T", "a"), (4, "T", "b")]
+
+@patch('bgpcfgd.runner.swsscommon', get_swsscommon_mock())
+def test_run_batched():
+    cfg_mgr = MagicMock()
+    cfg_mgr.commit.return_value = True
+    runner = Runner(cfg_mgr, batch_size=500, batch_window_ms=50)
+    subscribers = {}
+    def subscriber_state_table(conn, table_name):
+        subscriber = MagicMock()
+        subscriber.getFd.return_value = len(subscribers) + 10
+        subscriber.getTableName.return_value = table_name
+        subscriber.getDbConnector.return_value.getDbId.return_value = 4
+        subscribers[table_name] = subscriber
+        return subscriber
+    bgpcfgd.runner.swsscommon.SubscriberStateTable = subscriber_state_table
+    m_neigh = get_manager("CONFIG_DB", "BGP_NEIGHBOR")
+    m_meta = get_manager("CONFIG_DB", "DEVICE_METADATA")
+    runner.add_manager(m_neigh)
+    runner.add_manager(m_meta)
+    subscribers["BGP_NEIGHBOR"].pops.return_value = [
+        ("10.0.0.1", "SET", (("asn", "65100"),)),
+        ("10.0.0.2", "SET", (("asn", "65101"),)),
+        ("10.0.0.1", "SET", (("asn", "65102"),)),
+    ]
+    subscribers["DEVICE_METADATA"].pops.return_value = [("localhost", "SET", (("bgp_asn", "65000"),))]
+    selector = runner.selector
+    selector.TIMEOUT, selector.ERROR = "TIMEOUT", "ERROR"
+    neigh_selectable = MagicMock()
+    neigh_selectable.getFd.return_value = subscribers["BGP_NEIGHBOR"].getFd()
+    meta_selectable = MagicMock()
+    meta_selectable.getFd.return_value = subscribers["DEVICE_METADATA"].getFd()
+    results = [("OBJECT", neigh_selectable), ("OBJECT", meta_selectable), ("TIMEOUT", None)]
+    def select(timeout):
+        if not results:
+            bgpcfgd.runner.g_run = False
+            return "TIMEOUT", None
+        return results.pop(0)
+    selector.select = select
+    try:
+        runner.run()
+    finally:
+        bgpcfgd.runner.g_run = True
+    m_neigh.handler.assert_any_call("10.0.0.1", "SET", {"asn": "65102"})
+    m_neigh.handler.assert_any_call("10.0.0.2", "SET", {"asn": "65101"})
+    assert m_neigh.handler.call_count == 2
+    m_meta.handler.assert_called_once_with("localhost", "SET", {"bgp_asn": "65000"})
+    cfg_mgr.commit.assert_called_once()
+    metrics = runner.get_metrics()
+    assert metrics["batches"] == 1
+    assert metrics["events"] == 4
+    assert metrics["dispatched"] == 3
+    assert metrics["max_batch_size"] == 4
+
+@patch('bgpcfgd.runner.swsscommon', get_swsscommon_mock())
+def test_run_batched_size_limit():
+    cfg_mgr = MagicMock()
+    cfg_mgr.commit.return_value = True
+    runner = Runner(cfg_mgr, batch_size=2, batch_window_ms=1000)
+    subscriber = MagicMock()
+    subscriber.getFd.return_value = 10
+    subscriber.getTableName.return_value = "STATIC_ROUTE"
+    subscriber.getDbConnector.return_value.getDbId.return_value = 4
+    bgpcfgd.runner.swsscommon.SubscriberStateTable = MagicMock(return_value=subscriber)
+    manager = get_manager("CONFIG_DB", "STATIC_ROUTE")
+    runner.add_manager(manager)
+    subscriber.pops.side_effect = [
+        [("10.1.0.0/24", "SET", ()), ("10.2.0.0/24", "SET", ())],
+        [("10.3.0.0/24", "SET", ())],
+    ]
+    selectable = MagicMock()
+    selectable.getFd.return_value = 10
+    results = [("OBJECT", selectable), ("OBJECT", selectable)]
+    def select(timeout):
+        if not results:
+            bgpcfgd.runner.g_run = False
+            return "TIMEOUT", None
+        return results.pop(0)
+    runner.selector.select = select
+    runner.selector.TIMEOUT, runner.selector.ERROR = "TIMEOUT", "ERROR"
+    try:
+        runner.run()
+    finally:
+        bgpcfgd.runner.g_run = True
+    assert manager.handler.call_count == 3
+    assert cfg_mgr.commit.call_count == 2
+    assert runner.get_metrics()["batches"] == 2
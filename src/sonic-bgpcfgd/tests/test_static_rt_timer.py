@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+
+import sys
+sys.modules["swsscommon"] = swsscommon_test
+
+from bgpcfgd.static_rt_timer import StaticRouteTimer
+
+
+class FakeCommand(object):
+    def formatHSET(self, key, values):
+        self.args = ("HSET", key, values)
+
+    def formatDEL(self, key):
+        self.args = ("DEL", key)
+
+
+def get_swsscommon_mock():
+    return MagicMock(SET_COMMAND="SET", DEL_COMMAND="DEL", RedisCommand=FakeCommand)
+
+def get_pipe():
+    pipe = MagicMock()
+    pipe.commands = []
+    pipe.push.side_effect = lambda command: pipe.commands.append(command.args)
+    return pipe
+
+@patch('bgpcfgd.static_rt_timer.swsscommon', get_swsscommon_mock())
+def test_expire_only_due_routes():
+    timer = StaticRouteTimer()
+    timer.update_route("10.1.0.0/24", "SET", {"refresh": "true"}, 0)
+    timer.update_route("10.2.0.0/24", "SET", {"refresh": "false"}, 0)
+    timer.update_route("10.3.0.0/24", "SET", {"refresh": "false"}, 100)
+    timer.update_route("10.4.0.0/24", "SET", {"expiry": "false"}, 0)
+    assert timer.get_timeout(0) == StaticRouteTimer.DEFAULT_SLEEP * 1000
+    pipe = get_pipe()
+    assert timer.expire(179, pipe) == (0, 0)
+    pipe.flush.assert_not_called()
+    assert timer.expire(180, pipe) == (1, 1)
+    assert pipe.commands == [("HSET", "STATIC_ROUTE:10.1.0.0/24", {"refresh": "false"}), ("DEL", "STATIC_ROUTE:10.2.0.0/24")]
+    pipe.flush.assert_called_once()
+    assert timer.next_deadline() == 280
+    assert timer.get_timeout(270) == 10000
+    assert set(timer.deadlines) == {"10.1.0.0/24", "10.3.0.0/24"}
+
+@patch('bgpcfgd.static_rt_timer.swsscommon', get_swsscommon_mock())
+def test_refresh_keeps_route():
+    timer = StaticRouteTimer()
+    timer.timer = 10
+    timer.update_route("vrf1:10.1.0.0/24", "SET", {"refresh": "false"}, 0)
+    timer.update_route("vrf1:10.1.0.0/24", "SET", {"refresh": "true"}, 5)
+    pipe = get_pipe()
+    assert timer.expire(10, pipe) == (1, 0)
+    timer.update_route("vrf1:10.1.0.0/24", "SET", {"refresh": "false"}, 10)
+    assert timer.expire(20, pipe) == (0, 1)
+    assert pipe.commands[-1] == ("DEL", "STATIC_ROUTE:vrf1:10.1.0.0/24")
+    assert timer.next_deadline() is None
+
+@patch('bgpcfgd.static_rt_timer.swsscommon', get_swsscommon_mock())
+def test_deleted_route_is_not_expired():
+    timer = StaticRouteTimer()
+    timer.update_route("10.1.0.0/24", "SET", {"refresh": "false"}, 0)
+    timer.update_route("10.1.0.0/24", "DEL", {}, 1)
+    timer.update_route("10.1.0.0/24", "SET", {"refresh": "false"}, 2)
+    pipe = get_pipe()
+    assert timer.expire(180, pipe) == (0, 0)
+    assert timer.expire(182, pipe) == (0, 1)
+    assert timer.heap == []
+
+@patch('bgpcfgd.static_rt_timer.swsscommon', get_swsscommon_mock())
+def test_drain_notifications_before_expire():
+    timer = StaticRouteTimer()
+    timer.update_route("10.1.0.0/24", "SET", {"refresh": "false"}, 0)
+    selector = MagicMock(OBJECT=0, TIMEOUT=1)
+    selector.select.side_effect = [(selector.OBJECT, None), (selector.TIMEOUT, None)]
+    subscriber = MagicMock()
+    subscriber.pops.side_effect = [[], [("10.1.0.0/24", "SET", (("refresh", "true"),))]]
+    timer.drain_notifications(selector, subscriber)
+    assert subscriber.pops.call_count == 2
+    assert timer.refreshed["10.1.0.0/24"]
+    pipe = get_pipe()
+    assert timer.expire(180, pipe) == (1, 0)
+
+@patch('bgpcfgd.static_rt_timer.swsscommon', get_swsscommon_mock())
+def test_set_timer():
+    timer = StaticRouteTimer()
+    timer.db.get.return_value = "30"
+    timer.set_timer()
+    assert timer.get_period() == 30
+    timer.db.get.return_value = "0"
+    timer.set_timer()
+    assert timer.get_period() == 30
+    timer.db.get.return_value = None
+    timer.timer = None
+    timer.set_timer()
+    assert timer.get_period() == StaticRouteTimer.DEFAULT_TIMER
@@ -1,5 +1,6 @@
 import os
 import json
+from unittest.mock import MagicMock
 
 
 from bgpcfgd.template import TemplateFabric
@@ -164,3 +165,30 @@ def test_sentinel_pg():
 def test_sentinel_instance():
     test_data = load_tests("sentinels", "instance.conf")
     run_tests("sentinel_instance", *test_data)
+
+def test_render_cache():
+    tf = TemplateFabric(TEMPLATE_PATH)
+    template = tf.from_string("{{ a }} {{ b['x'] }}")
+    template_render = MagicMock(wraps=template.render)
+    template.render = template_render
+    assert tf.render(template, a=1, b={'x': 2, 'y': 3}) == "1 2"
+    assert tf.render(template, b={'y': 3, 'x': 2}, a=1) == "1 2"
+    assert template_render.call_count == 1
+    assert tf.render(template, a=1, b={'x': 4, 'y': 3}) == "1 4"
+    assert template_render.call_count == 2
+    assert tf.kwargs_hash({'a': {('Loopback0', '10.1.0.32/32'): {}}}) != tf.kwargs_hash({'a': {}})
+
+def test_render_cache_used_variables(tmp_path):
+    (tmp_path / "pg.conf.j2").write_text("{{ a }} {% include 'inc.conf.j2' %}")
+    (tmp_path / "inc.conf.j2").write_text("{{ b['x'] }}")
+    tf = TemplateFabric(str(tmp_path))
+    template = tf.from_file("pg.conf.j2")
+    template_render = MagicMock(wraps=template.render)
+    template.render = template_render
+    assert tf.get_template_variables("pg.conf.j2") == {'a', 'b'}
+    # Parameters which the template doesn't use don't change the cache key
+    assert tf.render(template, a=1, b={'x': 2}, neighbor_addr='10.0.0.1') == "1 2"
+    assert tf.render(template, a=1, b={'x': 2}, neighbor_addr='10.0.0.2') == "1 2"
+    assert template_render.call_count == 1
+    assert tf.render(template, a=1, b={'x': 3}, neighbor_addr='10.0.0.2') == "1 3"
+    assert template_render.call_count == 2
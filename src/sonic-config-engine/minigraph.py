@@ -1,12 +1,15 @@
 from __future__ import print_function
 
+import hashlib
 import ipaddress
 import math
 import os
+import pickle
 import sys
 import json
 import jinja2
 import subprocess
+import tempfile
 from collections import defaultdict
 
 
@@ -1959,12 +1962,133 @@ def update_forced_mgmt_route(mgmt_intf, mgmt_routes):
         if len(forced_mgmt_routes) > 0:
             mgmt_intf[mgmt_intf_key]['forced_mgmt_routes'] = forced_mgmt_routes
 
+###############################################################################
+#
+# Document index and parse cache
+#
+###############################################################################
+
+# Version of the cached parse_xml() results. Bump it when the format of the results changes
+PARSE_CACHE_VERSION = 2
+
+_qnames = {}
+
+def qname(namespace, tag):
+    """ Return the qualified tag name. Names are built once per process """
+    key = (namespace, tag)
+    if key not in _qnames:
+        _qnames[key] = str(QName(namespace, tag))
+    return _qnames[key]
+
+class MinigraphDocument(object):
+    """ Minigraph xml file parsed once and shared by all the parse_* entry points """
+    def __init__(self, content, file_stat):
+        self.digest = hashlib.sha256(content).hexdigest()
+        self.file_stat = file_stat
+        self.root = ET.fromstring(content)
+        # top level elements by tag
+        self.sections = {}
+        for child in self.root:
+            self.sections.setdefault(child.tag, child)
+
+    def section(self, namespace, tag):
+        """ Return the top level element with the tag, None if the document doesn't have it """
+        return self.sections.get(qname(namespace, tag))
+
+_documents = {}
+
+def get_document(filename):
+    """ Return the parsed minigraph document.
+    The file is parsed again only if it was modified since the previous call.
+
+    Keyword arguments:
+    filename -- minigraph file name
+    """
+    path = os.path.realpath(filename)
+    st = os.stat(path)
+    file_stat = (st.st_ino, st.st_size, st.st_mtime)
+    document = _documents.get(path)
+    if document is not None and document.file_stat == file_stat:
+        return document
+    with open(path, 'rb') as f:
+        content = f.read()
+    if document is None or document.digest != hashlib.sha256(content).hexdigest():
+        document = MinigraphDocument(content, file_stat)
+    document.file_stat = file_stat
+    _documents[path] = document
+    return document
+
+def _file_digest(filename):
+    if filename is None or not os.path.isfile(filename):
+        return None
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _get_dns_template_file():
+    if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
+        return os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
+    return "/usr/share/sonic/templates/dns.j2"
+
+def _read_parse_inputs(root, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file):
+    """ Read everything _parse_xml() needs besides the minigraph document.
+    Without a port config file the port and fabric configuration come from CONFIG_DB or from the files
+    found by platform and hwsku, so they are read on every call and the parse cache is keyed by their values.
+    """
+    hwsku = parse_global_info(root)[0]
+    dns_template = None
+    dns_conf = _get_dns_template_file()
+    if os.path.isfile(dns_conf):
+        with open(dns_conf) as template_file:
+            dns_template = template_file.read()
+    return {
+        'port_config': get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file),
+        'fabric_monitor': get_fabric_monitor_config(hwsku=hwsku, asic_name=asic_name),
+        'fabric_ports': get_fabric_port_config(hwsku=hwsku, platform=platform, fabric_port_config_file=fabric_port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file),
+        'dns_template': dns_template,
+    }
+
+def _get_parse_cache_file(cache_dir, document, args, inputs):
+    """ Return the name of the file with the cached results of parse_xml(), None if the cache can't be used.
+    The key covers the minigraph content, the arguments, the content of the files given as arguments,
+    the values read by _read_parse_inputs() and the parser code itself.
+    """
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o755)
+        # cached results are unpickled, never trust a directory which anybody can write into
+        if not os.access(cache_dir, os.W_OK) or os.stat(cache_dir).st_mode & 0o022:
+            return None
+        parser_files = [os.path.abspath(__file__), os.path.abspath(sys.modules[get_port_config.__module__].__file__)]
+        key = [PARSE_CACHE_VERSION, document.digest, is_multi_asic(), os.environ.get("CFGGEN_UNIT_TESTING", "")]
+        key += [os.path.getmtime(parser_file) for parser_file in parser_files]
+        key += [(arg, _file_digest(arg)) for arg in args]
+        key.append(json.dumps(inputs, sort_keys=True, default=repr))
+    except (OSError, IOError, TypeError):
+        return None
+    return os.path.join(cache_dir, hashlib.sha256(repr(key).encode()).hexdigest() + '.pickle')
+
+def _load_parse_cache(cache_file):
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def _store_parse_cache(cache_file, entry):
+    try:
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_file, cache_file)
+    except Exception as e:
+        print("Warning: can't store minigraph parse cache '{}': {}".format(cache_file, e), file=sys.stderr)
+
 ###############################################################################
 #
 # Main functions
 #
 ###############################################################################
-def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, fabric_port_config_file=None ):
+def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, fabric_port_config_file=None, cache_dir=None):
     """ Parse minigraph xml file.
 
     Keyword arguments:
@@ -1974,10 +2098,30 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     asic_name -- asic name; to parse multi-asic device minigraph to
     generate asic specific configuration.
     fabric_port_config_file -- fabric port config file name
+    cache_dir -- directory to keep parsed results between runs; no cache if None
      """
+    document = get_document(filename)
+    args = (platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    inputs = _read_parse_inputs(document.root, *args)
+    cache_file = _get_parse_cache_file(cache_dir, document, args, inputs) if cache_dir is not None else None
+    entry = _load_parse_cache(cache_file) if cache_file is not None else None
+    if entry is None:
+        entry = _parse_xml(document.root, inputs, *args)
+        if cache_file is not None:
+            _store_parse_cache(cache_file, entry)
+    else:
+        port_names_map.update(entry['ports'])
+        port_alias_map.update(entry['alias_map'])
+        port_alias_asic_map.update(entry['alias_asic_map'])
+
+    select_mmu_profiles(entry['qos_profile'], platform, entry['hwsku'])
 
-    root = ET.parse(filename).getroot()
+    return entry['results']
 
+def _parse_xml(root, inputs, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file):
+    """ Parse minigraph document with the inputs returned by _read_parse_inputs().
+    Returns the results together with the values which have to be applied again when the results are taken from the cache
+    """
     u_neighbors = None
     u_devices = None
     acls = {}
@@ -2061,7 +2205,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     hwsku, hostname, docker_routing_config_mode, chassis_type, chassis_hostname = parse_global_info(root)
     macsec_enabled = is_chassis_lc_macsec_enabled(root, hostname)
 
-    (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+    (ports, alias_map, alias_asic_map) = inputs['port_config']
 
     asic_hostname = get_asic_hostname_from_asic_name(chassis_type, asic_name, hostname)
 
@@ -2120,8 +2264,6 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
             elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
                 linkmetas = parse_linkmeta(child, chassis_hostname)
 
-    select_mmu_profiles(qos_profile, platform, hwsku)
-    
     # for chassis get the device type from chassis metadata not the asic or linecard type
     if chassis_hostname:
         device_type = devices.get(chassis_hostname, {}).get('type', None)
@@ -2516,12 +2658,12 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     results['CONSOLE_PORT'] = console_ports
 
     # Get the global fabric monitoring data
-    fabric_monitor = get_fabric_monitor_config(hwsku=hwsku, asic_name=asic_name)
+    fabric_monitor = inputs['fabric_monitor']
     if bool( fabric_monitor ):
         results[ 'FABRIC_MONITOR' ] = fabric_monitor
 
     # parse fabric
-    fabric_ports = get_fabric_port_config(hwsku=hwsku, platform=platform, fabric_port_config_file=fabric_port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+    fabric_ports = inputs['fabric_ports']
     if bool( fabric_ports ):
         results['FABRIC_PORT'] = fabric_ports
 
@@ -2646,17 +2788,11 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
         results['NTP_SERVER'] = dict((item, {'iburst': 'on'}) for item in ntp_servers)
         # Set default DNS nameserver from dns.j2
         results['DNS_NAMESERVER'] = {}
-        if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
-            dns_conf = os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
-        else:
-            dns_conf = "/usr/share/sonic/templates/dns.j2"
-        if os.path.isfile(dns_conf):
-            text = ""
-            with open(dns_conf) as template_file:
-                # Semgrep does not allow to use jinja2 directly, but we do need jinja2 for SONiC
-                environment = jinja2.Environment(trim_blocks=True) # nosemgrep
-                dns_template = environment.from_string(template_file.read())
-                text = dns_template.render(results)
+        if inputs['dns_template'] is not None:
+            # Semgrep does not allow to use jinja2 directly, but we do need jinja2 for SONiC
+            environment = jinja2.Environment(trim_blocks=True) # nosemgrep
+            dns_template = environment.from_string(inputs['dns_template'])
+            text = dns_template.render(results)
             try:
                 dns_res = json.loads(text)
             except ValueError as e:
@@ -2743,7 +2879,14 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     if current_device and current_device['type'] in leafrouter_device_types:
         results['DEVICE_METADATA']['localhost']['suppress-fib-pending'] = 'enabled'
 
-    return results
+    return {
+        'results': results,
+        'ports': ports,
+        'alias_map': alias_map,
+        'alias_asic_map': alias_asic_map,
+        'qos_profile': qos_profile,
+        'hwsku': hwsku,
+    }
 
 def get_tunnel_entries(tunnel_intfs, tunnel_intfs_qos_remap_config, lo_intfs, tunnel_qos_remap, mux_tunnel_name, peer_switch_ip):
     lo_addr = ''
@@ -2853,7 +2996,7 @@ def get_mux_cable_entries(ports, mux_cable_ports, active_active_ports, neighbors
 
 
 def parse_device_desc_xml(filename):
-    root = ET.parse(filename).getroot()
+    root = get_document(filename).root
     (lo_prefix, lo_prefix_v6, mgmt_prefix, mgmt_prefix_v6, hostname, hwsku, d_type, _, _, _, _) = parse_device(root)
 
     results = {}
@@ -2890,34 +3033,30 @@ def parse_hostname(filename):
     hostName = None
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    hostname_qn = QName(ns, "Hostname")
-    for child in root:
-        if child.tag == str(hostname_qn):
-            hostName = child.text
-            break
+    hostname = get_document(filename).section(ns, "Hostname")
+    if hostname is not None:
+        hostName = hostname.text
 
     return hostName
 
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
-    for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
-            return sub_role
+    metadata = get_document(filename).section(ns, "MetadataDeclaration")
+    if metadata is not None:
+        sub_role, _, _, _, _, _= parse_asic_meta(metadata, asic_name)
+        return sub_role
 
 def parse_asic_switch_type(filename, asic_name, hostname):
     if os.path.isfile(filename):
-        root = ET.parse(filename).getroot()
-        switch_type, _ = get_chassis_type_and_hostname(root, hostname)
+        document = get_document(filename)
+        switch_type, _ = get_chassis_type_and_hostname(document.root, hostname)
         if switch_type:
             return switch_type
-        for child in root:
-            if child.tag == str(QName(ns, "MetadataDeclaration")):
-                _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
-                return switch_type
+        metadata = document.section(ns, "MetadataDeclaration")
+        if metadata is not None:
+            _, _, switch_type, _, _, _ = parse_asic_meta(metadata, asic_name)
+            return switch_type
     return None
 
 def parse_asic_meta_get_devices(root):
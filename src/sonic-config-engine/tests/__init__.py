@@ -0,0 +1,9 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# sonic-cfggen run by the tests keeps its caches here instead of /var/cache/sonic-cfggen
+_cache_dir = tempfile.mkdtemp()
+os.environ['SONIC_CFGGEN_CACHE_DIR'] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, True)
@@ -1,6 +1,11 @@
 import json
+import socket
+import stat
+import shutil
 import subprocess
 import os
+import tempfile
+import time
 import tests.common_utils as utils
 
 from unittest import TestCase
@@ -203,6 +208,117 @@ class TestCfgGen(TestCase):
         with open(self.output2_file) as tf:
             self.assertEqual(tf.read().strip(), 'value')
 
+    def test_template_manifest_mode(self):
+        manifest_file = os.path.join(self.test_dir, 'templates.manifest')
+        with open(manifest_file, 'w') as mf:
+            mf.write('# templates to render\n')
+            mf.write(os.path.join(self.test_dir, 'test.j2') + ',' + self.output_file + '\n\n')
+            mf.write(os.path.join(self.test_dir, 'test2.j2') + ',' + self.output2_file + '\n')
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml')]
+        argument += ['-a', '{"key1":"value"}']
+        argument += ['--manifest', manifest_file]
+        try:
+            self.run_script(argument)
+        finally:
+            os.remove(manifest_file)
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value1\nvalue2')
+        with open(self.output2_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value')
+
+    def test_template_manifest_mode_same_name(self):
+        # templates with the same name in different directories must not collide
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            manifest_file = os.path.join(tmp_dir, 'templates.manifest')
+            with open(manifest_file, 'w') as mf:
+                for idx, output_file in enumerate([self.output_file, self.output2_file]):
+                    template_dir = os.path.join(tmp_dir, str(idx))
+                    os.mkdir(template_dir)
+                    with open(os.path.join(template_dir, 'same.j2'), 'w') as tf:
+                        tf.write('%d {{ key1 }}' % idx)
+                    mf.write(os.path.join(template_dir, 'same.j2') + ',' + output_file + '\n')
+            self.run_script(['-a', '{"key1":"value"}', '--manifest', manifest_file])
+        finally:
+            shutil.rmtree(tmp_dir)
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), '0 value')
+        with open(self.output2_file) as tf:
+            self.assertEqual(tf.read().strip(), '1 value')
+
+    def test_template_serve_mode(self):
+        sock_path = os.path.join(self.test_dir, 'cfggen.sock')
+        json_file = os.path.join(self.test_dir, 'cfggen_serve.json')
+        with open(json_file, 'w') as jf:
+            json.dump({'key1': 'value'}, jf)
+        argument = ['-j', json_file, '--serve', sock_path]
+        server = subprocess.Popen(self.script_file + argument)
+        try:
+            for _ in range(100):
+                if os.path.exists(sock_path):
+                    break
+                time.sleep(0.1)
+            self.assertEqual(stat.S_IMODE(os.stat(sock_path).st_mode), 0o600)
+            # invalid data and a client which doesn't read its replies must not stop the server
+            for payload in [b'\xff\xfe\n', b'{"var": "key1"}\n' * 2000]:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.connect(sock_path)
+                    client.sendall(payload)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(sock_path)
+                stream = client.makefile('rw')
+                stream.write(json.dumps({'template': os.path.join(self.test_dir, 'test2.j2'), 'dest': self.output_file}) + '\n')
+                stream.flush()
+                self.assertEqual(json.loads(stream.readline()), {'rc': 0, 'output': ''})
+                stream.write(json.dumps({'var': 'key1'}) + '\n')
+                stream.flush()
+                self.assertEqual(json.loads(stream.readline()), {'rc': 0, 'output': 'value'})
+                # the data is read again from the sources on request
+                with open(json_file, 'w') as jf:
+                    json.dump({'key1': 'value2'}, jf)
+                stream.write(json.dumps({'var': 'key1'}) + '\n')
+                stream.write(json.dumps({'reload': True}) + '\n')
+                stream.write(json.dumps({'var': 'key1'}) + '\n')
+                stream.flush()
+                self.assertEqual(json.loads(stream.readline()), {'rc': 0, 'output': 'value'})
+                self.assertEqual(json.loads(stream.readline()), {'rc': 0, 'output': ''})
+                self.assertEqual(json.loads(stream.readline()), {'rc': 0, 'output': 'value2'})
+            self.assertIsNone(server.poll())
+        finally:
+            server.kill()
+            server.wait()
+            for path in [sock_path, json_file]:
+                if os.path.exists(path):
+                    os.remove(path)
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value')
+
+    def test_template_bytecode_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        argument = ['-a', '{"key1":"value"}', '-t', os.path.join(self.test_dir, 'test2.j2')]
+        env = dict(os.environ, SONIC_CFGGEN_CACHE_DIR=cache_dir)
+        try:
+            # a directory which other users can write into is not used
+            os.chmod(cache_dir, 0o777)
+            output = subprocess.check_output(self.script_file + argument, env=env)
+            self.assertEqual(output.decode().strip(), 'value')
+            self.assertEqual(os.listdir(cache_dir), [])
+            os.chmod(cache_dir, 0o755)
+            for _ in range(2):
+                output = subprocess.check_output(self.script_file + argument, env=env)
+                self.assertEqual(output.decode().strip(), 'value')
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_profile_startup(self):
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml'), '-t', os.path.join(self.test_dir, 'test.j2'), '--profile-startup']
+        output = self.run_script(argument, check_stderr=True)
+        self.assertIn('value1\nvalue2', output)
+        self.assertIn('import base modules', output)
+        self.assertIn('render templates', output)
+        self.assertNotIn('import minigraph', output)
+
     def test_template_json_batch_mode(self):
         data = {"key1_1":"value1_1", "key1_2":"value1_2", "key2_1":"value2_1", "key2_2":"value2_2"}
         argument = ["-a", '{0}'.format(repr(data).replace('\'', '"'))]
@@ -2,6 +2,8 @@ import json
 import os
 import subprocess
 import ipaddress
+import shutil
+import tempfile
 import tests.common_utils as utils
 import minigraph
 
@@ -612,3 +614,23 @@ class TestCfgGenCaseInsensitive(TestCase):
         # The code picks the first key — just verify it doesn't crash
         first_peer = next(iter(peer_switch_table))
         self.assertIn(first_peer, ["switch2-t0", "switch3-t0"])
+
+    def test_minigraph_document_shared(self):
+        document = minigraph.get_document(self.sample_graph)
+        self.assertIs(minigraph.get_document(self.sample_graph), document)
+        self.assertEqual(minigraph.parse_hostname(self.sample_graph), 'switch-t0')
+        self.assertIsNotNone(document.section(minigraph.ns, 'DpgDec'))
+        self.assertIsNone(document.section(minigraph.ns, 'NoSuchSection'))
+
+    def test_minigraph_parse_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        os.chmod(cache_dir, 0o755)
+        try:
+            expected = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+            result = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            cached = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config, cache_dir=cache_dir)
+            self.assertEqual(result, expected)
+            self.assertEqual(cached, expected)
+        finally:
+            shutil.rmtree(cache_dir)
@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 
+import argparse
 import copy
+import selectors
 import subprocess
 import time
 import syslog
 import os
 from swsscommon.swsscommon import ConfigDBConnector
+from sonic_py_common import redis_bulk
 import socket
 import threading
 import queue
@@ -15,6 +18,7 @@ import logging
 import netaddr
 import io
 import struct
+from collections import OrderedDict
 
 class CachedDataWithOp:
     OP_NONE = 0
@@ -72,8 +76,193 @@ def extract_cmd_daemons(cmd_str):
         daemons = None
     return (daemons, cmd_str)
 
+class VtyReplyScanner:
+    """Streaming parser of FRR vty replies. Every reply is terminated by
+    three NUL bytes followed by the return code byte."""
+    TERMINATOR = b'\0\0\0'
+    def __init__(self):
+        self.buf = bytearray()
+        self.scan_pos = 0
+    def reset(self):
+        self.buf = bytearray()
+        self.scan_pos = 0
+    def feed(self, data):
+        """Add received data and return list of completed (ret_code, reply) tuples"""
+        self.buf += data
+        replies = []
+        while True:
+            idx = self.buf.find(self.TERMINATOR, self.scan_pos)
+            if idx < 0 or idx + len(self.TERMINATOR) >= len(self.buf):
+                # terminator could be split between two reads, re-scan its possible start only
+                self.scan_pos = max(0, len(self.buf) - len(self.TERMINATOR)) if idx < 0 else idx
+                break
+            ret_code = self.buf[idx + len(self.TERMINATOR)]
+            replies.append((ret_code, self.buf[:idx].decode(errors = 'replace')))
+            del self.buf[:idx + len(self.TERMINATOR) + 1]
+            self.scan_pos = 0
+        return replies
+
+class VtyJob:
+    """Command list to be run by one or more FRR daemons. Commands of a job are
+    never interleaved with commands of other jobs on the same daemon."""
+    def __init__(self, commands, daemons, callback = None):
+        self.commands = commands
+        self.daemons = daemons
+        self.replies = {}
+        self.pending = len(daemons)
+        self.callback = callback
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if self.pending == 0:
+            self.__finish()
+    def complete(self, daemon, replies):
+        with self.lock:
+            self.replies[daemon] = replies
+            self.pending -= 1
+            finished = self.pending == 0
+        if finished:
+            self.__finish()
+    def __finish(self):
+        self.done.set()
+        if self.callback is not None:
+            self.callback(self)
+    def get_reply(self, idx):
+        """Return success flag and concatenated reply of all daemons for the command of index idx"""
+        succ = False
+        resp = ''
+        for daemon in self.daemons:
+            ret_code, reply = self.replies.get(daemon, [(None, None)] * len(self.commands))[idx]
+            if ret_code is None:
+                continue
+            if ret_code == 0:
+                succ = True
+            resp += reply
+        return (succ, resp)
+
+class VtyDaemonSession(threading.Thread):
+    """Connection to one FRR daemon with its own job queue. Commands of a job
+    are pipelined: up to PIPELINE_DEPTH commands are sent before their replies
+    are read."""
+    PIPELINE_DEPTH = 16
+    def __init__(self, daemon, sock, connect = None):
+        """connect: function returning a new enabled socket to the daemon, or None if that
+        failed. It replaces the socket once replies of the daemon were lost"""
+        super(VtyDaemonSession, self).__init__(name = 'VTY session to %s' % daemon)
+        self.daemon_name = daemon
+        self.sock = sock
+        self.connect = connect
+        self.scanner = VtyReplyScanner()
+        self.jobs = queue.Queue()
+        self.busy = False
+        self.stats_lock = threading.Lock()
+        self.stats = {'jobs': 0, 'commands': 0, 'failures': 0,
+                      'last_rtt_ms': 0.0, 'max_rtt_ms': 0.0, 'total_rtt_ms': 0.0}
+    def submit(self, job):
+        self.jobs.put(job)
+    def stop(self):
+        self.jobs.put(None)
+        if self.is_alive():
+            self.join()
+        if self.sock is not None:
+            self.sock.close()
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['queue_depth'] = self.jobs.qsize() + (1 if self.busy else 0)
+        return stats
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            self.busy = True
+            start = time.monotonic()
+            replies = self.execute(job.commands)
+            self.__update_stats(len(job.commands), replies, (time.monotonic() - start) * 1000.0)
+            self.busy = False
+            job.complete(self.daemon_name, replies)
+    def execute(self, commands):
+        """Send commands to the daemon and return list of (ret_code, reply), one per command.
+        ret_code is None if the reply was not received"""
+        if self.sock is None:
+            self.__reconnect()
+            if self.sock is None:
+                return [(None, None)] * len(commands)
+        replies = []
+        sent = 0
+        lost = False
+        while len(replies) < len(commands):
+            window = commands[sent:len(replies) + self.PIPELINE_DEPTH]
+            if len(window) > 0:
+                try:
+                    self.sock.sendall(b''.join(bytes(cmd, 'utf-8') + b'\0' for cmd in window))
+                except socket.error as msg:
+                    syslog.syslog(syslog.LOG_ERR, 'failed to send command to frr daemon %s: %s' % (self.daemon_name, msg))
+                    lost = True
+                    break
+                sent += len(window)
+            try:
+                data = self.sock.recv(16384)
+            except socket.timeout:
+                syslog.syslog(syslog.LOG_ERR, 'socket reading timeout from frr daemon %s' % self.daemon_name)
+                lost = True
+                break
+            if not data:
+                syslog.syslog(syslog.LOG_ERR, 'connection to frr daemon %s was closed' % self.daemon_name)
+                lost = True
+                break
+            replies += self.scanner.feed(data)
+        if lost:
+            self.__reconnect()
+        return replies + [(None, None)] * (len(commands) - len(replies))
+    def __reconnect(self):
+        """Replace the socket after a failure. Replies still in flight on the old socket
+        would otherwise be taken as replies to the commands of the next job"""
+        if self.sock is not None:
+            self.sock.close()
+        self.scanner.reset()
+        self.sock = self.connect(self.daemon_name) if self.connect is not None else None
+        if self.sock is None:
+            syslog.syslog(syslog.LOG_ERR, 'failed to reconnect to frr daemon %s' % self.daemon_name)
+    def __update_stats(self, n_commands, replies, rtt_ms):
+        with self.stats_lock:
+            self.stats['jobs'] += 1
+            self.stats['commands'] += n_commands
+            self.stats['failures'] += len([ret_code for ret_code, _ in replies if ret_code != 0])
+            self.stats['last_rtt_ms'] = rtt_ms
+            self.stats['max_rtt_ms'] = max(self.stats['max_rtt_ms'], rtt_ms)
+            self.stats['total_rtt_ms'] += rtt_ms
+        syslog.syslog(syslog.LOG_DEBUG, '[%s] %d commands done in %.3f ms' % (self.daemon_name, n_commands, rtt_ms))
+
+class VtyProxyClient:
+    """Connection of a client to the concurrent proxy. A request is a 4 bytes
+    length in network order followed by the command text."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.in_buf = bytearray()
+        self.out_buf = b''
+    def read(self):
+        """Return request text once it is completely received, '' if more data is expected,
+        None if the client has closed the connection"""
+        data = self.sock.recv(16384)
+        if not data:
+            return None
+        self.in_buf += data
+        if len(self.in_buf) < 4:
+            return ''
+        data_len = struct.unpack('>I', bytes(self.in_buf[:4]))[0]
+        if len(self.in_buf) - 4 < data_len:
+            return ''
+        return self.in_buf[4:4 + data_len].decode(errors = 'replace')
+    def write(self):
+        """Send pending reply data, return True when all of it was sent"""
+        sent = self.sock.send(self.out_buf)
+        self.out_buf = self.out_buf[sent:]
+        return len(self.out_buf) == 0
+
 class BgpdClientMgr(threading.Thread):
     VTYSH_MARK = 'vtysh '
+    PROXY_BACKLOG = 64
     PROXY_SERVER_ADDR = '/etc/frr/bgpd_client_sock'
     ALL_DAEMONS = ['bgpd', 'zebra', 'staticd', 'bfdd', 'ospfd', 'pimd', 'mgmtd']
     TABLE_DAEMON = {
@@ -138,7 +327,7 @@ class BgpdClientMgr(threading.Thread):
                         (r'clear ip igmp($|\s+\S+)', ['pimd']),
                         (r'.*', ['bgpd'])]
     @staticmethod
-    def __create_proxy_socket():
+    def __create_proxy_socket(backlog):
         try:
             os.unlink(BgpdClientMgr.PROXY_SERVER_ADDR)
         except OSError:
@@ -146,38 +335,47 @@ class BgpdClientMgr(threading.Thread):
                 raise
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         sock.bind(BgpdClientMgr.PROXY_SERVER_ADDR)
-        sock.listen(1)
+        sock.listen(backlog)
         return sock
     @staticmethod
     def __get_reply(sock):
-        reply_msg = None
-        ret_code = None
-        msg_buf = io.StringIO()
+        scanner = VtyReplyScanner()
         while True:
             try:
                 rd_msg = sock.recv(16384)
-                msg_buf.write(rd_msg.decode())
             except socket.timeout:
                 syslog.syslog(syslog.LOG_ERR, 'socket reading timeout')
                 break
-            if len(rd_msg) < 4:
-                rd_msg = msg_buf.getvalue()
-                if len(rd_msg) < 4:
-                    continue
-            msg_tail = rd_msg[-4:]
-            if isinstance(msg_tail, str):
-                msg_tail = bytes(msg_tail, 'utf-8')
-            if msg_tail[0] == 0 and msg_tail[1] == 0 and msg_tail[2] == 0:
-                ret_code = msg_tail[3]
-                reply_msg = msg_buf.getvalue()[:-4]
+            if not rd_msg:
+                syslog.syslog(syslog.LOG_ERR, 'connection closed by frr daemon')
                 break
-        msg_buf.close()
-        return (ret_code, reply_msg)
+            replies = scanner.feed(rd_msg)
+            if len(replies) > 0:
+                return replies[0]
+        return (None, None)
     @staticmethod
     def __send_data(sock, data):
         if isinstance(data, str):
             data = bytes(data, 'utf-8')
         sock.sendall(data)
+    @staticmethod
+    def __connect_daemon(daemon):
+        """Open a new connection to daemon and enable it, return None if that failed"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect('/run/frr/%s.vty' % daemon)
+            sock.settimeout(120)
+            BgpdClientMgr.__send_data(sock, 'enable\0')
+        except socket.error as msg:
+            syslog.syslog(syslog.LOG_ERR, 'failed to connect to frr daemon %s: %s' % (daemon, msg))
+            sock.close()
+            return None
+        ret_code, _ = BgpdClientMgr.__get_reply(sock)
+        if ret_code != 0:
+            syslog.syslog(syslog.LOG_ERR, 'enable command to frr daemon %s failed: ret_code=%s' % (daemon, ret_code))
+            sock.close()
+            return None
+        return sock
     def __create_frr_client(self):
         self.client_socks = {}
         for daemon in self.ALL_DAEMONS:
@@ -216,14 +414,29 @@ class BgpdClientMgr(threading.Thread):
                 syslog.syslog(syslog.LOG_ERR, reply)
                 return False
         return True
-    def __init__(self):
+    def __init__(self, concurrent = False):
+        """concurrent: serve many proxy clients on an event loop, and run commands
+        through one session thread per daemon instead of under a single lock"""
         super(BgpdClientMgr, self).__init__(name = 'VTYSH sub-process manager')
         if not self.__create_frr_client():
             syslog.syslog(syslog.LOG_ERR, 'failed to create socket to FRR daemon')
             raise RuntimeError('connect to FRR daemon failed')
         self.proxy_running = True
         self.lock = threading.Lock()
-        self.proxy_sock = self.__create_proxy_socket()
+        self.cmd_count = 0
+        self.job_count = 0
+        self.sessions = {}
+        # commands queued by the thread running a batch, see start_batch()
+        self.batch_thread = None
+        self.batch_daemons = None
+        self.batch_commands = []
+        if concurrent:
+            for daemon, sock in self.client_socks.items():
+                self.sessions[daemon] = VtyDaemonSession(daemon, sock, self.__connect_daemon)
+                self.sessions[daemon].start()
+        self.finished_jobs = queue.Queue()
+        self.wakeup_socks = socket.socketpair()
+        self.proxy_sock = self.__create_proxy_socket(self.PROXY_BACKLOG if concurrent else 1)
         self.cmd_to_daemon = []
         for pat, daemons in self.VTYSH_CMD_DAEMON:
             try:
@@ -297,13 +510,75 @@ class BgpdClientMgr(threading.Thread):
         if daemons is None or len(daemons) == 0:
             syslog.syslog(syslog.LOG_ERR, 'no common daemon list found for given commands')
             return False
+        self.cmd_count += len(cmd_list)
+        if self.batch_thread is threading.current_thread():
+            # jobs of different daemon lists could run out of order, keep one list per job
+            if self.batch_daemons is not None and set(daemons) != set(self.batch_daemons):
+                self.__run_batch()
+            self.batch_daemons = daemons
+            self.batch_commands += [(table, cmd.strip()) for cmd in cmd_list]
+            return True
         ret_val = True
+        if len(self.sessions) > 0:
+            self.job_count += 1
+            job = self.__submit_job([cmd.strip() for cmd in cmd_list], daemons)
+            job.done.wait()
+            for idx in range(len(cmd_list)):
+                succ, _ = job.get_reply(idx)
+                if not succ:
+                    ret_val = False
+            return ret_val
         with self.lock:
             for cmd in cmd_list:
                 succ, _ = self.__proc_command(cmd.strip(), daemons)
                 if not succ:
                     ret_val = False
         return ret_val
+    def start_batch(self):
+        """Queue the vtysh commands of the calling thread until end_batch() and run them as one
+        job per daemon list. Queued commands are reported as successful, a failure is only logged.
+        Only used in concurrent mode"""
+        if len(self.sessions) > 0:
+            self.batch_thread = threading.current_thread()
+    def end_batch(self):
+        """Run the queued commands. Return False if any of them failed"""
+        if self.batch_thread is not threading.current_thread():
+            return True
+        ret_val = self.__run_batch()
+        self.batch_thread = None
+        return ret_val
+    def __run_batch(self):
+        table_cmds = self.batch_commands
+        daemons = self.batch_daemons
+        self.batch_commands = []
+        self.batch_daemons = None
+        if len(table_cmds) == 0:
+            return True
+        self.job_count += 1
+        job = self.__submit_job([cmd for _, cmd in table_cmds], daemons)
+        job.done.wait()
+        ret_val = True
+        for idx, (table, cmd) in enumerate(table_cmds):
+            succ, _ = job.get_reply(idx)
+            if not succ:
+                syslog.syslog(syslog.LOG_ERR, 'batched command execution failure. Table: %s Command: "%s"' % (table, cmd))
+                ret_val = False
+        return ret_val
+    def __submit_job(self, commands, daemons, callback = None):
+        connected = []
+        for daemon in daemons:
+            if daemon in self.sessions:
+                connected.append(daemon)
+            else:
+                syslog.syslog(syslog.LOG_ERR, 'daemon %s is not connected' % daemon)
+        syslog.syslog(syslog.LOG_DEBUG, 'VTYSH CMD: %s daemons: %s' % (commands, connected))
+        job = VtyJob(commands, connected, callback)
+        for daemon in connected:
+            self.sessions[daemon].submit(job)
+        return job
+    def get_stats(self):
+        """Per-daemon queue depth and round trip latency of the concurrent mode"""
+        return {daemon: session.get_stats() for daemon, session in self.sessions.items()}
     @staticmethod
     def __read_all(sock, data_len):
         in_buf = io.StringIO()
@@ -325,10 +600,78 @@ class BgpdClientMgr(threading.Thread):
             finally:
                 sock.close()
             self.join()
+        for _, session in self.sessions.items():
+            session.stop()
         for _, sock in self.client_socks.items():
             sock.close()
+        for sock in self.wakeup_socks:
+            sock.close()
+    def __on_proxy_job_done(self, client, job):
+        # called from daemon session threads, hand the job over to the event loop
+        self.finished_jobs.put((client, job))
+        self.wakeup_socks[1].send(b'\0')
+    def __proxy_request(self, sel, client, in_cmd):
+        daemons, in_cmd = extract_cmd_daemons(in_cmd)
+        in_lines = [line.strip() for line in in_cmd.splitlines()]
+        if daemons is None:
+            daemons = self.__get_cmd_daemons(in_lines)
+        if daemons is None or len(daemons) == 0:
+            syslog.syslog(syslog.LOG_ERR, 'could not find common daemons for input commands')
+            return False
+        sel.unregister(client.sock)
+        self.__submit_job(in_lines, daemons, lambda job: self.__on_proxy_job_done(client, job))
+        return True
+    def __close_proxy_client(self, sel, client):
+        syslog.syslog(syslog.LOG_DEBUG, 'closing data socket from client')
+        try:
+            sel.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+    def __run_event_loop(self):
+        sel = selectors.DefaultSelector()
+        self.proxy_sock.setblocking(False)
+        sel.register(self.proxy_sock, selectors.EVENT_READ)
+        sel.register(self.wakeup_socks[0], selectors.EVENT_READ)
+        while self.proxy_running:
+            for key, mask in sel.select(timeout = 1):
+                if key.fileobj is self.proxy_sock:
+                    try:
+                        conn_sock, _ = self.proxy_sock.accept()
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    if not self.proxy_running:
+                        conn_sock.close()
+                        break
+                    conn_sock.setblocking(False)
+                    sel.register(conn_sock, selectors.EVENT_READ, VtyProxyClient(conn_sock))
+                elif key.fileobj is self.wakeup_socks[0]:
+                    self.wakeup_socks[0].recv(4096)
+                    while not self.finished_jobs.empty():
+                        client, job = self.finished_jobs.get()
+                        client.out_buf = ''.join(job.get_reply(idx)[1] for idx in range(len(job.commands))).encode()
+                        sel.register(client.sock, selectors.EVENT_WRITE, client)
+                else:
+                    client = key.data
+                    try:
+                        if mask & selectors.EVENT_READ:
+                            in_cmd = client.read()
+                            if in_cmd is None or (len(in_cmd) > 0 and not self.__proxy_request(sel, client, in_cmd)):
+                                self.__close_proxy_client(sel, client)
+                        elif client.write():
+                            self.__close_proxy_client(sel, client)
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    except socket.error as msg:
+                        syslog.syslog(syslog.LOG_ERR, 'socket writing failed: %s' % msg)
+                        self.__close_proxy_client(sel, client)
+        sel.close()
     def run(self):
         syslog.syslog(syslog.LOG_DEBUG, 'entering VTYSH proxy thread')
+        if len(self.sessions) > 0:
+            self.__run_event_loop()
+            syslog.syslog(syslog.LOG_DEBUG, 'leaving VTYSH proxy thread')
+            return
         while self.proxy_running:
             syslog.syslog(syslog.LOG_DEBUG, 'waiting for client connection ...')
             conn_sock, clnt_addr = self.proxy_sock.accept()
@@ -536,10 +879,13 @@ class BGPKeyMapInfo:
         return ret_str
 
 class BGPKeyMapList(list):
-    def __init__(self, key_map_list, table_name, table_key = None):
+    def __init__(self, key_map_list, table_name, table_key = None, indexed = False):
+        """indexed: build index from DB field to key map entries, so that only entries referring to
+        changed fields are evaluated by run_command"""
         super(BGPKeyMapList, self).__init__()
         self.table_name = table_name
         self.table_key = table_key
+        self.field_index = None
         for key_map in key_map_list:
             if len(key_map) < 2:
                 continue
@@ -570,6 +916,29 @@ class BGPKeyMapList(list):
                     except ValueError:
                         pass
             super(BGPKeyMapList, self).append((db_field, BGPKeyMapInfo(cmd_str, hdl_func, hdl_data)))
+        if indexed:
+            self.field_index = self.build_field_index()
+    def build_field_index(self):
+        field_index = {}
+        for entry_idx, (db_field, _) in enumerate(self):
+            if type(db_field) is str:
+                db_field = [db_field]
+            for dkey in db_field:
+                for fld_name in dkey.lstrip('+').split('&'):
+                    entry_list = field_index.setdefault(fld_name, [])
+                    if len(entry_list) == 0 or entry_list[-1] != entry_idx:
+                        entry_list.append(entry_idx)
+        return field_index
+    def get_changed_entries(self, data):
+        """Return key map entries which refer to at least one added, updated or deleted field.
+        Entries with unchanged fields only never produce commands"""
+        if self.field_index is None:
+            return self
+        entry_ids = set()
+        for key, val in data.items():
+            if isinstance(val, CachedDataWithOp) and val.op != CachedDataWithOp.OP_NONE:
+                entry_ids.update(self.field_index.get(key, []))
+        return [self[idx] for idx in sorted(entry_ids)]
     def __eq__(self, other):
         return super(BGPKeyMapList, self).__eq__(other) and self.table_name == other.table_name and self.table_key == other.table_key
     def __ne__(self, other):
@@ -656,7 +1025,7 @@ class BGPKeyMapList(list):
         start_idx = len(upper_vals)
         ret_val = False
         run_cmd_cnt = 0
-        for db_field, key_map in self:
+        for db_field, key_map in self.get_changed_entries(data):
             merge_vals = False
             if type(db_field) is not list and type(db_field) is not tuple:
                 db_field = [db_field]
@@ -1504,9 +1873,16 @@ def hdl_admin_status_shutdown_msg(daemon, cmd_str, op, st_idx, args, data):
     return cmd_list
 
 class ExtConfigDBConnector(ConfigDBConnector):
-    def __init__(self, ns_attrs = None):
+    MAX_BATCH_EVENTS = 10000
+    def __init__(self, ns_attrs = None, batch_window_ms = 0):
+        """batch_window_ms: time to collect keyspace events before handling them as one batch.
+        0 means every event is handled as soon as it is received"""
         super(ExtConfigDBConnector, self).__init__()
         self.nosort_attrs = ns_attrs if ns_attrs is not None else {}
+        self.batch_window_ms = batch_window_ms
+        self.batch_stats = {'batches': 0, 'events': 0, 'keys': 0, 'commands': 0, 'jobs': 0,
+                            'last_batch_events': 0, 'last_batch_commands': 0, 'max_batch_events': 0,
+                            'busy_time': 0.0, 'events_per_sec': 0.0}
         self.__listen_thread_running = False
     def raw_to_typed(self, raw_data, table = ''):
         if len(raw_data) == 0:
@@ -1533,6 +1909,116 @@ class ExtConfigDBConnector(ConfigDBConnector):
                 syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
                 logging.exception(e)
 
+    def add_batch_msg(self, batch, msg_item):
+        """Add keyspace event to the batch of changed keys. Return True if the event is for a subscribed table"""
+        if msg_item['type'] != 'pmessage':
+            return False
+        key = msg_item['channel'].split(':', 1)[1]
+        try:
+            (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
+        except ValueError:
+            return False    #Ignore non table-formated redis entries
+        if table not in self.handlers:
+            return False
+        # only the latest content of the key is needed, keep position of its first event
+        batch.setdefault(key, (table, row))
+        return True
+    def get_batch_entries(self, batch):
+        """Read the changed keys of the batch with pipelined HGETALL. If the pipeline is not available
+        or fails, the keys are read one by one and a key which can't be read has None entry"""
+        keys = list(batch)
+        try:
+            client = redis_bulk.get_redis_client(self, self.db_name)
+            if client is not None:
+                return redis_bulk.hgetall_pipelined(client, keys)
+        except Exception as e:
+            syslog.syslog(syslog.LOG_WARNING, '[bgp cfgd] Failed pipelined read of config DB, read entries one by one:%s' % str(e))
+        client = self.get_redis_client(self.db_name)
+        entries = []
+        for key in keys:
+            try:
+                entries.append(client.hgetall(key))
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed reading config DB entry %s with exception:%s' % (key, str(e)))
+                logging.exception(e)
+                entries.append(None)
+        return entries
+    def get_batch_order(self, batch):
+        """Updated entries are handled in table subscription order, so that entries are configured
+        after the ones they depend on. Deleted entries are handled first in reverse table order.
+        A key which can't be read is skipped"""
+        table_order = {table: idx for idx, table in enumerate(self.handlers)}
+        upd_list = []
+        del_list = []
+        for seq, ((table, row), raw_data) in enumerate(zip(batch.values(), self.get_batch_entries(batch))):
+            if raw_data is None:
+                continue
+            data = self.raw_to_typed(raw_data, table)
+            if data is None:
+                del_list.append((-table_order[table], seq, table, row, data))
+            else:
+                upd_list.append((table_order[table], seq, table, row, data))
+        return [entry[2:] for entry in sorted(del_list) + sorted(upd_list)]
+    def dispatch_batch(self, batch, n_events, start_time):
+        """Handle the entries of the batch. The vtysh commands of all handlers are run as one job
+        for each daemon list"""
+        cmd_count = bgpd_client.cmd_count if bgpd_client is not None else 0
+        job_count = bgpd_client.job_count if bgpd_client is not None else 0
+        entries = self.get_batch_order(batch)
+        if bgpd_client is not None:
+            bgpd_client.start_batch()
+        try:
+            for table, row, data in entries:
+                try:
+                    super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
+                except Exception as e:
+                    syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
+                    logging.exception(e)
+        finally:
+            if bgpd_client is not None and not bgpd_client.end_batch():
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Some commands of config DB update batch failed')
+        n_commands = (bgpd_client.cmd_count if bgpd_client is not None else 0) - cmd_count
+        n_jobs = (bgpd_client.job_count if bgpd_client is not None else 0) - job_count
+        self.update_batch_stats(n_events, len(batch), n_commands, n_jobs, time.monotonic() - start_time)
+    def update_batch_stats(self, n_events, n_keys, n_commands, n_jobs, elapsed):
+        stats = self.batch_stats
+        stats['batches'] += 1
+        stats['events'] += n_events
+        stats['keys'] += n_keys
+        stats['commands'] += n_commands
+        stats['jobs'] += n_jobs
+        stats['last_batch_events'] = n_events
+        stats['last_batch_commands'] = n_commands
+        stats['max_batch_events'] = max(stats['max_batch_events'], n_events)
+        stats['busy_time'] += elapsed
+        if stats['busy_time'] > 0:
+            stats['events_per_sec'] = stats['events'] / stats['busy_time']
+        syslog.syslog(syslog.LOG_INFO, '[bgp cfgd] batch #%d: %d events %d keys %d commands %d jobs in %.3f seconds' %
+                      (stats['batches'], n_events, n_keys, n_commands, n_jobs, elapsed))
+    def get_batch_stats(self):
+        stats = dict(self.batch_stats)
+        stats['commands_per_batch'] = (stats['commands'] / stats['batches']) if stats['batches'] > 0 else 0.0
+        return stats
+    def collect_batch(self, msg_item):
+        """Collect keyspace events starting from given one until batch window expires and handle them"""
+        start_time = time.monotonic()
+        deadline = start_time + self.batch_window_ms / 1000.0
+        batch = OrderedDict()
+        n_events = 1 if self.add_batch_msg(batch, msg_item) else 0
+        while self.__listen_thread_running and n_events < self.MAX_BATCH_EVENTS:
+            time_left = deadline - time.monotonic()
+            if time_left <= 0:
+                break
+            msg = self.pubsub.get_message(time_left, True)
+            if msg and self.add_batch_msg(batch, msg):
+                n_events += 1
+        if len(batch) > 0:
+            try:
+                self.dispatch_batch(batch, n_events, start_time)
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update batch with exception:' + str(e))
+                logging.exception(e)
+
     def listen_thread(self, timeout):
         self.__listen_thread_running = True
         sub_key_space = "__keyspace@{}__:*".format(self.get_dbid(self.db_name))
@@ -1540,7 +2026,10 @@ class ExtConfigDBConnector(ConfigDBConnector):
         while self.__listen_thread_running:
             msg = self.pubsub.get_message(timeout, True)
             if msg:
-                self.sub_msg_handler(msg)
+                if self.batch_window_ms > 0:
+                    self.collect_batch(msg)
+                else:
+                    self.sub_msg_handler(msg)
 
         self.pubsub.punsubscribe(sub_key_space)
 
@@ -2153,8 +2642,13 @@ class BGPConfigDaemon:
             pass
         return False
 
-    def __init__(self):
-        self.config_db = ExtConfigDBConnector({'STATIC_ROUTE': {'nexthop', 'ifname', 'distance', 'nexthop-vrf', 'blackhole', 'track'}})
+    def __init__(self, batch_window_ms = 0, diff_engine = True):
+        """diff_engine: keep one indexed key map per table and table key, instead of
+        building a new one and evaluating all of its entries for every update"""
+        self.diff_engine = diff_engine
+        self.key_map_cache = {}
+        self.config_db = ExtConfigDBConnector({'STATIC_ROUTE': {'nexthop', 'ifname', 'distance', 'nexthop-vrf', 'blackhole', 'track'}},
+                                              batch_window_ms)
         try:
             self.config_db.connect()
         except Exception as e:
@@ -2641,6 +3135,16 @@ class BGPConfigDaemon:
 
         return cmd_suffix, None
 
+    def __get_key_map(self, table, tbl_key):
+        if not self.diff_engine:
+            return BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+        cache_key = (table, None if tbl_key is None else tuple(sorted(tbl_key.items())))
+        key_map = self.key_map_cache.get(cache_key)
+        if key_map is None:
+            key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key, True)
+            self.key_map_cache[cache_key] = key_map
+        return key_map
+
     def __update_bgp(self, data_list):
         while not self.bgp_message.empty():
             key, del_table, table, data = self.bgp_message.get()
@@ -2683,7 +3187,7 @@ class BGPConfigDaemon:
                     if new_key is not None:
                         key = new_key
                         tbl_key = {'ip_prefix': ('ipv4' if af_id == socket.AF_INET else 'ipv6')}
-                key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+                key_map = self.__get_key_map(table, tbl_key)
             else:
                 key_map = None
             if table == 'BGP_GLOBALS':
@@ -3972,12 +4476,18 @@ def sig_handler(signum, frame):
 
 def main():
     global bgpd_client
+    parser = argparse.ArgumentParser(description = 'FRR configuration daemon')
+    parser.add_argument('--concurrent-proxy', action = 'store_true',
+                        help = 'serve VTYSH proxy clients concurrently with one command queue per FRR daemon')
+    parser.add_argument('--batch-window-ms', type = int, default = 0,
+                        help = 'collect config DB changes for given milliseconds and apply them as one batch, 0 to disable')
+    args = parser.parse_args()
     for sig_num in [signal.SIGTERM, signal.SIGINT]:
         signal.signal(sig_num, sig_handler)
     syslog.syslog(syslog.LOG_DEBUG, 'entering BGP configuration daemon')
-    bgpd_client = BgpdClientMgr()
+    bgpd_client = BgpdClientMgr(args.concurrent_proxy)
     bgpd_client.start()
-    daemon = BGPConfigDaemon()
+    daemon = BGPConfigDaemon(args.batch_window_ms)
     daemon.start()
     while main_loop:
         signal.pause()
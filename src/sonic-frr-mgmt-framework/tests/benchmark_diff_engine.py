@@ -0,0 +1,76 @@
+"""Replay a BGP config dump through frrcfgd with and without the key map diff engine,
+and compare number of generated FRR commands and wall time.
+
+Usage (from src/sonic-frr-mgmt-framework):
+    python -m tests.benchmark_diff_engine [--neighbors N] [--updates N] [config_db.json]
+
+Without a dump file, a config with one BGP instance and N neighbors is generated.
+After the initial load, the update pass changes a single field of every neighbor.
+"""
+import argparse
+import copy
+import json
+import time
+from unittest.mock import MagicMock, NonCallableMagicMock, patch
+
+swsscommon_module_mock = MagicMock(ConfigDBConnector = NonCallableMagicMock)
+mockmapping = {'swsscommon.swsscommon': swsscommon_module_mock}
+
+def generate_config(n_neighbors):
+    config = {'BGP_GLOBALS': {'default': {'local_asn': '65100', 'router_id': '10.1.0.1',
+                                          'load_balance_mp_relax': 'true', 'graceful_restart_enable': 'true'}},
+              'BGP_GLOBALS_AF': {'default|ipv4_unicast': {'max_ebgp_paths': '64'}},
+              'BGP_NEIGHBOR': {},
+              'BGP_NEIGHBOR_AF': {}}
+    for idx in range(n_neighbors):
+        nbr = '10.%d.%d.%d' % (idx // 65536, (idx // 256) % 256, idx % 256)
+        config['BGP_NEIGHBOR']['default|%s' % nbr] = {'asn': str(64000 + idx % 1000), 'name': 'peer%d' % idx,
+                                                      'local_addr': '10.1.0.1', 'admin_status': 'up',
+                                                      'keepalive': '3', 'holdtime': '9'}
+        config['BGP_NEIGHBOR_AF']['default|%s|ipv4_unicast' % nbr] = {'admin_status': 'true',
+                                                                      'send_community': 'both'}
+    return config
+
+def update_config(config, round_idx):
+    for data in config.get('BGP_NEIGHBOR', {}).values():
+        data['name'] = 'peer-%d-%s' % (round_idx, data.get('asn', ''))
+
+def replay(config, n_updates, diff_engine):
+    from frrcfgd.frrcfgd import BGPConfigDaemon
+    with patch('frrcfgd.frrcfgd.g_run_command') as run_cmd:
+        run_cmd.return_value = True
+        daemon = BGPConfigDaemon(diff_engine = diff_engine)
+        handlers = [(table, hdlr) for table, hdlr in daemon.table_handler_list if table in config]
+        results = []
+        for round_idx in range(n_updates + 1):
+            if round_idx > 0:
+                update_config(config, round_idx)
+            run_cmd.reset_mock()
+            start = time.monotonic()
+            for table, hdlr in handlers:
+                for key, data in config[table].items():
+                    hdlr(table, key, copy.deepcopy(data))
+            results.append((run_cmd.call_count, time.monotonic() - start))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description = 'frrcfgd key map diff engine benchmark')
+    parser.add_argument('dump', nargs = '?', help = 'config DB dump in config_db.json format')
+    parser.add_argument('--neighbors', type = int, default = 2000, help = 'number of generated neighbors')
+    parser.add_argument('--updates', type = int, default = 3, help = 'number of single field update passes')
+    args = parser.parse_args()
+    if args.dump is not None:
+        with open(args.dump) as fp:
+            config = json.load(fp)
+    else:
+        config = generate_config(args.neighbors)
+    with patch.dict('sys.modules', **mockmapping):
+        for diff_engine in [False, True]:
+            results = replay(copy.deepcopy(config), args.updates, diff_engine)
+            print('%-12s' % ('diff engine' if diff_engine else 'full scan'))
+            for round_idx, (n_cmds, elapsed) in enumerate(results):
+                print('  %-10s commands %-8d time %.3f s' % ('load' if round_idx == 0 else 'update %d' % round_idx,
+                                                            n_cmds, elapsed))
+
+if __name__ == '__main__':
+    main()
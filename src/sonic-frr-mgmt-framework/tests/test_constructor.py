@@ -18,6 +18,12 @@ with patch.dict('sys.modules', **mockmapping):
     from frrcfgd.frrcfgd import AggregateAddr
     from frrcfgd.frrcfgd import IpNextHop
     from frrcfgd.frrcfgd import IpNextHopSet
+    from frrcfgd.frrcfgd import VtyReplyScanner
+    from frrcfgd.frrcfgd import VtyJob
+    from frrcfgd.frrcfgd import VtyDaemonSession
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    from frrcfgd.frrcfgd import BgpdClientMgr
+    import frrcfgd.frrcfgd as frrcfgd_module
 
 def test_data_with_op():
     data = CachedDataWithOp()
@@ -286,3 +292,235 @@ def test_nexthop_set():
             test_set.add(IpNextHop(af, bkh_list[idx], ip_list[idx] if af == socket.AF_INET else ip6_list[idx],
                                    None, intf_list[idx], tag_list[idx], None, vrf_list[idx]))
         assert(nh_set == test_set)
+
+def test_vty_reply_scanner():
+    scanner = VtyReplyScanner()
+    assert(scanner.feed(b'line 1\n') == [])
+    assert(scanner.feed(b'line 2\n\0\0') == [])
+    assert(scanner.feed(b'\0') == [])
+    assert(scanner.feed(b'\0reply 2\0\0\0\1reply') == [(0, 'line 1\nline 2\n'), (1, 'reply 2')])
+    assert(scanner.feed(b' 3\0\0\0\0') == [(0, 'reply 3')])
+    assert(len(scanner.buf) == 0)
+
+def test_vty_daemon_session():
+    client_sock, daemon_sock = socket.socketpair()
+    def fake_daemon():
+        buf = b''
+        while True:
+            data = daemon_sock.recv(4096)
+            if not data:
+                break
+            buf += data
+            while b'\0' in buf:
+                cmd, buf = buf.split(b'\0', 1)
+                ret_code = b'\1' if cmd.startswith(b'bad') else b'\0'
+                daemon_sock.sendall(b'reply to ' + cmd + b'\0\0\0' + ret_code)
+    import threading
+    daemon_thread = threading.Thread(target = fake_daemon)
+    daemon_thread.start()
+    session = VtyDaemonSession('bgpd', client_sock)
+    session.start()
+    cmds = ['cmd %d' % idx for idx in range(40)] + ['bad cmd']
+    job = VtyJob(cmds, ['bgpd'])
+    session.submit(job)
+    assert(job.done.wait(10))
+    for idx in range(40):
+        assert(job.get_reply(idx) == (True, 'reply to cmd %d' % idx))
+    assert(job.get_reply(40) == (False, 'reply to bad cmd'))
+    stats = session.get_stats()
+    assert(stats['jobs'] == 1)
+    assert(stats['commands'] == 41)
+    assert(stats['failures'] == 1)
+    assert(stats['queue_depth'] == 0)
+    session.stop()
+    client_sock.close()
+    daemon_thread.join()
+    daemon_sock.close()
+
+def test_vty_daemon_session_reconnect():
+    import threading
+    import time
+    def fake_daemon(daemon_sock):
+        buf = b''
+        while True:
+            data = daemon_sock.recv(4096)
+            if not data:
+                break
+            buf += data
+            while b'\0' in buf:
+                cmd, buf = buf.split(b'\0', 1)
+                if cmd.startswith(b'slow'):
+                    time.sleep(0.5)
+                try:
+                    daemon_sock.sendall(b'reply to ' + cmd + b'\0\0\0\0')
+                except socket.error:
+                    # the session closed this connection after the timeout
+                    buf = b''
+                    break
+        daemon_sock.close()
+    daemon_threads = []
+    def connect(daemon):
+        client_sock, daemon_sock = socket.socketpair()
+        client_sock.settimeout(0.2)
+        daemon_threads.append(threading.Thread(target = fake_daemon, args = (daemon_sock,)))
+        daemon_threads[-1].start()
+        return client_sock
+    session = VtyDaemonSession('bgpd', connect('bgpd'), connect)
+    session.start()
+    job = VtyJob(['slow cmd'], ['bgpd'])
+    session.submit(job)
+    assert(job.done.wait(10))
+    assert(job.get_reply(0) == (False, ''))
+    # the late reply to the slow command must not be taken for the reply of the next job
+    job = VtyJob(['cmd'], ['bgpd'])
+    session.submit(job)
+    assert(job.done.wait(10))
+    assert(job.get_reply(0) == (True, 'reply to cmd'))
+    assert(len(daemon_threads) == 2)
+    session.stop()
+    for daemon_thread in daemon_threads:
+        daemon_thread.join()
+
+def test_vty_job_no_daemon():
+    done_jobs = []
+    job = VtyJob(['cmd'], [], done_jobs.append)
+    assert(job.done.is_set())
+    assert(done_jobs == [job])
+    assert(job.get_reply(0) == (False, ''))
+
+def test_keyspace_event_batch():
+    config_db = ExtConfigDBConnector(batch_window_ms = 50)
+    config_db.db_name = 'CONFIG_DB'
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.handlers = {'BGP_GLOBALS': None, 'BGP_NEIGHBOR': None, 'ROUTE_MAP': None}
+    db_data = {'BGP_GLOBALS|default': {'local_asn': '100'},
+               'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '200'},
+               'BGP_NEIGHBOR|default|10.0.0.2': {'asn': '300'}}
+    client = MagicMock(spec = ['hgetall'])
+    read_keys = []
+    def hgetall(key):
+        read_keys.append(key)
+        if key == 'BGP_NEIGHBOR|default|10.0.0.2':
+            raise RuntimeError('read failure')
+        return db_data.get(key, {})
+    client.hgetall.side_effect = hgetall
+    config_db.get_redis_client = MagicMock(return_value = client)
+    config_db.raw_to_typed = lambda raw_data, table = '': raw_data if len(raw_data) > 0 else None
+    events = ['BGP_NEIGHBOR|default|10.0.0.1', 'ROUTE_MAP|map1|10', 'BGP_NEIGHBOR|default|10.0.0.1',
+              'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.2', 'BGP_NEIGHBOR|default|10.0.0.1',
+              'ACL_RULE|acl|rule1']
+    msgs = [{'type': 'pmessage', 'channel': '__keyspace@4__:' + key, 'data': 'hset'} for key in events]
+    config_db.pubsub = MagicMock()
+    pending_msgs = msgs[1:]
+    config_db.pubsub.get_message.side_effect = lambda timeout, interrupt: pending_msgs.pop(0) if len(pending_msgs) > 0 else None
+    config_db._ExtConfigDBConnector__listen_thread_running = True
+    # without pipeline the keys are read one by one
+    with patch.object(ExtConfigDBConnector.__mro__[1], '_ConfigDBConnector__fire', create = True) as fire, \
+         patch.object(frrcfgd_module.redis_bulk, 'get_redis_client', return_value = None):
+        config_db.collect_batch(msgs[0])
+    assert(sorted(read_keys) == sorted(['BGP_NEIGHBOR|default|10.0.0.1', 'ROUTE_MAP|map1|10',
+                                        'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.2']))
+    assert([c.args for c in fire.call_args_list] ==
+           [('ROUTE_MAP', 'map1|10', None), ('BGP_GLOBALS', 'default', {'local_asn': '100'}),
+            ('BGP_NEIGHBOR', 'default|10.0.0.1', {'asn': '200'})])
+    stats = config_db.get_batch_stats()
+    assert(stats['batches'] == 1)
+    assert(stats['events'] == 6)
+    assert(stats['keys'] == 4)
+    # a failure of the batch must not stop the listen thread
+    config_db.get_redis_client.side_effect = RuntimeError('no connection')
+    with patch.object(ExtConfigDBConnector.__mro__[1], '_ConfigDBConnector__fire', create = True) as fire:
+        config_db.collect_batch(msgs[0])
+    fire.assert_not_called()
+
+def get_batch_bgpd_client(failed_cmds):
+    mgr = BgpdClientMgr.__new__(BgpdClientMgr)
+    mgr.cmd_count = 0
+    mgr.job_count = 0
+    mgr.batch_thread = None
+    mgr.batch_daemons = None
+    mgr.batch_commands = []
+    mgr.sessions = {}
+    mgr.jobs = []
+    for daemon in ['bgpd', 'zebra', 'ospfd']:
+        session = MagicMock()
+        session.submit.side_effect = lambda job, daemon = daemon: (mgr.jobs.append((daemon, job.commands)),
+            job.complete(daemon, [(1 if cmd in failed_cmds else 0, '') for cmd in job.commands]))
+        mgr.sessions[daemon] = session
+    return mgr
+
+def test_bgpd_client_batch():
+    mgr = get_batch_bgpd_client(['neighbor 10.0.0.2 remote-as 300'])
+    mgr.start_batch()
+    assert(mgr.run_vtysh_command('BGP_GLOBALS', ['vtysh', '-c', 'configure terminal', '-c', 'router bgp 100'], None))
+    assert(mgr.run_vtysh_command('BGP_NEIGHBOR', ['vtysh', '-c', 'configure terminal', '-c', 'router bgp 100',
+                                                  '-c', 'neighbor 10.0.0.2 remote-as 300'], ['bgpd']))
+    # nothing runs until the end of the batch
+    assert(mgr.jobs == [])
+    assert(not mgr.end_batch())
+    assert(mgr.jobs == [('bgpd', ['configure terminal', 'router bgp 100', 'end',
+                                  'configure terminal', 'router bgp 100', 'neighbor 10.0.0.2 remote-as 300', 'end'])])
+    assert(mgr.job_count == 1)
+    assert(mgr.cmd_count == 7)
+
+    # commands of another daemon list are run in a separate job, in order
+    mgr = get_batch_bgpd_client([])
+    mgr.start_batch()
+    mgr.run_vtysh_command('BGP_GLOBALS', ['vtysh', '-c', 'router bgp 100'], None)
+    mgr.run_vtysh_command('ROUTE_MAP', ['vtysh', '-c', 'route-map map1 permit 10'], None)
+    mgr.run_vtysh_command('ROUTE_MAP', ['vtysh', '-c', 'route-map map2 permit 10'], None)
+    assert(mgr.jobs == [('bgpd', ['router bgp 100', 'end'])])
+    assert(mgr.end_batch())
+    assert(mgr.job_count == 2)
+    assert([cmds for daemon, cmds in mgr.jobs[1:]] == [['route-map map1 permit 10', 'end', 'route-map map2 permit 10', 'end']] * 3)
+    # without a batch every command list is a job
+    mgr.run_vtysh_command('BGP_GLOBALS', ['vtysh', '-c', 'router bgp 100'], None)
+    assert(mgr.job_count == 3)
+
+def test_keyspace_event_batch_pipelined():
+    config_db = ExtConfigDBConnector(batch_window_ms = 50)
+    config_db.db_name = 'CONFIG_DB'
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.handlers = {'BGP_GLOBALS': None, 'BGP_NEIGHBOR': None}
+    db_data = {'BGP_GLOBALS|default': {'local_asn': '100'},
+               'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '200'}}
+    client = MagicMock()
+    pipe = client.pipeline.return_value
+    pipe.execute.side_effect = lambda: [db_data.get(call.args[0], {}) for call in pipe.hgetall.call_args_list]
+    config_db.get_redis_client = MagicMock()
+    config_db.raw_to_typed = lambda raw_data, table = '': raw_data if len(raw_data) > 0 else None
+    msgs = [{'type': 'pmessage', 'channel': '__keyspace@4__:' + key, 'data': 'hset'}
+            for key in ['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.3']]
+    config_db.pubsub = MagicMock()
+    pending_msgs = msgs[1:]
+    config_db.pubsub.get_message.side_effect = lambda timeout, interrupt: pending_msgs.pop(0) if len(pending_msgs) > 0 else None
+    config_db._ExtConfigDBConnector__listen_thread_running = True
+    mgr = get_batch_bgpd_client([])
+    def fire(table, row, data):
+        mgr.run_vtysh_command(table, ['vtysh', '-c', '%s %s' % (table, row)], None)
+    with patch.object(ExtConfigDBConnector.__mro__[1], '_ConfigDBConnector__fire', side_effect = fire, create = True), \
+         patch.object(frrcfgd_module.redis_bulk, 'get_redis_client', return_value = client), \
+         patch.object(frrcfgd_module, 'bgpd_client', mgr):
+        config_db.collect_batch(msgs[0])
+    # all keys are read in one pipeline, and all commands are run in one job
+    assert(pipe.execute.call_count == 1)
+    config_db.get_redis_client.assert_not_called()
+    assert(mgr.jobs == [('bgpd', ['BGP_NEIGHBOR default|10.0.0.3', 'end', 'BGP_GLOBALS default', 'end',
+                                  'BGP_NEIGHBOR default|10.0.0.1', 'end'])])
+    stats = config_db.get_batch_stats()
+    assert(stats['keys'] == 3)
+    assert(stats['commands'] == 6)
+    assert(stats['jobs'] == 1)
+
+def test_key_map_changed_entries():
+    key_map = BGPKeyMapList([('router_id', 'bgp router-id {}'),
+                             (['+keepalive', '+holdtime'], 'timers bgp {} {}'),
+                             ('name&desc', 'description {}')], 'BGP_GLOBALS', None, True)
+    assert(key_map.field_index == {'router_id': [0], 'keepalive': [1], 'holdtime': [1], 'name': [2], 'desc': [2]})
+    data = {'router_id': CachedDataWithOp('1.1.1.1', CachedDataWithOp.OP_NONE),
+            'holdtime': CachedDataWithOp('9', CachedDataWithOp.OP_UPDATE),
+            'desc': CachedDataWithOp('peer', CachedDataWithOp.OP_DELETE)}
+    assert([entry[1].run_cmd for entry in key_map.get_changed_entries(data)] == ['timers bgp {} {}', 'description {}'])
+    key_map = BGPKeyMapList([('router_id', 'bgp router-id {}')], 'BGP_GLOBALS')
+    assert(key_map.field_index is None)
+    assert(key_map.get_changed_entries(data) is key_map)
@@ -5,10 +5,12 @@ import os
 import random
 import re
 import subprocess
+import tempfile
+import threading
 import yaml
 from natsort import natsorted
 from sonic_py_common.general import getstatusoutput_noshell_pipe
-from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
+from swsscommon.swsscommon import ConfigDBConnector, DBConnector, Select, SonicV2Connector, SubscriberStateTable
 
 
 USR_SHARE_SONIC_PATH = "/usr/share/sonic"
@@ -56,12 +58,186 @@ CHASSIS_INFO_SWITCH_HOST_SERIAL_FIELD = 'switch_host_serial'
 # DPU constants
 DPU_NAME_PREFIX = "dpu"
 
+# System MAC address sources
+SYSEEPROM_CACHE_FILE = "/var/cache/sonic/decode-syseeprom/syseeprom_cache"
+SYSTEM_MAC_CACHE_FILE = "/run/sonic/system_mac.json"
+SYS_CLASS_NET_PATH = "/sys/class/net"
+
+# ONIE TlvInfo EEPROM format
+TLV_INFO_ID_STRING = b"TlvInfo\x00"
+TLV_INFO_HDR_LEN = 11
+TLV_CODE_MAC_BASE = 0x24
+
 # Cacheable Objects
 sonic_ver_info = {}
 hw_info_dict = {}
 
+# Metadata cache
+#
+# Content of metadata files is parsed once per process and re-read only when
+# the inode, size or modification time of the file changes. Files which can't
+# be stat'ed (e.g. not present) are never cached.
+# DEVICE_METADATA|localhost is cached only after enable_device_metadata_cache()
+# is called, and only for get_localhost_info() calls without explicit config_db.
+_metadata_cache_lock = threading.RLock()
+_file_cache = {}
+_metadata_cache_stats = {'hits': 0, 'misses': 0}
+_localhost_cache_enabled = False
+_localhost_cache = None
+_localhost_subscriber = None
+
+
+def _get_file_signature(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _read_cached_file(path, parser):
+    """
+    Retrieves parsed content of a file, memoized until the file changes
+
+    Args:
+        path: path to the file
+        parser: function which takes the path and returns parsed content
+
+    Returns:
+        Value returned by parser
+    """
+    signature = _get_file_signature(path)
+    if signature is None:
+        return parser(path)
+
+    cache_key = (path, parser)
+    with _metadata_cache_lock:
+        entry = _file_cache.get(cache_key)
+        if entry is not None and entry[0] == signature:
+            _metadata_cache_stats['hits'] += 1
+            return entry[1]
+        _metadata_cache_stats['misses'] += 1
+
+    value = parser(path)
+    with _metadata_cache_lock:
+        _file_cache[cache_key] = (signature, value)
+    return value
+
+
+def _parse_conf_file(path):
+    """
+    Parses a file of key=value lines
+
+    Returns:
+        A list of (key, value) tuples in order of the file, values are not stripped
+    """
+    conf_vars = []
+    with open(path) as conf_file:
+        for line in conf_file:
+            tokens = line.split('=')
+            if len(tokens) < 2:
+                continue
+            conf_vars.append((tokens[0], tokens[1]))
+    return conf_vars
+
+
+def _check_localhost_subscriber():
+    """
+    Drops cached DEVICE_METADATA|localhost if CONFIG_DB notified a change of DEVICE_METADATA
+    """
+    global _localhost_cache
+
+    if _localhost_subscriber is None:
+        return
+    selector, subscriber = _localhost_subscriber
+    changed = False
+    while True:
+        state, _ = selector.select(0)
+        if state != Select.OBJECT:
+            break
+        if subscriber.pops():
+            changed = True
+    if changed:
+        _localhost_cache = None
+
+
+def _get_cached_localhost_metadata():
+    global _localhost_cache
+
+    with _metadata_cache_lock:
+        _check_localhost_subscriber()
+        if _localhost_cache is not None:
+            _metadata_cache_stats['hits'] += 1
+            return _localhost_cache
+        _metadata_cache_stats['misses'] += 1
+
+    config_db = ConfigDBConnector()
+    config_db.connect()
+    metadata = config_db.get_table('DEVICE_METADATA').get('localhost', {})
+    with _metadata_cache_lock:
+        _localhost_cache = metadata
+    return metadata
+
+
+def enable_device_metadata_cache(subscribe=True):
+    """
+    Enables caching of DEVICE_METADATA|localhost for get_localhost_info() and
+    the helpers based on it (get_hostname(), get_hwsku(), ...)
+
+    Args:
+        subscribe: if True, the cached entry is dropped when CONFIG_DB keyspace
+            notifications report a change of DEVICE_METADATA. Otherwise the entry
+            is kept until refresh() is called
+    """
+    global _localhost_cache_enabled, _localhost_subscriber
+
+    with _metadata_cache_lock:
+        _localhost_cache_enabled = True
+        if subscribe and _localhost_subscriber is None:
+            subscriber = SubscriberStateTable(DBConnector('CONFIG_DB', 0), 'DEVICE_METADATA')
+            selector = Select()
+            selector.addSelectable(subscriber)
+            _localhost_subscriber = (selector, subscriber)
+            # Initial content of the table is delivered as notifications
+            _check_localhost_subscriber()
+
+
+def disable_device_metadata_cache():
+    global _localhost_cache_enabled, _localhost_cache, _localhost_subscriber
+
+    with _metadata_cache_lock:
+        _localhost_cache_enabled = False
+        _localhost_cache = None
+        _localhost_subscriber = None
+
+
+def refresh():
+    """
+    Drops all cached device metadata, it is read again on next access
+    """
+    global sonic_ver_info, hw_info_dict, _localhost_cache
+
+    with _metadata_cache_lock:
+        _file_cache.clear()
+        _localhost_cache = None
+        sonic_ver_info = {}
+        hw_info_dict = {}
+
+
+def get_metadata_cache_stats():
+    """
+    Returns:
+        A dictionary with number of metadata cache hits and misses
+    """
+    with _metadata_cache_lock:
+        return dict(_metadata_cache_stats)
+
+
 def get_localhost_info(field, config_db=None):
     try:
+        if not config_db and _localhost_cache_enabled:
+            return _get_cached_localhost_metadata().get(field)
+
         # TODO: enforce caller to provide config_db explicitly and remove its default value
         if not config_db:
             config_db = ConfigDBConnector()
@@ -93,12 +269,8 @@ def get_machine_info():
         return None
 
     machine_vars = {}
-    with open(MACHINE_CONF_PATH) as machine_conf_file:
-        for line in machine_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            machine_vars[tokens[0]] = tokens[1].strip()
+    for key, val in _read_cached_file(MACHINE_CONF_PATH, _parse_conf_file):
+        machine_vars[key] = val.strip()
 
     return machine_vars
 
@@ -508,19 +680,27 @@ def get_path_to_port_config_file(hwsku=None, asic=None):
 
     return None
 
+def _parse_sonic_version_file(path):
+    with open(path) as stream:
+        if yaml.__version__ >= "5.1":
+            return yaml.full_load(stream)
+        else:
+            return yaml.safe_load(stream)
+
+
 def get_sonic_version_info():
     if not os.path.isfile(SONIC_VERSION_YAML_PATH):
         return None
 
     global sonic_ver_info
+    if _get_file_signature(SONIC_VERSION_YAML_PATH) is not None:
+        sonic_ver_info = _read_cached_file(SONIC_VERSION_YAML_PATH, _parse_sonic_version_file)
+        return sonic_ver_info
+
     if sonic_ver_info:
         return sonic_ver_info
 
-    with open(SONIC_VERSION_YAML_PATH) as stream:
-        if yaml.__version__ >= "5.1":
-            sonic_ver_info = yaml.full_load(stream)
-        else:
-            sonic_ver_info = yaml.safe_load(stream)
+    sonic_ver_info = _parse_sonic_version_file(SONIC_VERSION_YAML_PATH)
 
     return sonic_ver_info
 
@@ -604,14 +784,10 @@ def get_num_npus():
     asic_conf_file_path = get_asic_conf_file_path()
     if asic_conf_file_path is None:
         return 1
-    with open(asic_conf_file_path) as asic_conf_file:
-        for line in asic_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'num_asic':
-                num_npus = tokens[1].strip()
-        return int(num_npus)
+    for key, val in _read_cached_file(asic_conf_file_path, _parse_conf_file):
+        if key.lower() == 'num_asic':
+            num_npus = val.strip()
+    return int(num_npus)
 
 
 def is_multi_npu():
@@ -643,16 +819,11 @@ def is_disaggregated_chassis():
     platform_env_conf_file_path = get_platform_env_conf_file_path()
     if platform_env_conf_file_path is None:
         return False
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0] == 'disaggregated_chassis':
-                val = tokens[1].strip()
-                if val == '1':
-                    return True
-        return False
+    for key, val in _read_cached_file(platform_env_conf_file_path, _parse_conf_file):
+        if key == 'disaggregated_chassis':
+            if val.strip() == '1':
+                return True
+    return False
 
 
 def is_virtual_chassis():
@@ -703,13 +874,9 @@ def is_platform_env_key_present(key):
     platform_env_conf_file_path = get_platform_env_conf_file_path()
     if platform_env_conf_file_path is None:
         return False
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            if tokens[0].strip().lower() == key.strip().lower():
-                return tokens[1].strip() == '1'
+    for conf_key, val in _read_cached_file(platform_env_conf_file_path, _parse_conf_file):
+        if conf_key.strip().lower() == key.strip().lower():
+            return val.strip() == '1'
     return False
 
 
@@ -864,109 +1031,207 @@ def generate_mac_for_vs(hostname, namespace):
 
     return _modify_mac_for_asic(mac, namespace)
 
-def get_system_mac(namespace=None, hostname=None):
-    hw_mac_entry_outputs = []
-    syseeprom_cmd = ["sudo", "decode-syseeprom", "-m"]
-    iplink_cmd0 = ["ip", 'link', 'show', 'eth0']
-    iplink_cmd1 = ['grep', 'ether']
-    iplink_cmd2 = ['awk', '{print $2}']
-    version_info = get_sonic_version_info()
-    platform = get_platform()
+def read_syseeprom_base_mac(path=None):
+    """
+    Retrieves the base MAC address from the ONIE TlvInfo syseeprom cache
+    written by decode-syseeprom
+
+    Args:
+        path: path to the syseeprom cache, SYSEEPROM_CACHE_FILE if not provided
+
+    Returns:
+        A string containing the MAC address in decode-syseeprom format,
+        None if the cache doesn't exist or contains no base MAC address
+    """
+    if path is None:
+        path = SYSEEPROM_CACHE_FILE
+    try:
+        with open(path, 'rb') as eeprom_file:
+            data = eeprom_file.read()
+    except (IOError, OSError):
+        return None
+
+    if len(data) < TLV_INFO_HDR_LEN or data[:len(TLV_INFO_ID_STRING)] != TLV_INFO_ID_STRING:
+        return None
+
+    total_len = (data[9] << 8) | data[10]
+    end = min(len(data), TLV_INFO_HDR_LEN + total_len)
+    idx = TLV_INFO_HDR_LEN
+    while idx + 2 <= end:
+        tlv_type = data[idx]
+        tlv_len = data[idx + 1]
+        value = data[idx + 2:idx + 2 + tlv_len]
+        if tlv_type == TLV_CODE_MAC_BASE and len(value) == 6:
+            return ':'.join('{:02X}'.format(byte) for byte in value)
+        idx += 2 + tlv_len
+
+    return None
+
+
+def _syseeprom_mac_source():
+    mac = read_syseeprom_base_mac()
+    if mac is not None:
+        return (mac, None)
+    return run_command(["sudo", "decode-syseeprom", "-m"])
+
+
+def _machine_conf_mac_source(key):
+    machine_vars = get_machine_info()
+    if machine_vars is None or key not in machine_vars:
+        return (None, '{} not found in {}'.format(key, MACHINE_CONF_PATH))
+    return (machine_vars[key], None)
+
+
+def _profile_mac_source(profile_file, key):
+    try:
+        with open(profile_file) as profile:
+            for line in profile:
+                if key in line:
+                    tokens = line.split('=')
+                    return (tokens[1] if len(tokens) > 1 else line, None)
+    except (IOError, OSError) as e:
+        return (None, str(e))
+    return (None, '{} not found in {}'.format(key, profile_file))
+
+
+def _interface_mac_source(ifname, namespace=None):
+    address_file = os.path.join(SYS_CLASS_NET_PATH, ifname, 'address')
+    if namespace is not None:
+        # sysfs of another network namespace is only visible from inside of it
+        return run_command(['sudo', 'ip', 'netns', 'exec', str(namespace), 'cat', address_file])
+    try:
+        with open(address_file) as f:
+            return (f.read(), None)
+    except (IOError, OSError) as e:
+        return (None, str(e))
 
-    if platform == VS_PLATFORM:
-        return generate_mac_for_vs(hostname, namespace)
 
-    if (version_info['asic_type'] in ['mellanox', 'nvidia-bluefield']):
+def _get_system_mac_sources(asic_type, platform, namespace):
+    """
+    Yields (source, authoritative) in the order the sources are tried for the ASIC type. source is
+    a function returning (mac, err). Only a MAC address decoded from the syseeprom, machine.conf or
+    profile.ini is authoritative and cached. The MAC address of an interface can be changed at runtime
+    """
+    if asic_type in ['mellanox', 'nvidia-bluefield']:
         # With Mellanox ONIE release(2019.05-5.2.0012) and above
         # "onie_base_mac" was added to /host/machine.conf:
         # onie_base_mac=e4:1d:2d:44:5e:80
         # So we have another way to get the mac address besides decode syseeprom
         # By this can mitigate the dependency on the hw-management service
-        base_mac_key = "onie_base_mac"
-        machine_vars = get_machine_info()
-        if machine_vars is not None and base_mac_key in machine_vars:
-            mac = machine_vars[base_mac_key]
-            mac = mac.strip()
-            if _valid_mac_address(mac):
-                return mac
-
-        (mac, err) = run_command(syseeprom_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-    elif (version_info['asic_type'] in ['marvell-prestera', 'nokia-vs']):
-        # Try valid mac in eeprom, else fetch it from eth0
-        machine_key = "onie_machine"
+        yield (lambda: _machine_conf_mac_source('onie_base_mac'), True)
+        yield (_syseeprom_mac_source, True)
+    elif asic_type in ['marvell-prestera', 'nokia-vs']:
+        # Try valid mac in eeprom, else fetch it from profile.ini or eth0
+        yield (_syseeprom_mac_source, True)
         machine_vars = get_machine_info()
-        (mac, err) = run_command(syseeprom_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-        if machine_vars is not None and machine_key in machine_vars:
-            hwsku = machine_vars[machine_key]
-            profile_file = HOST_DEVICE_PATH + '/' + platform + '/' + hwsku + '/profile.ini'
-            if os.path.exists(profile_file):
-                profile_cmd0 = ['cat', profile_file]
-                profile_cmd1 = ['grep', 'switchMacAddress']
-                profile_cmd2 = ['cut', '-f2', '-d', '=']
-                (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
-                hw_mac_entry_outputs.append((mac, err))
-        else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
-            hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
-        hw_mac_entry_outputs.append((mac, err))
-    elif (version_info['asic_type'] == 'cisco-8000'):
-        # Try to get valid MAC from profile.ini first, else fetch it from syseeprom or eth0
+        if machine_vars is not None and 'onie_machine' in machine_vars:
+            profile_file = HOST_DEVICE_PATH + '/' + platform + '/' + machine_vars['onie_machine'] + '/profile.ini'
+            yield (lambda: _profile_mac_source(profile_file, 'switchMacAddress'), False)
+        yield (lambda: _interface_mac_source('eth0'), False)
+    elif asic_type == 'cisco-8000':
+        # Try to get valid MAC from profile.ini first, else fetch it from eth0 or syseeprom
         if namespace is not None:
-            profile_cmd0 = ['cat', HOST_DEVICE_PATH + '/' + platform + '/profile.ini']
-            profile_cmd1 = ['grep', str(namespace)+'switchMacAddress']
-            profile_cmd2 = ['cut', '-f2', '-d', '=']
-            (mac, err) = run_command_pipe(profile_cmd0, profile_cmd1, profile_cmd2)
-        else:
-            profile_cmd = ["false"]
-            (mac, err) = run_command(profile_cmd)
-        hw_mac_entry_outputs.append((mac, err))
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
-        hw_mac_entry_outputs.append((mac, err))
-        mac_found = False
-        for (mac, err) in hw_mac_entry_outputs:
-            if err:
-                continue
-            mac = mac.strip()
-            if _valid_mac_address(mac):
-                mac_found = True
-                break
-        # If mac not found, fetch from syseeprom
-        if not mac_found:
-            hw_mac_entry_outputs = []
-            (mac, err) = run_command(syseeprom_cmd)
-            hw_mac_entry_outputs.append((mac, err))
-    elif (version_info['asic_type'] == 'pensando'):
-        iplink_cmd0 = ["ip", 'link', 'show', 'eth0-midplane']
-        (mac, err) = run_command_pipe(iplink_cmd0, iplink_cmd1, iplink_cmd2)
-        hw_mac_entry_outputs.append((mac, err))
+            profile_file = HOST_DEVICE_PATH + '/' + platform + '/profile.ini'
+            yield (lambda: _profile_mac_source(profile_file, str(namespace) + 'switchMacAddress'), True)
+        yield (lambda: _interface_mac_source('eth0'), False)
+        yield (_syseeprom_mac_source, True)
+    elif asic_type == 'pensando':
+        yield (lambda: _interface_mac_source('eth0-midplane'), False)
     else:
-        mac_address_cmd = ["cat", "/sys/class/net/eth0/address"]
-        if namespace is not None:
-            mac_address_cmd = ['sudo', 'ip', 'netns', 'exec', str(namespace)] + mac_address_cmd
-        (mac, err) = run_command(mac_address_cmd)
-        hw_mac_entry_outputs.append((mac, err))
+        yield (lambda: _interface_mac_source('eth0', namespace), False)
+
+
+def _load_system_mac_cache(platform, namespace):
+    try:
+        with open(SYSTEM_MAC_CACHE_FILE) as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('platform') != platform:
+        return None
+    mac = cache.get('mac', {}).get(str(namespace))
+    return mac if mac and _valid_mac_address(mac) else None
+
+
+def _store_system_mac_cache(platform, namespace, mac):
+    try:
+        with open(SYSTEM_MAC_CACHE_FILE) as cache_file:
+            cache = json.load(cache_file)
+        if not isinstance(cache, dict) or cache.get('platform') != platform:
+            raise ValueError('stale system MAC cache')
+    except (IOError, OSError, ValueError):
+        cache = {'platform': platform, 'mac': {}}
+    cache.setdefault('mac', {})[str(namespace)] = mac
+    try:
+        cache_dir = os.path.dirname(SYSTEM_MAC_CACHE_FILE)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(SYSTEM_MAC_CACHE_FILE))
+        try:
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(cache, cache_file)
+            os.chmod(tmp_file, 0o644)
+            os.rename(tmp_file, SYSTEM_MAC_CACHE_FILE)
+        except (IOError, OSError):
+            os.remove(tmp_file)
+            raise
+    except (IOError, OSError):
+        # The cache is an optimization only, e.g. /run is not writable for this user
+        pass
+
+
+def get_system_mac(namespace=None, hostname=None, use_cache=True):
+    """
+    Retrieves the system MAC address
+
+    Args:
+        namespace: ASIC namespace on multi-ASIC devices
+        hostname: hostname used to generate the MAC address on virtual switch
+        use_cache: if True, the MAC address is loaded from and stored into
+            SYSTEM_MAC_CACHE_FILE, so that it is resolved once per boot. Only
+            a MAC address decoded from the syseeprom, machine.conf or
+            profile.ini is stored
+
+    Returns:
+        A string containing the MAC address, None if it was not found
+    """
+    version_info = get_sonic_version_info()
+    platform = get_platform()
+
+    if platform == VS_PLATFORM:
+        return generate_mac_for_vs(hostname, namespace)
 
-    for (mac, err) in hw_mac_entry_outputs:
-        if err:
+    if use_cache:
+        mac = _load_system_mac_cache(platform, namespace)
+        if mac is not None:
+            return mac
+
+    asic_type = version_info['asic_type']
+    mac = None
+    authoritative = False
+    for mac_source, authoritative in _get_system_mac_sources(asic_type, platform, namespace):
+        (mac, err) = mac_source()
+        if err or not mac:
+            mac = None
             continue
         mac = mac.strip()
         if _valid_mac_address(mac):
             break
+        mac = None
 
-    if not _valid_mac_address(mac):
+    if mac is None:
         return None
 
     # Align last byte of MAC if necessary
-    if version_info and version_info['asic_type'] == 'centec':
+    if asic_type == 'centec':
         mac_tmp = mac.replace(':','')
         mac_tmp = "{:012x}".format(int(mac_tmp, 16) + 1)
         mac_tmp = re.sub("(.{2})", "\\1:", mac_tmp, 0, re.DOTALL)
         mac = mac_tmp[:-1]
-    return mac.strip() if mac else None
+
+    if use_cache and authoritative:
+        _store_system_mac_cache(platform, namespace, mac)
+    return mac
 
 
 def get_system_routing_stack():
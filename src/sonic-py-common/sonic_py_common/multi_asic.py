@@ -1,6 +1,8 @@
 import glob
 import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from natsort import natsorted
 from swsscommon import swsscommon
@@ -29,10 +31,31 @@ DEFAULT_NAMESPACE = ''
 PORT_ROLE = 'role'
 CHASSIS_STATE_DB='CHASSIS_STATE_DB'
 CHASSIS_FABRIC_ASIC_INFO_TABLE='CHASSIS_FABRIC_ASIC_TABLE'
+CONFIG_DB = 'CONFIG_DB'
 
-# Dictionary to cache config_db connection handle per namespace
-# to prevent duplicate connections from being opened
-config_db_handle = {}
+# Shared DB connections keyed by (namespace, db name), to prevent
+# connecting to the same DB again for every call
+db_pool = {}
+db_pool_lock = threading.Lock()
+
+# Port name to set of namespaces index, kept up to date by PORT table notifications.
+# Only used after enable_port_namespace_index(), by long-lived processes
+port_namespace_index_enabled = False
+port_namespace_index = None
+port_namespace_subscribers = None
+port_namespace_lock = threading.Lock()
+
+
+class PooledConnection(object):
+    """
+    Connection of the DB pool. The handle is connected on first use and is used
+    by one thread at a time. The entry is bound to the function which created
+    the handle, so that replacing connect_config_db_for_ns() takes effect.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.handle = None
+        self.lock = threading.RLock()
 
 def connect_config_db_for_ns(namespace=DEFAULT_NAMESPACE):
     """
@@ -81,6 +104,67 @@ def connect_to_all_dbs_for_ns(namespace=DEFAULT_NAMESPACE):
         db.connect(db_id)
     return db
 
+
+def _connect_db_for_ns(db_name, namespace):
+    if db_name == CONFIG_DB:
+        return connect_config_db_for_ns(namespace)
+    db = swsscommon.SonicV2Connector(namespace=namespace)
+    db.connect(db_name)
+    return db
+
+
+def get_pooled_connection(db_name=CONFIG_DB, namespace=DEFAULT_NAMESPACE):
+    """
+    Retrieves the pool entry of a DB in a namespace, the entry is created if
+    it doesn't exist yet
+
+    Returns:
+        PooledConnection object
+    """
+    factory = connect_config_db_for_ns if db_name == CONFIG_DB else swsscommon.SonicV2Connector
+    with db_pool_lock:
+        entry = db_pool.get((namespace, db_name))
+        if entry is None or entry.factory is not factory:
+            entry = PooledConnection(factory)
+            db_pool[(namespace, db_name)] = entry
+    return entry
+
+
+def run_with_db(func, db_name=CONFIG_DB, namespace=DEFAULT_NAMESPACE):
+    """
+    Runs func with the pooled connection to a DB in a namespace.
+    ConfigDBConnector is provided for CONFIG_DB, SonicV2Connector for other DBs.
+    If func fails because of a broken connection, the connection is made
+    again and func is run once more.
+
+    Returns:
+        return value of func(handle)
+    """
+    entry = get_pooled_connection(db_name, namespace)
+    with entry.lock:
+        for attempt in range(2):
+            if entry.handle is None:
+                entry.handle = _connect_db_for_ns(db_name, namespace)
+            try:
+                return func(entry.handle)
+            except (RuntimeError, ConnectionError, OSError):
+                entry.handle = None
+                if attempt > 0:
+                    raise
+
+
+def reset_db_pool():
+    """
+    Drops all pooled DB connections and the port to namespace index
+    """
+    global port_namespace_index, port_namespace_subscribers
+
+    with db_pool_lock:
+        db_pool.clear()
+    with port_namespace_lock:
+        port_namespace_index = None
+        port_namespace_subscribers = None
+
 def get_num_asics():
     """
     Retrieves the num of asics present in the multi ASIC platform
@@ -233,11 +317,7 @@ def get_all_namespaces():
     if is_multi_asic():
         for asic in range(num_asics):
             namespace = "{}{}".format(ASIC_NAME_PREFIX, asic)
-            if namespace not in config_db_handle:
-                config_db_handle[namespace] =  connect_config_db_for_ns(namespace)
-            config_db = config_db_handle[namespace]
-
-            metadata = config_db.get_table('DEVICE_METADATA')
+            metadata = run_with_db(lambda config_db: config_db.get_table('DEVICE_METADATA'), namespace=namespace)
             if metadata['localhost']['sub_role'] == FRONTEND_ASIC_SUB_ROLE:
                 front_ns.append(namespace)
             elif metadata['localhost']['sub_role'] == BACKEND_ASIC_SUB_ROLE:
@@ -298,16 +378,55 @@ def get_table(table, namespace=None):
     Returns:
         a dict of all entries of table across namespaces
     """
-    merged_table = {}
+    return get_table_all_namespaces(table, namespace)
+
+
+def get_table_all_namespaces(table, namespace=None, merge=True, db_name=CONFIG_DB):
+    """
+    Reads a table from all specified namespaces in parallel, each namespace
+    with its pooled connection
+
+    Args:
+        table: table name
+        namespace: namespace to read, all namespaces if None
+        merge: if True, entries of all namespaces are merged into one dict.
+            Entries of later namespaces replace the ones of earlier namespaces
+        db_name: CONFIG_DB, or another DB which is read as a dict of hashes
+
+    Returns:
+        a dict of all entries of table, or a dict of namespace to its table
+        entries if merge is False
+    """
     ns_list = get_namespace_list(namespace)
 
-    for ns in ns_list:
-        ns_table = get_table_for_asic(table, ns)
-        merged_table.update(ns_table)
+    if db_name == CONFIG_DB:
+        read_table = lambda ns: get_table_for_asic(table, ns)
+    else:
+        read_table = lambda ns: run_with_db(lambda db: _get_db_table(db, db_name, table), db_name, ns)
+
+    if len(ns_list) == 1:
+        ns_tables = [read_table(ns_list[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(ns_list)) as executor:
+            ns_tables = list(executor.map(read_table, ns_list))
+
+    if not merge:
+        return dict(zip(ns_list, ns_tables))
 
+    merged_table = {}
+    for ns_table in ns_tables:
+        merged_table.update(ns_table)
     return merged_table
 
 
+def _get_db_table(db, db_name, table):
+    separator = db.get_db_separator(db_name)
+    entries = {}
+    for key in db.keys(db_name, table + separator + '*') or []:
+        entries[key.split(separator, 1)[1]] = db.get_all(db_name, key)
+    return entries
+
+
 def get_port_entry_for_asic(port, namespace):
 
     return get_table_entry_for_asic(PORT_CFG_DB_TABLE, port, namespace)
@@ -315,8 +434,7 @@ def get_port_entry_for_asic(port, namespace):
 
 def get_table_entry_for_asic(table, entry, namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    return config_db.get_entry(table, entry)
+    return run_with_db(lambda config_db: config_db.get_entry(table, entry), namespace=namespace)
 
 def get_port_table_for_asic(namespace):
 
@@ -325,8 +443,7 @@ def get_port_table_for_asic(namespace):
 
 def get_table_for_asic(table, namespace):
 
-    config_db = connect_config_db_for_ns(namespace)
-    return config_db.get_table(table)
+    return run_with_db(lambda config_db: config_db.get_table(table), namespace=namespace)
 
 
 def mod_entry(table, key, value, namespace=None, modIfExists=False):
@@ -340,20 +457,103 @@ def mod_entry(table, key, value, namespace=None, modIfExists=False):
 
     for ns in ns_list:
         if not modIfExists or get_table_entry_for_asic(table, key, ns):
-            config_db = connect_config_db_for_ns(ns)
-            config_db.mod_entry(table, key, value)
+            run_with_db(lambda config_db: config_db.mod_entry(table, key, value), namespace=ns)
 
 
-def get_namespace_for_port(port_name):
+def enable_port_namespace_index():
+    """
+    Enables the port to namespace index for get_namespace_for_port(). The index
+    subscribes to PORT table of all namespaces and reads all of them once, so
+    it only pays off for long-lived processes which look up many ports
+    """
+    global port_namespace_index_enabled
 
-    ns_list = get_namespace_list()
-    port_namespace = None
+    with port_namespace_lock:
+        port_namespace_index_enabled = True
+
+
+def disable_port_namespace_index():
+    global port_namespace_index_enabled, port_namespace_index, port_namespace_subscribers
+
+    with port_namespace_lock:
+        port_namespace_index_enabled = False
+        port_namespace_index = None
+        port_namespace_subscribers = None
+
+
+def _build_port_namespace_index():
+    """
+    Subscribes to PORT table of all namespaces, then reads the tables.
+    Subscribing first ensures no change is missed between reading and
+    the first check of notifications
+    """
+    global port_namespace_index, port_namespace_subscribers
 
+    ns_list = get_namespace_list()
+    selector = swsscommon.Select()
+    subscribers = []
     for ns in ns_list:
-        ports = get_port_table_for_asic(ns)
-        if port_name in ports:
-            port_namespace = ns
+        subscriber = swsscommon.SubscriberStateTable(swsscommon.DBConnector(CONFIG_DB, 0, True, ns), PORT_CFG_DB_TABLE)
+        selector.addSelectable(subscriber)
+        subscribers.append((ns, subscriber))
+
+    index = {}
+    for ns, ports in get_table_all_namespaces(PORT_CFG_DB_TABLE, merge=False).items():
+        for port in ports:
+            index.setdefault(port, set()).add(ns)
+
+    port_namespace_subscribers = (selector, subscribers)
+    port_namespace_index = index
+
+
+def _update_port_namespace_index():
+    selector, subscribers = port_namespace_subscribers
+    while True:
+        state, _ = selector.select(0)
+        if state != swsscommon.Select.OBJECT:
             break
+        for ns, subscriber in subscribers:
+            for port, op, _ in subscriber.pops():
+                if op == swsscommon.SET_COMMAND:
+                    port_namespace_index.setdefault(port, set()).add(ns)
+                elif op == swsscommon.DEL_COMMAND and port in port_namespace_index:
+                    port_namespace_index[port].discard(ns)
+                    if not port_namespace_index[port]:
+                        del port_namespace_index[port]
+
+
+def _get_namespace_for_port_from_index(port_name):
+    """
+    Returns:
+        (True, namespace of the port or None) if the index is available,
+        (False, None) if the index is not enabled or PORT table notifications
+        can't be subscribed
+    """
+    with port_namespace_lock:
+        if not port_namespace_index_enabled:
+            return (False, None)
+        try:
+            if port_namespace_index is None:
+                _build_port_namespace_index()
+            _update_port_namespace_index()
+        except Exception:
+            return (False, None)
+        namespaces = port_namespace_index.get(port_name, set())
+        # A port of several namespaces, e.g. a backplane port, is found in the first one like by the scan
+        for ns, _ in port_namespace_subscribers[1]:
+            if ns in namespaces:
+                return (True, ns)
+        return (True, None)
+
+
+def get_namespace_for_port(port_name):
+
+    found, port_namespace = _get_namespace_for_port_from_index(port_name)
+    if not found:
+        for ns in get_namespace_list():
+            if get_port_entry_for_asic(port_name, ns):
+                port_namespace = ns
+                break
 
     if port_namespace is None:
         raise ValueError('Unknown port name {}'.format(port_name))
@@ -406,8 +606,8 @@ def is_port_channel_internal(port_channel, namespace=None):
     ns_list = get_namespace_list(namespace)
 
     for ns in ns_list:
-        config_db = connect_config_db_for_ns(ns)
-        port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+        port_channel_members = run_with_db(lambda config_db: config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE),
+                                           namespace=ns)
 
         for port_channel_member in port_channel_members:
             if port_channel_member[0] != port_channel:
@@ -431,8 +631,8 @@ def get_back_end_interface_set(namespace=None):
     if len(bk_end_intf_list):
         ns_list = get_namespace_list(namespace)
         for ns in ns_list:
-            config_db = connect_config_db_for_ns(ns)
-            port_channel_members = config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE)
+            port_channel_members = run_with_db(lambda config_db: config_db.get_keys(PORT_CHANNEL_MEMBER_CFG_DB_TABLE),
+                                               namespace=ns)
             # a back-end LAG must be configured with all of its member from back-end interfaces.
             # mixing back-end and front-end interfaces is miss configuration and not allowed.
             # To determine if a LAG is back-end LAG, just need to check its first member is back-end or not
@@ -453,15 +653,14 @@ def is_bgp_session_internal(bgp_neigh_ip, namespace=None):
 
     for ns in ns_list:
 
-        config_db = connect_config_db_for_ns(ns)
-        bgp_sessions = config_db.get_entry(
-            BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip
+        bgp_sessions = get_table_entry_for_asic(
+            BGP_INTERNAL_NEIGH_CFG_DB_TABLE, bgp_neigh_ip, ns
         )
         if bgp_sessions:
             return True
 
-        bgp_sessions = config_db.get_entry(
-            'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip
+        bgp_sessions = get_table_entry_for_asic(
+            'BGP_VOQ_CHASSIS_NEIGHBOR', bgp_neigh_ip, ns
         )
         if bgp_sessions:
             return True
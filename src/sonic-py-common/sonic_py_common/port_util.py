@@ -4,6 +4,8 @@ Bridge/Port mapping utility library.
 from swsscommon import swsscommon
 import re
 
+from .redis_bulk import get_redis_client, hgetall_pipelined, keyspace_notifications_enabled, scan_entries
+
 
 SONIC_ETHERNET_RE_PATTERN = r"^Ethernet(\d+)$"
 """
@@ -17,6 +19,10 @@ SONIC_MGMT_PORT_RE_PATTERN = r"^eth(\d+)$"
 SONIC_ETHERNET_IB_RE_PATTERN = r"^Ethernet-IB(\d+)$"
 SONIC_ETHERNET_REC_RE_PATTERN = r"^Ethernet-Rec(\d+)$"
 
+BRIDGE_PORT_KEY_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:"
+RIF_KEY_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:"
+OID_PREFIX = "oid:0x"
+
 class BaseIdx:
     ethernet_base_idx = 1
     vlan_interface_base_idx = 2000
@@ -93,31 +99,19 @@ def get_interface_oid_map(db, blocking=True):
 
     return if_name_map, if_id_map
 
-def get_bridge_port_map(db):
+def get_bridge_port_map(db, bulk=False):
     """
         Get the Bridge port mapping from ASIC DB
+        If bulk is True, the bridge port objects are fetched with SCAN and pipelined HGETALL
     """
     db.connect('ASIC_DB')
-    br_port_str = db.keys('ASIC_DB', "ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:*")
-    if not br_port_str:
-        return {}
-
     if_br_oid_map = {}
-    offset = len("ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:")
-    oid_pfx = len("oid:0x")
-    for br_s in br_port_str:
-        # Example output: ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000616
-        br_port_id = br_s[(offset + oid_pfx):]
-        ent = db.get_all('ASIC_DB', br_s, blocking=True)
-        # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
-        if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
-            if b"SAI_BRIDGE_PORT_ATTR_PORT_ID" in ent:
-                port_id = ent[b"SAI_BRIDGE_PORT_ATTR_PORT_ID"][oid_pfx:]
-                if_br_oid_map[br_port_id] = port_id
-        else:
-            if "SAI_BRIDGE_PORT_ATTR_PORT_ID" in ent:
-                port_id = ent["SAI_BRIDGE_PORT_ATTR_PORT_ID"][oid_pfx:]
-                if_br_oid_map[br_port_id] = port_id
+    binary = _is_binary_connector(db)
+    for br_s, ent in _get_asic_objects(db, BRIDGE_PORT_KEY_PREFIX, bulk):
+        # Example key: ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000616
+        br_port_id, port_id = _parse_bridge_port(br_s, ent, binary)
+        if port_id is not None:
+            if_br_oid_map[br_port_id] = port_id
 
     return if_br_oid_map
 
@@ -139,39 +133,34 @@ def get_vlan_id_from_bvid(db, bvid):
 
     return vlan_id
 
-def get_rif_port_map(db):
+def get_rif_port_map(db, bulk=False):
     """
         Get the RIF port mapping from ASIC DB
+        If bulk is True, the router interface objects are fetched with SCAN and pipelined HGETALL
     """
     db.connect('ASIC_DB')
-    rif_keys_str = db.keys('ASIC_DB', "ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:*")
-    if not rif_keys_str:
-        return {}
-
     rif_port_oid_map = {}
-    for rif_s in rif_keys_str:
-        rif_id = rif_s[len("ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x"):]
-        ent = db.get_all('ASIC_DB', rif_s, blocking=True)
-        # TODO: remove the first branch after all SonicV2Connector are migrated to decode_responses
-        if isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False:
-            if b"SAI_ROUTER_INTERFACE_ATTR_PORT_ID" in ent:
-                port_id = ent[b"SAI_ROUTER_INTERFACE_ATTR_PORT_ID"].lstrip(b"oid:0x")
-                rif_port_oid_map[rif_id] = port_id
-        else:
-            if "SAI_ROUTER_INTERFACE_ATTR_PORT_ID" in ent:
-                port_id = ent["SAI_ROUTER_INTERFACE_ATTR_PORT_ID"].lstrip("oid:0x")
-                rif_port_oid_map[rif_id] = port_id
+    binary = _is_binary_connector(db)
+    for rif_s, ent in _get_asic_objects(db, RIF_KEY_PREFIX, bulk):
+        rif_id, port_id = _parse_rif_port(rif_s, ent, binary)
+        if port_id is not None:
+            rif_port_oid_map[rif_id] = port_id
 
     return rif_port_oid_map
 
-def get_vlan_interface_oid_map(db, blocking=True):
+def get_vlan_interface_oid_map(db, blocking=True, bulk=False):
     """
         Get Vlan Interface names and sai oids
+        If bulk is True, both RIF maps are fetched in a single pipelined round trip
     """
     db.connect('COUNTERS_DB')
 
-    rif_name_map = db.get_all('COUNTERS_DB', 'COUNTERS_RIF_NAME_MAP', blocking=blocking)
-    rif_type_name_map = db.get_all('COUNTERS_DB', 'COUNTERS_RIF_TYPE_MAP', blocking=blocking)
+    rif_maps = _get_all_bulk(db, 'COUNTERS_DB', ['COUNTERS_RIF_NAME_MAP', 'COUNTERS_RIF_TYPE_MAP']) if bulk else None
+    # The maps may not be created yet, in which case a blocking read waits for them
+    if rif_maps is None or (blocking and not all(rif_maps)):
+        rif_maps = [db.get_all('COUNTERS_DB', 'COUNTERS_RIF_NAME_MAP', blocking=blocking),
+                    db.get_all('COUNTERS_DB', 'COUNTERS_RIF_TYPE_MAP', blocking=blocking)]
+    rif_name_map, rif_type_name_map = rif_maps
 
     if not rif_name_map or not rif_type_name_map:
         return {}
@@ -194,3 +183,181 @@ def get_vlan_interface_oid_map(db, blocking=True):
                 vlan_if_name_map[sai_oid[oid_pfx:]] = if_name
 
     return vlan_if_name_map
+
+def _is_binary_connector(db):
+    """
+        Return True if the connector returns bytes instead of str
+    """
+    # TODO: remove after all SonicV2Connector are migrated to decode_responses
+    return isinstance(db, swsscommon.SonicV2Connector) == False and db.dbintf.redis_kwargs.get('decode_responses', False) == False
+
+def _parse_bridge_port(key, ent, binary):
+    """
+        Return (bridge port oid, port oid) of a bridge port object
+        port oid is None if the bridge port is not bound to a port
+    """
+    oid_pfx = len(OID_PREFIX)
+    attr = b"SAI_BRIDGE_PORT_ATTR_PORT_ID" if binary else "SAI_BRIDGE_PORT_ATTR_PORT_ID"
+    br_port_id = key[(len(BRIDGE_PORT_KEY_PREFIX) + oid_pfx):]
+    if attr not in ent:
+        return br_port_id, None
+    return br_port_id, ent[attr][oid_pfx:]
+
+def _parse_rif_port(key, ent, binary):
+    """
+        Return (rif oid, port oid) of a router interface object
+        port oid is None if the router interface is not bound to a port
+    """
+    attr = b"SAI_ROUTER_INTERFACE_ATTR_PORT_ID" if binary else "SAI_ROUTER_INTERFACE_ATTR_PORT_ID"
+    rif_id = key[len(RIF_KEY_PREFIX + OID_PREFIX):]
+    if attr not in ent:
+        return rif_id, None
+    return rif_id, ent[attr].lstrip(b"oid:0x" if binary else "oid:0x")
+
+def _get_all_bulk(db, db_name, keys):
+    """
+        Get all the fields of keys in a single round trip
+        Return None if the bulk fetch is not available
+    """
+    try:
+        client = get_redis_client(db, db_name)
+        if client is None:
+            return None
+        return hgetall_pipelined(client, keys)
+    except Exception:
+        return None
+
+def _get_asic_objects(db, prefix, bulk):
+    """
+        Get the ASIC_DB objects which keys start with prefix
+        Return list of (key, entry)
+        In bulk mode the keys are fetched with SCAN and the entries with pipelined HGETALL.
+        The per-key path is used if the bulk fetch fails.
+    """
+    if bulk:
+        try:
+            client = get_redis_client(db, 'ASIC_DB')
+            if client is not None:
+                return scan_entries(client, [prefix + '*'])
+        except Exception:
+            pass
+
+    keys = db.keys('ASIC_DB', prefix + '*')
+    if not keys:
+        return []
+    return [(key, db.get_all('ASIC_DB', key, blocking=True)) for key in keys]
+
+
+class AsicPortMapCache(object):
+    """
+        Bridge port and RIF port maps of ASIC_DB.
+        The maps are loaded in bulk once and then updated incrementally from
+        ASIC_DB keyspace notifications, so a refresh only fetches the changed objects.
+        If the database doesn't publish keyspace notifications (notify-keyspace-events)
+        the maps are loaded in bulk on every call.
+    """
+    OBJECT_TYPES = {
+        BRIDGE_PORT_KEY_PREFIX: _parse_bridge_port,
+        RIF_KEY_PREFIX: _parse_rif_port,
+    }
+
+    def __init__(self, db):
+        self.db = db
+        self.client = None
+        self.pubsub = None
+        self.binary = False
+        self.notifications_enabled = None
+        self.maps = None
+        self.stats = {'full_loads': 0, 'updates': 0, 'updated_objects': 0}
+
+    def get_bridge_port_map(self):
+        return self._get_map(BRIDGE_PORT_KEY_PREFIX)
+
+    def get_rif_port_map(self):
+        return self._get_map(RIF_KEY_PREFIX)
+
+    def get_stats(self):
+        return dict(self.stats)
+
+    def close(self):
+        """
+            Stop listening for notifications. The maps are reloaded on the next call
+        """
+        if self.pubsub is not None:
+            try:
+                self.pubsub.close()
+            except Exception:
+                pass
+        self.pubsub = None
+        self.maps = None
+
+    def _get_map(self, prefix):
+        try:
+            if self.maps is None or not self.notifications_enabled:
+                self._load()
+            else:
+                self._update()
+            return dict(self.maps[prefix])
+        except Exception:
+            # Changes may have been missed, rebuild the maps without the cache
+            self.close()
+            if prefix == BRIDGE_PORT_KEY_PREFIX:
+                return get_bridge_port_map(self.db, bulk=True)
+            return get_rif_port_map(self.db, bulk=True)
+
+    def _key_from_channel(self, channel):
+        # Channel is __keyspace@<db id>__:<key>
+        return channel.split(b':' if isinstance(channel, bytes) else ':', 1)[1]
+
+    def _load(self):
+        self.db.connect('ASIC_DB')
+        self.client = get_redis_client(self.db, 'ASIC_DB')
+        if self.client is None:
+            raise RuntimeError('ASIC_DB keyspace notifications are not available')
+        self.binary = _is_binary_connector(self.db)
+        if self.notifications_enabled is None:
+            self.notifications_enabled = self._get_notifications_enabled()
+        if self.notifications_enabled:
+            db_id = self.client.connection_pool.connection_kwargs.get('db', 0)
+            # Subscribe before the objects are read, so no change is lost in between
+            self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self.pubsub.psubscribe(*['__keyspace@{}__:{}*'.format(db_id, prefix) for prefix in self.OBJECT_TYPES])
+        maps = {}
+        for prefix, parse in self.OBJECT_TYPES.items():
+            maps[prefix] = {}
+            for key, ent in _get_asic_objects(self.db, prefix, True):
+                obj_id, port_id = parse(key, ent, self.binary)
+                if port_id is not None:
+                    maps[prefix][obj_id] = port_id
+        self.maps = maps
+        self.stats['full_loads'] += 1
+
+    def _get_notifications_enabled(self):
+        try:
+            return keyspace_notifications_enabled(self.client)
+        except Exception:
+            return False
+
+    def _update(self):
+        changed = set()
+        while True:
+            message = self.pubsub.get_message()
+            if message is None:
+                break
+            if message['type'] == 'pmessage':
+                changed.add(self._key_from_channel(message['channel']))
+        if not changed:
+            return
+
+        keys = list(changed)
+        for key, ent in zip(keys, hgetall_pipelined(self.client, keys)):
+            str_key = key.decode() if isinstance(key, bytes) else key
+            for prefix, parse in self.OBJECT_TYPES.items():
+                if str_key.startswith(prefix):
+                    obj_id, port_id = parse(key, ent, self.binary)
+                    if port_id is None:
+                        self.maps[prefix].pop(obj_id, None)
+                    else:
+                        self.maps[prefix][obj_id] = port_id
+        self.stats['updates'] += 1
+        self.stats['updated_objects'] += len(keys)
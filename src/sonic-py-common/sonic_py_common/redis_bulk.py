@@ -0,0 +1,91 @@
+"""
+Bulk reads of SONiC databases through a redis-py client: SCAN, pipelined
+HGETALL and keyspace notification configuration.
+"""
+from swsscommon import swsscommon
+
+
+"""
+Number of keys requested per SCAN call and number of
+HGETALL commands sent per pipeline.
+"""
+SCAN_COUNT = 1000
+PIPELINE_DEPTH = 512
+
+"""
+Keyspace event classes needed to follow hashes: K keyspace events
+and A all commands, or h hash and g generic commands such as DEL.
+"""
+KEYSPACE_EVENT_CLASSES = ['KA', 'Khg']
+
+# (db name, namespace) -> redis-py client of a SonicV2Connector
+redis_clients = {}
+
+
+def get_redis_client(db, db_name):
+    """
+        Get a redis-py client of db_name, which supports SCAN and pipelines
+        db is a SonicV2Connector or a swsssdk connector
+        Return None if there is no such client
+    """
+    if isinstance(db, swsscommon.SonicV2Connector) == False:
+        # swsssdk connector, the client has the same decode_responses setting as the connector
+        client = db.get_redis_client(db_name)
+        return client if hasattr(client, 'pipeline') else None
+
+    try:
+        import redis
+    except ImportError:
+        return None
+    namespace = db.getNamespace()
+    client_key = (db_name, namespace)
+    if client_key not in redis_clients:
+        db_id = swsscommon.SonicDBConfig.getDbId(db_name, namespace)
+        db_sock = swsscommon.SonicDBConfig.getDbSock(db_name, namespace)
+        if db_sock:
+            client = redis.Redis(unix_socket_path=db_sock, db=db_id, decode_responses=True)
+        else:
+            client = redis.Redis(host=swsscommon.SonicDBConfig.getDbHostname(db_name, namespace),
+                                 port=swsscommon.SonicDBConfig.getDbPort(db_name, namespace),
+                                 db=db_id, decode_responses=True)
+        redis_clients[client_key] = client
+    return redis_clients[client_key]
+
+
+def hgetall_pipelined(client, keys):
+    """
+        Get all the fields of keys with pipelined HGETALL
+        Return list of the entries, in the order of keys, an empty entry for a key that doesn't exist
+    """
+    entries = []
+    for idx in range(0, len(keys), PIPELINE_DEPTH):
+        pipe = client.pipeline(transaction=False)
+        for key in keys[idx:idx + PIPELINE_DEPTH]:
+            pipe.hgetall(key)
+        entries.extend(pipe.execute())
+    return entries
+
+
+def scan_entries(client, patterns):
+    """
+        Get the keys which match any of patterns with SCAN and their entries with pipelined HGETALL
+        Return list of (key, entry)
+    """
+    keys = []
+    for pattern in patterns:
+        keys.extend(client.scan_iter(match=pattern, count=SCAN_COUNT))
+    keys = list(dict.fromkeys(keys))
+    # A key deleted between SCAN and HGETALL has an empty entry
+    return [(key, entry) for key, entry in zip(keys, hgetall_pipelined(client, keys)) if entry]
+
+
+def keyspace_notifications_enabled(client):
+    """
+        Return True if the database publishes the keyspace notifications of hash changes
+        Raise the client error if the configuration can't be read
+    """
+    config = client.config_get('notify-keyspace-events')
+    events = config.get('notify-keyspace-events', config.get(b'notify-keyspace-events', ''))
+    if isinstance(events, bytes):
+        events = events.decode()
+    return any(all(c in events for c in classes) for classes in KEYSPACE_EVENT_CLASSES)
@@ -1,5 +1,257 @@
 ## ref: https://github.com/p/redis-dump-load/blob/7bbdb1eaea0a51ed4758d3ce6ca01d497a4e7429/redisdl.py
 
+import collections
+import json
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+## Streaming engine
+## A streaming dump starts with a JSON header line, followed by the records, optionally zstd compressed:
+##   jsonl:  one JSON object per key: {"key", "type", "value"[, "pttl"]}
+##   binary: per key: key length, payload length, pttl (-1 if none), key, payload of redis DUMP
+## Keys are read with SCAN and written one chunk at a time, so memory use does not grow with the database.
+
+STREAM_FORMAT_VERSION = 1
+STREAM_FORMATS = ('jsonl', 'binary')
+STREAM_CHUNK_SIZE = 1000
+STREAM_READ_SIZE = 65536
+BINARY_RECORD_HEADER = struct.Struct('>IIq')
+
+
+def _get_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError('zstd compression requires the zstandard python module')
+    return zstandard
+
+
+def _iter_chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _run_bounded(executor, jobs, func, chunks, consume):
+    """
+    Run func on every chunk in the executor, and pass the results to consume in chunk order.
+    At most 2 * jobs chunks are in flight.
+    """
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(executor.submit(func, chunk))
+        if len(pending) > 2 * jobs:
+            consume(pending.popleft().result())
+    while pending:
+        consume(pending.popleft().result())
+
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        block = stream.read(size - len(data))
+        if not block:
+            raise ValueError('truncated sonic-db-dump stream')
+        data += block
+    return data
+
+
+def _iter_lines(stream):
+    buf = b''
+    while True:
+        block = stream.read(STREAM_READ_SIZE)
+        if not block:
+            break
+        lines = (buf + block).split(b'\n')
+        buf = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if buf:
+        yield buf
+
+
+VALUE_READERS = {
+    'string': lambda pipe, key: pipe.get(key),
+    'hash': lambda pipe, key: pipe.hgetall(key),
+    'list': lambda pipe, key: pipe.lrange(key, 0, -1),
+    'set': lambda pipe, key: pipe.smembers(key),
+    'zset': lambda pipe, key: pipe.zrange(key, 0, -1, withscores=True),
+}
+
+VALUE_WRITERS = {
+    'string': lambda pipe, key, value: pipe.set(key, value),
+    'hash': lambda pipe, key, value: pipe.hset(key, mapping=value),
+    'list': lambda pipe, key, value: pipe.rpush(key, *value),
+    'set': lambda pipe, key, value: pipe.sadd(key, *value),
+    'zset': lambda pipe, key, value: pipe.zadd(key, dict(value)),
+}
+
+
+def _decode_value(key_type, value, encoding):
+    if key_type == 'string':
+        return value.decode(encoding)
+    if key_type == 'hash':
+        return {field.decode(encoding): data.decode(encoding) for field, data in value.items()}
+    if key_type == 'set':
+        return sorted(member.decode(encoding) for member in value)
+    if key_type == 'zset':
+        return [[member.decode(encoding), score] for member, score in value]
+    return [item.decode(encoding) for item in value]
+
+
+def _dump_jsonl_chunk(client, keys, encoding):
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.type(key)
+    key_types = [key_type.decode() if isinstance(key_type, bytes) else key_type for key_type in pipe.execute()]
+
+    pipe = client.pipeline(transaction=False)
+    fetched = []
+    for key, key_type in zip(keys, key_types):
+        # Type is 'none' if the key was deleted after SCAN
+        if key_type in VALUE_READERS:
+            VALUE_READERS[key_type](pipe, key)
+            pipe.pttl(key)
+            fetched.append((key, key_type))
+    replies = pipe.execute()
+
+    lines = []
+    for idx, (key, key_type) in enumerate(fetched):
+        value, pttl = replies[2 * idx], replies[2 * idx + 1]
+        record = {'key': key.decode(encoding), 'type': key_type, 'value': _decode_value(key_type, value, encoding)}
+        if pttl is not None and pttl > 0:
+            record['pttl'] = pttl
+        lines.append(json.dumps(record).encode(encoding) + b'\n')
+    return len(lines), b''.join(lines)
+
+
+def _dump_binary_chunk(client, keys, encoding):
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.pttl(key)
+        pipe.dump(key)
+    replies = pipe.execute()
+
+    records = []
+    for idx, key in enumerate(keys):
+        pttl, payload = replies[2 * idx], replies[2 * idx + 1]
+        # Payload is None if the key was deleted after SCAN
+        if payload is not None:
+            records.append(BINARY_RECORD_HEADER.pack(len(key), len(payload), pttl) + key + payload)
+    return len(records), b''.join(records)
+
+
+def stream_dump(client, output, fmt='jsonl', compress=False, keys='*', encoding='utf-8',
+                jobs=1, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Dump the keys matching keys pattern to the binary file output with the streaming engine.
+    client is a redis-py client without decode_responses.
+    Chunks of chunk_size keys are fetched with pipelines by jobs worker threads.
+    Return number of dumped keys.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError('unknown sonic-db-dump format {}'.format(fmt))
+    header = {'sonic_db_dump': STREAM_FORMAT_VERSION, 'format': fmt, 'compression': 'zstd' if compress else None}
+    output.write(json.dumps(header).encode() + b'\n')
+    writer = output
+    if compress:
+        zstd = _get_zstd()
+        writer = zstd.ZstdCompressor().stream_writer(output, closefd=False)
+
+    dump_chunk = _dump_binary_chunk if fmt == 'binary' else _dump_jsonl_chunk
+    count = [0]
+
+    def write_chunk(result):
+        count[0] += result[0]
+        writer.write(result[1])
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        _run_bounded(executor, jobs, lambda chunk: dump_chunk(client, chunk, encoding),
+                     _iter_chunks(client.scan_iter(match=keys, count=chunk_size), chunk_size), write_chunk)
+    if compress:
+        writer.flush(zstd.FLUSH_FRAME)
+    output.flush()
+    return count[0]
+
+
+def _iter_jsonl_records(stream, encoding):
+    for line in _iter_lines(stream):
+        yield json.loads(line.decode(encoding))
+
+
+def _iter_binary_records(stream):
+    while True:
+        header = stream.read(BINARY_RECORD_HEADER.size)
+        if not header:
+            break
+        if len(header) < BINARY_RECORD_HEADER.size:
+            header += _read_exact(stream, BINARY_RECORD_HEADER.size - len(header))
+        key_len, payload_len, pttl = BINARY_RECORD_HEADER.unpack(header)
+        yield _read_exact(stream, key_len), pttl, _read_exact(stream, payload_len)
+
+
+def _load_jsonl_chunk(client, records):
+    pipe = client.pipeline(transaction=False)
+    for record in records:
+        key = record['key']
+        pipe.delete(key)
+        VALUE_WRITERS[record['type']](pipe, key, record['value'])
+        if 'pttl' in record:
+            pipe.pexpire(key, record['pttl'])
+    pipe.execute()
+    return len(records)
+
+
+def _load_binary_chunk(client, records):
+    pipe = client.pipeline(transaction=False)
+    for key, pttl, payload in records:
+        pipe.restore(key, max(pttl, 0), payload, replace=True)
+    pipe.execute()
+    return len(records)
+
+
+def stream_load(client, input, empty=False, encoding='utf-8', jobs=1, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Load a dump created by stream_dump from the binary file input.
+    Chunks of chunk_size keys are restored with pipelines by jobs worker threads.
+    Return number of loaded keys.
+    """
+    try:
+        header = json.loads(input.readline().decode())
+    except ValueError:
+        header = {}
+    if not isinstance(header, dict) or header.get('sonic_db_dump') != STREAM_FORMAT_VERSION:
+        raise ValueError('input is not a sonic-db-dump streaming dump')
+    reader = input
+    if header.get('compression') == 'zstd':
+        reader = _get_zstd().ZstdDecompressor().stream_reader(input)
+
+    if header.get('format') == 'binary':
+        records = _iter_binary_records(reader)
+        load_chunk = _load_binary_chunk
+    else:
+        records = _iter_jsonl_records(reader, encoding)
+        load_chunk = _load_jsonl_chunk
+
+    if empty:
+        client.flushdb()
+    count = [0]
+
+    def count_chunk(result):
+        count[0] += result
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        _run_bounded(executor, jobs, lambda chunk: load_chunk(client, chunk),
+                     _iter_chunks(records, chunk_size), count_chunk)
+    return count[0]
+
+
 def sonic_db_dump_load():
     import optparse
     import os.path
@@ -47,16 +299,26 @@ def sonic_db_dump_load():
 
         return args
 
+    def get_stream_client(kwargs):
+        import redis
+        conn_kwargs = {k: kwargs[k] for k in ('host', 'port', 'db', 'unix_socket_path', 'password') if kwargs.get(k) is not None}
+        return redis.Redis(encoding=kwargs.get('encoding', 'utf-8'), **conn_kwargs)
+
     def do_dump(options):
         if multi_asic.is_multi_asic():
             SonicDBConfig.initializeGlobalConfig()
+        streaming = getattr(options, 'streaming', False)
         if options.output:
-            output = open(options.output, 'w')
+            output = open(options.output, 'wb' if streaming else 'w')
         else:
-            output = sys.stdout
+            output = sys.stdout.buffer if streaming else sys.stdout
 
         kwargs = options_to_kwargs(options)
-        dump(output, **kwargs)
+        if streaming:
+            stream_dump(get_stream_client(kwargs), output, fmt=options.format, compress=options.compress,
+                        keys=options.keys or '*', encoding=kwargs.get('encoding', 'utf-8'), jobs=options.jobs)
+        else:
+            dump(output, **kwargs)
 
         if options.output:
             output.close()
@@ -64,13 +326,18 @@ def sonic_db_dump_load():
     def do_load(options, args):
         if multi_asic.is_multi_asic():
             SonicDBConfig.initializeGlobalConfig()
+        streaming = getattr(options, 'streaming', False)
         if len(args) > 0:
             input = open(args[0], 'rb')
         else:
-            input = sys.stdin
+            input = sys.stdin.buffer if streaming else sys.stdin
 
         kwargs = options_to_kwargs(options)
-        load(input, **kwargs)
+        if streaming:
+            stream_load(get_stream_client(kwargs), input, empty=kwargs.get('empty', False),
+                        encoding=kwargs.get('encoding', 'utf-8'), jobs=options.jobs)
+        else:
+            load(input, **kwargs)
 
         if len(args) > 0:
             input.close()
@@ -111,6 +378,10 @@ def sonic_db_dump_load():
         parser.add_option('-o', '--output', help='write to OUTPUT instead of stdout')
         parser.add_option('-y', '--pretty', help='split output on multiple lines and indent it', action='store_true')
         parser.add_option('-E', '--encoding', help='set encoding to use while decoding data from redis', default='utf-8')
+        parser.add_option('-S', '--streaming', help='dump with the streaming engine instead of redisdl', action='store_true')
+        parser.add_option('-f', '--format', help='streaming dump format (jsonl[default] or binary)', choices=STREAM_FORMATS, default='jsonl')
+        parser.add_option('-z', '--compress', help='compress the streaming dump with zstd', action='store_true')
+        parser.add_option('-j', '--jobs', help='number of streaming worker threads', type='int', default=1)
     elif help == LOAD:
         parser.add_option('-n', '--dbname', help='dump DATABASE (APPL_DB/ASIC_DB...)')
         parser.add_option('-t', '--conntype', help='indicate redis connection type (tcp[default] or unix_socket)', default='tcp')
@@ -118,6 +389,8 @@ def sonic_db_dump_load():
         parser.add_option('-E', '--encoding', help='set encoding to use while encoding data to redis', default='utf-8')
         parser.add_option('-B', '--backend', help='use specified streaming backend')
         parser.add_option('-A', '--use-expireat', help='use EXPIREAT rather than TTL/EXPIRE', action='store_true')
+        parser.add_option('-S', '--streaming', help='load a dump created with the streaming engine', action='store_true')
+        parser.add_option('-j', '--jobs', help='number of streaming worker threads', type='int', default=1)
     else:
         parser.add_option('-l', '--load', help='load data into redis (default is to dump data from redis)', action='store_true')
         parser.add_option('-n', '--dbname', help='dump DATABASE (APPL_DB/ASIC_DB/COUNTERS_DB/CONFIG_DB...)')
@@ -129,6 +402,10 @@ def sonic_db_dump_load():
         parser.add_option('-E', '--encoding', help='set encoding to use while decoding data from redis', default='utf-8')
         parser.add_option('-A', '--use-expireat', help='use EXPIREAT rather than TTL/EXPIRE', action='store_true')
         parser.add_option('-B', '--backend', help='use specified streaming backend (load mode only)')
+        parser.add_option('-S', '--streaming', help='use the streaming engine instead of redisdl', action='store_true')
+        parser.add_option('-f', '--format', help='streaming dump format (jsonl[default] or binary, dump mode only)', choices=STREAM_FORMATS, default='jsonl')
+        parser.add_option('-z', '--compress', help='compress the streaming dump with zstd (dump mode only)', action='store_true')
+        parser.add_option('-j', '--jobs', help='number of streaming worker threads', type='int', default=1)
     options, args = parser.parse_args()
 
     if hasattr(options, 'load') and options.load:
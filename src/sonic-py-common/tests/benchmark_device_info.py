@@ -0,0 +1,80 @@
+"""Micro-benchmark of the device_info calls made while `show` commands start up,
+with and without the metadata cache.
+
+Usage (from src/sonic-py-common):
+    python -m tests.benchmark_device_info [--iterations N]
+
+Metadata files are generated in a temporary directory. CONFIG_DB is replaced
+by an in-process fake, so only parsing and connection setup costs are measured.
+"""
+import argparse
+import os
+import tempfile
+import time
+from unittest import mock
+
+from sonic_py_common import device_info
+
+from .device_info_test import MACHINE_CONF_CONTENTS, SONIC_VERISON_YML
+
+
+class FakeConfigDBConnector(object):
+    def connect(self):
+        pass
+
+    def get_table(self, table):
+        return {'localhost': {'hwsku': 'Mellanox-SN2700', 'hostname': 'sonic', 'switch_type': 'switch'}}
+
+
+def show_startup_path():
+    device_info.get_platform()
+    device_info.get_hwsku()
+    device_info.get_hostname()
+    device_info.get_sonic_version_info()
+    device_info.is_multi_npu()
+    device_info.is_voq_chassis()
+    device_info.is_packet_chassis()
+
+
+def run(iterations, cached):
+    device_info.refresh()
+    if cached:
+        device_info.enable_device_metadata_cache(subscribe=False)
+    start = time.monotonic()
+    for _ in range(iterations):
+        if not cached:
+            device_info.refresh()
+        show_startup_path()
+    elapsed = time.monotonic() - start
+    device_info.disable_device_metadata_cache()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='device_info metadata cache benchmark')
+    parser.add_argument('--iterations', type=int, default=10000, help='number of show startup paths to run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {}
+        for name, content in [('machine.conf', MACHINE_CONF_CONTENTS), ('sonic_version.yml', SONIC_VERISON_YML),
+                              ('asic.conf', 'NUM_ASIC=6\n')]:
+            paths[name] = os.path.join(tmp_dir, name)
+            with open(paths[name], 'w') as f:
+                f.write(content)
+        with mock.patch.dict(os.environ, {}, clear=True), \
+                mock.patch('sonic_py_common.device_info.MACHINE_CONF_PATH', paths['machine.conf']), \
+                mock.patch('sonic_py_common.device_info.SONIC_VERSION_YAML_PATH', paths['sonic_version.yml']), \
+                mock.patch('sonic_py_common.device_info.get_asic_conf_file_path', return_value=paths['asic.conf']), \
+                mock.patch('sonic_py_common.device_info.ConfigDBConnector', FakeConfigDBConnector):
+            uncached = run(args.iterations, False)
+            cached = run(args.iterations, True)
+
+    print('iterations        %d' % args.iterations)
+    print('without cache     %.3f s (%.1f us per path)' % (uncached, uncached * 1e6 / args.iterations))
+    print('with cache        %.3f s (%.1f us per path)' % (cached, cached * 1e6 / args.iterations))
+    print('cache stats       %s' % device_info.get_metadata_cache_stats())
+
+
+if __name__ == '__main__':
+    main()
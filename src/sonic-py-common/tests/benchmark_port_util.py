@@ -0,0 +1,115 @@
+"""Benchmark of the port_util ASIC_DB map builders: per-key reads, bulk SCAN with
+pipelined HGETALL, and the keyspace notification based cache.
+
+Usage (from src/sonic-py-common):
+    python -m tests.benchmark_port_util [--unix-socket PATH | --host H --port P] [--db N]
+                                        [--bridge-ports N] [--rifs N] [--iterations N]
+
+A local redis is required. Synthetic ASIC_DB objects are written to the given
+scratch database (15 by default) and removed when the benchmark ends.
+Keyspace notifications are enabled on the server for the cache pass.
+"""
+import argparse
+import time
+
+import redis
+
+from sonic_py_common import port_util, redis_bulk
+
+
+class RedisConnector(object):
+    """swsssdk style connector on top of a redis-py client"""
+    def __init__(self, client):
+        self.client = client
+        self.dbintf = type('DBInterface', (object,), {'redis_kwargs': {'decode_responses': True}})()
+
+    def connect(self, db_name):
+        pass
+
+    def get_redis_client(self, db_name):
+        return self.client
+
+    def keys(self, db_name, pattern):
+        return self.client.keys(pattern)
+
+    def get_all(self, db_name, key, blocking=False):
+        return self.client.hgetall(key)
+
+
+def populate(client, n_bridge_ports, n_rifs):
+    keys = []
+    pipe = client.pipeline(transaction=False)
+    for idx in range(n_bridge_ports):
+        key = '%soid:0x3a%012x' % (port_util.BRIDGE_PORT_KEY_PREFIX, idx)
+        pipe.hset(key, mapping={'SAI_BRIDGE_PORT_ATTR_TYPE': 'SAI_BRIDGE_PORT_TYPE_PORT',
+                                'SAI_BRIDGE_PORT_ATTR_PORT_ID': 'oid:0x10%012x' % (idx % 512),
+                                'SAI_BRIDGE_PORT_ATTR_ADMIN_STATE': 'true'})
+        keys.append(key)
+    for idx in range(n_rifs):
+        key = '%soid:0x60%012x' % (port_util.RIF_KEY_PREFIX, idx)
+        pipe.hset(key, mapping={'SAI_ROUTER_INTERFACE_ATTR_TYPE': 'SAI_ROUTER_INTERFACE_TYPE_PORT',
+                                'SAI_ROUTER_INTERFACE_ATTR_PORT_ID': 'oid:0x10%012x' % (idx % 512)})
+        keys.append(key)
+    pipe.execute()
+    return keys
+
+
+def measure(iterations, func):
+    start = time.monotonic()
+    for _ in range(iterations):
+        result = func()
+    return (time.monotonic() - start) / iterations, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='port_util ASIC_DB map benchmark')
+    parser.add_argument('--host', default='127.0.0.1', help='redis host')
+    parser.add_argument('--port', type=int, default=6379, help='redis port')
+    parser.add_argument('--unix-socket', help='redis unix socket, used instead of host and port')
+    parser.add_argument('--db', type=int, default=15, help='scratch database id')
+    parser.add_argument('--bridge-ports', type=int, default=4096, help='number of bridge port objects')
+    parser.add_argument('--rifs', type=int, default=512, help='number of router interface objects')
+    parser.add_argument('--iterations', type=int, default=10, help='number of map refreshes per mode')
+    args = parser.parse_args()
+
+    if args.unix_socket:
+        client = redis.Redis(unix_socket_path=args.unix_socket, db=args.db, decode_responses=True)
+    else:
+        client = redis.Redis(host=args.host, port=args.port, db=args.db, decode_responses=True)
+    client.config_set('notify-keyspace-events', 'AKE')
+    db = RedisConnector(client)
+    keys = populate(client, args.bridge_ports, args.rifs)
+    try:
+        def refresh(bulk):
+            return port_util.get_bridge_port_map(db, bulk=bulk), port_util.get_rif_port_map(db, bulk=bulk)
+
+        per_key, expected = measure(args.iterations, lambda: refresh(False))
+        bulk, result = measure(args.iterations, lambda: refresh(True))
+        assert result == expected
+
+        cache = port_util.AsicPortMapCache(db)
+        start = time.monotonic()
+        cache.get_bridge_port_map()
+        cache_load = time.monotonic() - start
+
+        def cached_refresh():
+            # One bridge port changes between refreshes
+            client.hset(keys[0], 'SAI_BRIDGE_PORT_ATTR_ADMIN_STATE', str(time.monotonic()))
+            return cache.get_bridge_port_map(), cache.get_rif_port_map()
+        cached, result = measure(args.iterations, cached_refresh)
+        assert result == expected
+        cache.close()
+    finally:
+        for idx in range(0, len(keys), redis_bulk.PIPELINE_DEPTH):
+            client.delete(*keys[idx:idx + redis_bulk.PIPELINE_DEPTH])
+
+    print('objects           %d bridge ports, %d RIFs' % (args.bridge_ports, args.rifs))
+    print('per-key           %.2f ms per refresh' % (per_key * 1e3))
+    print('bulk              %.2f ms per refresh' % (bulk * 1e3))
+    print('cache load        %.2f ms' % (cache_load * 1e3))
+    print('cache refresh     %.2f ms per refresh' % (cached * 1e3))
+    print('cache stats       %s' % cache.get_stats())
+
+
+if __name__ == '__main__':
+    main()
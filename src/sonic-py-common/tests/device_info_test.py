@@ -79,6 +79,41 @@ SONIC_VERISON_YML_RESULT = {
     'sonic_utilities': 1.2
 }
 
+# ONIE TlvInfo syseeprom cache of a MSN2700, base MAC 98:03:9B:9C:4A:00
+SYSEEPROM_CACHE_CONTENTS = bytes.fromhex(
+    "546c76496e666f0001003821074d534e32373030220d4d534e323730302d435332464f230c4d54313832324b30373831"
+    "35240698039b9c4a002a020080fe04738a4c2f")
+
+CISCO_PROFILE_INI_CONTENTS = """\
+asic0switchMacAddress=00:11:22:33:44:01
+asic1switchMacAddress=00:11:22:33:44:02
+"""
+
+MARVELL_PROFILE_INI_CONTENTS = """\
+switchMacAddress=00:50:43:00:00:01
+"""
+
+SYSTEM_MAC_TEST_MATRIX = [
+    # asic_type, machine.conf vars, syseeprom cache, profile.ini, sysfs addresses, namespace, run_command result, expected
+    ('mellanox', {'onie_base_mac': 'e4:1d:2d:44:5e:80'}, True, None, {}, None, None, 'e4:1d:2d:44:5e:80'),
+    ('mellanox', {}, True, None, {}, None, None, '98:03:9B:9C:4A:00'),
+    ('nvidia-bluefield', {}, False, None, {}, None, ('98:03:9B:9C:4A:01\n', ''), '98:03:9B:9C:4A:01'),
+    ('marvell-prestera', {'onie_machine': 'db98cx8580_32cd'}, False, MARVELL_PROFILE_INI_CONTENTS, {}, None,
+     ('', 'decode-syseeprom failed'), '00:50:43:00:00:01'),
+    ('marvell-prestera', {}, False, None, {'eth0': '00:50:43:00:00:02\n'}, None, ('', 'failed'), '00:50:43:00:00:02'),
+    ('nokia-vs', {}, True, None, {'eth0': '00:50:43:00:00:02\n'}, None, None, '98:03:9B:9C:4A:00'),
+    ('cisco-8000', {}, True, CISCO_PROFILE_INI_CONTENTS, {'eth0': '00:11:22:33:44:00\n'}, 'asic1', None, '00:11:22:33:44:02'),
+    ('cisco-8000', {}, True, CISCO_PROFILE_INI_CONTENTS, {'eth0': '00:11:22:33:44:00\n'}, None, None, '00:11:22:33:44:00'),
+    ('cisco-8000', {}, True, None, {}, None, None, '98:03:9B:9C:4A:00'),
+    ('pensando', {}, False, None, {'eth0': '00:ae:cd:00:00:00\n', 'eth0-midplane': '00:ae:cd:00:00:01\n'}, None, None,
+     '00:ae:cd:00:00:01'),
+    ('broadcom', {}, True, None, {'eth0': '44:4c:a8:00:00:00\n'}, None, None, '44:4c:a8:00:00:00'),
+    ('broadcom', {}, False, None, {'eth0': '44:4c:a8:00:00:00\n'}, 'asic0', ('44:4c:a8:00:00:10\n', ''), '44:4c:a8:00:00:10'),
+    ('centec', {}, False, None, {'eth0': '00:11:22:33:44:ff\n'}, None, None, '00:11:22:33:45:00'),
+    ('broadcom', {}, False, None, {}, None, None, None),
+]
+
+
 class TestDeviceInfo(object):
     @pytest.fixture(scope="class", autouse=True)
     def sanitize_environment(self):
@@ -474,6 +509,181 @@ liquid_cooled=true
         mock_bmc_data.return_value = BMC_DATA
         assert device_info.get_switch_host_address() == "169.254.100.2"
 
+    def test_metadata_file_cache(self, tmp_path):
+        machine_conf = tmp_path / "machine.conf"
+        machine_conf.write_text(MACHINE_CONF_CONTENTS)
+        device_info.refresh()
+        with mock.patch("sonic_py_common.device_info.MACHINE_CONF_PATH", str(machine_conf)):
+            stats = device_info.get_metadata_cache_stats()
+            assert device_info.get_machine_info() == EXPECTED_GET_MACHINE_INFO_RESULT
+            with mock.patch("{}.open".format(BUILTINS)) as open_mocked:
+                for _ in range(0, 5):
+                    assert device_info.get_platform() == "x86_64-mlnx_msn2700-r0"
+                open_mocked.assert_not_called()
+            new_stats = device_info.get_metadata_cache_stats()
+            assert new_stats['misses'] == stats['misses'] + 1
+            assert new_stats['hits'] == stats['hits'] + 5
+
+            # Changed file is read again
+            machine_conf.write_text(MACHINE_CONF_CONTENTS.replace("x86_64-mlnx_msn2700-r0", "x86_64-mlnx_msn2410-r0"))
+            os.utime(str(machine_conf), ns=(0, os.stat(str(machine_conf)).st_mtime_ns + 1))
+            assert device_info.get_platform() == "x86_64-mlnx_msn2410-r0"
+
+            # Returned dictionary can be changed by caller
+            device_info.get_machine_info()['onie_platform'] = 'none'
+            assert device_info.get_platform() == "x86_64-mlnx_msn2410-r0"
+
+    def test_device_metadata_cache(self):
+        cfg_db = mock.MagicMock()
+        cfg_db.get_table.return_value = {"localhost": {"hwsku": "Mellanox-SN2700", "hostname": "sonic"}}
+        selector = mock.MagicMock()
+        subscriber = mock.MagicMock()
+        with mock.patch("sonic_py_common.device_info.ConfigDBConnector", return_value=cfg_db), \
+                mock.patch("sonic_py_common.device_info.Select") as select_mocked, \
+                mock.patch("sonic_py_common.device_info.SubscriberStateTable", return_value=subscriber), \
+                mock.patch("sonic_py_common.device_info.DBConnector"):
+            select_mocked.return_value = selector
+            select_mocked.OBJECT = "OBJECT"
+            select_mocked.TIMEOUT = "TIMEOUT"
+            selector.select.return_value = ("TIMEOUT", None)
+            device_info.enable_device_metadata_cache()
+            try:
+                for _ in range(0, 5):
+                    assert device_info.get_hwsku() == "Mellanox-SN2700"
+                    assert device_info.get_hostname() == "sonic"
+                cfg_db.get_table.assert_called_once_with("DEVICE_METADATA")
+
+                # Explicit config_db is always read
+                other_db = mock.MagicMock()
+                other_db.get_table.return_value = {"localhost": {"hwsku": "ACS-MSN2700"}}
+                assert device_info.get_localhost_info("hwsku", other_db) == "ACS-MSN2700"
+
+                # DEVICE_METADATA change notification drops the cached entry
+                cfg_db.get_table.return_value = {"localhost": {"hwsku": "ACS-MSN2700", "hostname": "sonic"}}
+                selector.select.side_effect = [("OBJECT", subscriber), ("TIMEOUT", None)]
+                subscriber.pops.return_value = [("localhost", "SET", (("hwsku", "ACS-MSN2700"),))]
+                assert device_info.get_hwsku() == "ACS-MSN2700"
+                assert cfg_db.get_table.call_count == 2
+
+                device_info.refresh()
+                selector.select.side_effect = None
+                assert device_info.get_hwsku() == "ACS-MSN2700"
+                assert cfg_db.get_table.call_count == 3
+            finally:
+                device_info.disable_device_metadata_cache()
+
+    def setup_system_mac_sources(self, tmp_path, syseeprom, profile, sysfs):
+        eeprom_file = tmp_path / "syseeprom_cache"
+        if syseeprom:
+            eeprom_file.write_bytes(SYSEEPROM_CACHE_CONTENTS)
+        device_dir = tmp_path / "device"
+        for profile_dir in [device_dir / "x86_64-test-r0", device_dir / "x86_64-test-r0" / "db98cx8580_32cd"]:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            if profile is not None:
+                (profile_dir / "profile.ini").write_text(profile)
+        for ifname, address in sysfs.items():
+            (tmp_path / "net" / ifname).mkdir(parents=True)
+            (tmp_path / "net" / ifname / "address").write_text(address)
+        return [mock.patch("sonic_py_common.device_info.SYSEEPROM_CACHE_FILE", str(eeprom_file)),
+                mock.patch("sonic_py_common.device_info.HOST_DEVICE_PATH", str(device_dir)),
+                mock.patch("sonic_py_common.device_info.SYS_CLASS_NET_PATH", str(tmp_path / "net")),
+                mock.patch("sonic_py_common.device_info.SYSTEM_MAC_CACHE_FILE", str(tmp_path / "run" / "system_mac.json")),
+                mock.patch("sonic_py_common.device_info.get_platform", return_value="x86_64-test-r0")]
+
+    @pytest.mark.parametrize("asic_type,machine_vars,syseeprom,profile,sysfs,namespace,cmd_result,expected",
+                             SYSTEM_MAC_TEST_MATRIX)
+    def test_get_system_mac(self, tmp_path, asic_type, machine_vars, syseeprom, profile, sysfs, namespace, cmd_result, expected):
+        patches = self.setup_system_mac_sources(tmp_path, syseeprom, profile, sysfs)
+        patches += [mock.patch("sonic_py_common.device_info.get_sonic_version_info", return_value={'asic_type': asic_type}),
+                    mock.patch("sonic_py_common.device_info.get_machine_info", return_value=machine_vars)]
+        for patcher in patches:
+            patcher.start()
+        try:
+            with mock.patch("sonic_py_common.device_info.run_command") as run_command_mocked:
+                run_command_mocked.return_value = cmd_result if cmd_result is not None else ('', 'not expected')
+                assert device_info.get_system_mac(namespace=namespace, use_cache=False) == expected
+                if cmd_result is None:
+                    run_command_mocked.assert_not_called()
+                elif namespace is not None:
+                    run_command_mocked.assert_called_once_with(
+                        ['sudo', 'ip', 'netns', 'exec', namespace, 'cat', str(tmp_path / "net" / "eth0" / "address")])
+                else:
+                    run_command_mocked.assert_called_once_with(["sudo", "decode-syseeprom", "-m"])
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+    def test_get_system_mac_cache(self, tmp_path):
+        machine_vars = {'onie_base_mac': '44:4c:a8:00:00:00'}
+        patches = self.setup_system_mac_sources(tmp_path, False, None, {'eth0': '44:4c:a8:00:00:10\n'})
+        patches += [mock.patch("sonic_py_common.device_info.get_sonic_version_info", return_value={'asic_type': 'mellanox'}),
+                    mock.patch("sonic_py_common.device_info.get_machine_info", side_effect=lambda: machine_vars)]
+        for patcher in patches:
+            patcher.start()
+        try:
+            assert device_info.get_system_mac() == '44:4c:a8:00:00:00'
+            with open(str(tmp_path / "run" / "system_mac.json")) as cache_file:
+                assert json.load(cache_file) == {'platform': 'x86_64-test-r0', 'mac': {'None': '44:4c:a8:00:00:00'}}
+            assert os.listdir(str(tmp_path / "run")) == ["system_mac.json"]
+
+            # Later calls load the MAC address from the cache
+            machine_vars = {'onie_base_mac': '44:4c:a8:00:00:01'}
+            assert device_info.get_system_mac() == '44:4c:a8:00:00:00'
+            assert device_info.get_system_mac(use_cache=False) == '44:4c:a8:00:00:01'
+
+            # Cache of another platform is ignored
+            with mock.patch("sonic_py_common.device_info.get_platform", return_value="x86_64-other-r0"):
+                assert device_info.get_system_mac() == '44:4c:a8:00:00:01'
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+    def test_get_system_mac_cache_interface(self, tmp_path):
+        # The MAC address of eth0 can be changed at runtime, it is never cached
+        patches = self.setup_system_mac_sources(tmp_path, False, None, {'eth0': '44:4c:a8:00:00:00\n'})
+        patches += [mock.patch("sonic_py_common.device_info.get_sonic_version_info", return_value={'asic_type': 'broadcom'})]
+        for patcher in patches:
+            patcher.start()
+        try:
+            assert device_info.get_system_mac() == '44:4c:a8:00:00:00'
+            assert not os.path.exists(str(tmp_path / "run" / "system_mac.json"))
+            (tmp_path / "net" / "eth0" / "address").write_text('44:4c:a8:00:00:01\n')
+            assert device_info.get_system_mac() == '44:4c:a8:00:00:01'
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+    def test_get_system_mac_cache_fallback(self, tmp_path):
+        patches = self.setup_system_mac_sources(tmp_path, False, None, {'eth0': '00:50:43:00:00:02\n'})
+        patches += [mock.patch("sonic_py_common.device_info.get_sonic_version_info", return_value={'asic_type': 'marvell-prestera'}),
+                    mock.patch("sonic_py_common.device_info.get_machine_info", return_value={})]
+        for patcher in patches:
+            patcher.start()
+        try:
+            with mock.patch("sonic_py_common.device_info.run_command", return_value=('', 'failed')):
+                # eth0 answers while the syseeprom is not readable yet, its MAC address is not cached
+                assert device_info.get_system_mac() == '00:50:43:00:00:02'
+                assert not os.path.exists(str(tmp_path / "run" / "system_mac.json"))
+
+                (tmp_path / "syseeprom_cache").write_bytes(SYSEEPROM_CACHE_CONTENTS)
+                assert device_info.get_system_mac() == '98:03:9B:9C:4A:00'
+                with open(str(tmp_path / "run" / "system_mac.json")) as cache_file:
+                    assert json.load(cache_file) == {'platform': 'x86_64-test-r0', 'mac': {'None': '98:03:9B:9C:4A:00'}}
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+    def test_read_syseeprom_base_mac(self, tmp_path):
+        eeprom_file = tmp_path / "syseeprom_cache"
+        assert device_info.read_syseeprom_base_mac(str(eeprom_file)) is None
+        eeprom_file.write_bytes(SYSEEPROM_CACHE_CONTENTS)
+        assert device_info.read_syseeprom_base_mac(str(eeprom_file)) == '98:03:9B:9C:4A:00'
+        eeprom_file.write_bytes(b'\xff' * 256)
+        assert device_info.read_syseeprom_base_mac(str(eeprom_file)) is None
+        # Truncated TLV is ignored
+        eeprom_file.write_bytes(SYSEEPROM_CACHE_CONTENTS[:53])
+        assert device_info.read_syseeprom_base_mac(str(eeprom_file)) is None
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -1,4 +1,5 @@
 from unittest import mock
+import pytest
 from sonic_py_common import multi_asic
 
 
@@ -23,3 +24,114 @@ class TestMultiAsic:
                 assert multi_asic.get_asic_sub_role(0) == 'FrontEnd'
                 assert multi_asic.get_asic_sub_role(1) == 'BackEnd'
                 assert multi_asic.get_asic_sub_role(2) == None
+
+    def setup_method(self):
+        multi_asic.reset_db_pool()
+
+    def teardown_method(self):
+        multi_asic.disable_port_namespace_index()
+        multi_asic.reset_db_pool()
+
+    def get_config_dbs(self, tables):
+        config_dbs = {}
+        for ns, ns_tables in tables.items():
+            config_db = mock.MagicMock()
+            config_db.get_table.side_effect = lambda table, ns_tables=ns_tables: dict(ns_tables.get(table, {}))
+            config_db.get_entry.side_effect = lambda table, key, ns_tables=ns_tables: ns_tables.get(table, {}).get(key, {})
+            config_dbs[ns] = config_db
+        return config_dbs
+
+    def test_db_pool(self):
+        config_dbs = self.get_config_dbs({'asic0': {'PORT': {'Ethernet0': {'role': 'Ext'}}}})
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns', side_effect=lambda ns: config_dbs[ns]) as connect:
+            for _ in range(3):
+                assert multi_asic.get_table_entry_for_asic('PORT', 'Ethernet0', 'asic0') == {'role': 'Ext'}
+            connect.assert_called_once_with('asic0')
+
+            # Broken connection is made again
+            config_dbs['asic0'].get_table.side_effect = [RuntimeError('Unable to connect to redis'), {'Ethernet0': {}}]
+            assert multi_asic.get_table_for_asic('PORT', 'asic0') == {'Ethernet0': {}}
+            assert connect.call_count == 2
+
+        # Replacing the connect function replaces pooled connections
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns') as connect:
+            connect.return_value.get_entry.return_value = {}
+            assert multi_asic.get_table_entry_for_asic('PORT', 'Ethernet0', 'asic0') == {}
+            connect.assert_called_once_with('asic0')
+
+    def test_get_table_all_namespaces(self):
+        config_dbs = self.get_config_dbs({
+            'asic0': {'PORT': {'Ethernet0': {'role': 'Ext'}, 'Ethernet-BP0': {'role': 'Int'}}},
+            'asic1': {'PORT': {'Ethernet4': {'role': 'Ext'}, 'Ethernet-BP0': {'role': 'Int', 'lanes': '1'}}},
+        })
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns', side_effect=lambda ns: config_dbs[ns]), \
+                mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0', 'asic1']):
+            assert multi_asic.get_table_all_namespaces('PORT') == {
+                'Ethernet0': {'role': 'Ext'}, 'Ethernet4': {'role': 'Ext'}, 'Ethernet-BP0': {'role': 'Int', 'lanes': '1'}}
+            assert multi_asic.get_table_all_namespaces('PORT', merge=False) == {
+                'asic0': config_dbs['asic0'].get_table('PORT'), 'asic1': config_dbs['asic1'].get_table('PORT')}
+            assert multi_asic.get_port_table() == multi_asic.get_table_all_namespaces('PORT')
+
+    def test_get_namespace_for_port(self):
+        config_dbs = self.get_config_dbs({
+            'asic0': {'PORT': {'Ethernet0': {}, 'Ethernet-BP0': {}}},
+            'asic1': {'PORT': {'Ethernet4': {}, 'Ethernet-BP0': {}}},
+        })
+        subscribers = {'asic0': mock.MagicMock(), 'asic1': mock.MagicMock()}
+        for subscriber in subscribers.values():
+            subscriber.pops.return_value = []
+        selector = mock.MagicMock()
+        selector.select.return_value = ('TIMEOUT', None)
+        swsscommon_mock = mock.MagicMock(SET_COMMAND='SET', DEL_COMMAND='DEL')
+        swsscommon_mock.Select.return_value = selector
+        swsscommon_mock.Select.OBJECT = 'OBJECT'
+        swsscommon_mock.DBConnector.side_effect = lambda db_name, timeout, tcp, ns: ns
+        swsscommon_mock.SubscriberStateTable.side_effect = lambda ns, table: subscribers[ns]
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns', side_effect=lambda ns: config_dbs[ns]), \
+                mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0', 'asic1']), \
+                mock.patch('sonic_py_common.multi_asic.swsscommon', swsscommon_mock):
+            multi_asic.enable_port_namespace_index()
+            assert multi_asic.get_namespace_for_port('Ethernet4') == 'asic1'
+            assert multi_asic.get_namespace_for_port('Ethernet0') == 'asic0'
+            assert multi_asic.get_namespace_for_port('Ethernet-BP0') == 'asic0'
+            assert config_dbs['asic0'].get_table.call_count == 1
+
+            # Index is updated by PORT table notifications
+            results = [('OBJECT', subscribers['asic1'])]
+            selector.select.side_effect = lambda timeout: results.pop(0) if results else ('TIMEOUT', None)
+            subscribers['asic1'].pops.side_effect = [[('Ethernet8', 'SET', ()), ('Ethernet4', 'DEL', ())], []]
+            assert multi_asic.get_namespace_for_port('Ethernet8') == 'asic1'
+            with pytest.raises(ValueError):
+                multi_asic.get_namespace_for_port('Ethernet4')
+
+            # A port moved to another namespace is found there, whatever the order of the notifications
+            results = [('OBJECT', subscribers['asic0'])]
+            subscribers['asic0'].pops.side_effect = [[('Ethernet8', 'SET', ()), ('Ethernet-BP0', 'DEL', ())], []]
+            subscribers['asic1'].pops.side_effect = None
+            assert multi_asic.get_namespace_for_port('Ethernet-BP0') == 'asic1'
+            results = [('OBJECT', subscribers['asic1'])]
+            subscribers['asic1'].pops.side_effect = [[('Ethernet8', 'DEL', ())], []]
+            subscribers['asic0'].pops.side_effect = None
+            assert multi_asic.get_namespace_for_port('Ethernet8') == 'asic0'
+            assert config_dbs['asic0'].get_table.call_count == 1
+
+    def test_get_namespace_for_port_without_index(self):
+        config_dbs = self.get_config_dbs({'asic0': {'PORT': {'Ethernet0': {'lanes': '0'}}},
+                                          'asic1': {'PORT': {'Ethernet4': {'lanes': '4'}}}})
+        swsscommon_mock = mock.MagicMock()
+        with mock.patch('sonic_py_common.multi_asic.connect_config_db_for_ns', side_effect=lambda ns: config_dbs[ns]), \
+                mock.patch('sonic_py_common.multi_asic.get_namespace_list', return_value=['asic0', 'asic1']), \
+                mock.patch('sonic_py_common.multi_asic.swsscommon', swsscommon_mock):
+            # One-shot lookups read the port entry of each namespace until it is found
+            assert multi_asic.get_namespace_for_port('Ethernet0') == 'asic0'
+            config_dbs['asic1'].get_entry.assert_not_called()
+            assert multi_asic.get_namespace_for_port('Ethernet4') == 'asic1'
+            swsscommon_mock.SubscriberStateTable.assert_not_called()
+            config_dbs['asic0'].get_table.assert_not_called()
+
+            # The scan is used if the index can't subscribe
+            multi_asic.enable_port_namespace_index()
+            swsscommon_mock.DBConnector.side_effect = RuntimeError('Unable to connect to redis')
+            assert multi_asic.get_namespace_for_port('Ethernet4') == 'asic1'
+            with pytest.raises(ValueError):
+                multi_asic.get_namespace_for_port('Ethernet8')
@@ -17,3 +17,178 @@ class TestPortUtil:
 
         from swsssdk.port_util import get_vlan_interface_oid_map
         assert not get_vlan_interface_oid_map(db, True)
+
+
+class FakeRedis(object):
+    """Minimal redis-py client backed by a dict of hashes, with keyspace notifications"""
+    def __init__(self, hashes, notify_keyspace_events='AKE'):
+        self.hashes = hashes
+        self.notify_keyspace_events = notify_keyspace_events
+        self.connection_pool = mock.MagicMock(connection_kwargs={'db': 1})
+        self.round_trips = 0
+        self.subscribers = []
+
+    def scan_iter(self, match, count):
+        import fnmatch
+        self.round_trips += 1
+        return iter([key for key in self.hashes if fnmatch.fnmatchcase(key, match)])
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class Pipeline(object):
+            def __init__(self):
+                self.keys = []
+
+            def hgetall(self, key):
+                self.keys.append(key)
+
+            def execute(self):
+                client.round_trips += 1
+                return [dict(client.hashes.get(key, {})) for key in self.keys]
+        return Pipeline()
+
+    def config_get(self, pattern):
+        return {'notify-keyspace-events': self.notify_keyspace_events}
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        client = self
+
+        class PubSub(object):
+            def __init__(self):
+                self.messages = []
+                client.subscribers.append(self)
+
+            def psubscribe(self, *patterns):
+                self.patterns = patterns
+
+            def get_message(self):
+                return self.messages.pop(0) if self.messages else None
+
+            def close(self):
+                client.subscribers.remove(self)
+        return PubSub()
+
+    def hset(self, key, fvs):
+        self.hashes.setdefault(key, {}).update(fvs)
+        self.notify(key)
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+        self.notify(key)
+
+    def notify(self, key):
+        if 'K' not in self.notify_keyspace_events:
+            return
+        for subscriber in self.subscribers:
+            subscriber.messages.append({'type': 'pmessage', 'channel': '__keyspace@1__:' + key})
+
+
+def get_asic_db(notify_keyspace_events='AKE'):
+    hashes = {}
+    for idx in range(1, 4):
+        hashes['ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a00000000000%d' % idx] = {
+            'SAI_BRIDGE_PORT_ATTR_PORT_ID': 'oid:0x10000000000%d' % idx}
+        hashes['ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x6000000000000%d' % idx] = {
+            'SAI_ROUTER_INTERFACE_ATTR_PORT_ID': 'oid:0x10000000000%d' % idx}
+    # Bridge port of the .1Q bridge which is not bound to a port
+    hashes['ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000009'] = {'SAI_BRIDGE_PORT_ATTR_TYPE': 'SAI_BRIDGE_PORT_TYPE_1Q_ROUTER'}
+    hashes['ASIC_STATE:SAI_OBJECT_TYPE_VLAN:oid:0x26000000000001'] = {'SAI_VLAN_ATTR_VLAN_ID': '1000'}
+    client = FakeRedis(hashes, notify_keyspace_events)
+    db = mock.MagicMock()
+    db.dbintf.redis_kwargs = {'decode_responses': True}
+    db.get_redis_client.return_value = client
+    db.keys.side_effect = lambda db_name, pattern: list(client.scan_iter(pattern, 0))
+    db.get_all.side_effect = lambda db_name, key, blocking=False: dict(client.hashes.get(key, {}))
+    return db, client
+
+
+class TestPortUtilBulk:
+    BRIDGE_PORT_MAP = {'3a000000000001': '100000000001', '3a000000000002': '100000000002', '3a000000000003': '100000000003'}
+    RIF_PORT_MAP = {'60000000000001': '100000000001', '60000000000002': '100000000002', '60000000000003': '100000000003'}
+
+    def test_bulk_matches_per_key(self):
+        from sonic_py_common import port_util
+        db, client = get_asic_db()
+        assert port_util.get_bridge_port_map(db) == self.BRIDGE_PORT_MAP
+        assert port_util.get_rif_port_map(db) == self.RIF_PORT_MAP
+
+        client.round_trips = 0
+        db.get_all.reset_mock()
+        assert port_util.get_bridge_port_map(db, bulk=True) == self.BRIDGE_PORT_MAP
+        assert port_util.get_rif_port_map(db, bulk=True) == self.RIF_PORT_MAP
+        # One SCAN and one pipeline per map
+        assert client.round_trips == 4
+        db.get_all.assert_not_called()
+
+    def test_bulk_fallback(self):
+        from sonic_py_common import port_util
+        db, client = get_asic_db()
+        db.get_redis_client.side_effect = RuntimeError('no redis client')
+        assert port_util.get_bridge_port_map(db, bulk=True) == self.BRIDGE_PORT_MAP
+        assert db.get_all.call_count == 4
+
+    def test_bulk_vlan_interface_oid_map(self):
+        from sonic_py_common import port_util
+        db, client = get_asic_db()
+        client.hashes['COUNTERS_RIF_NAME_MAP'] = {'Vlan1000': 'oid:0x60000000000004', 'Ethernet0': 'oid:0x60000000000001'}
+        client.hashes['COUNTERS_RIF_TYPE_MAP'] = {'oid:0x60000000000004': 'SAI_ROUTER_INTERFACE_TYPE_VLAN',
+                                                  'oid:0x60000000000001': 'SAI_ROUTER_INTERFACE_TYPE_PORT'}
+        assert port_util.get_vlan_interface_oid_map(db, bulk=True) == {'60000000000004': 'Vlan1000'}
+        assert client.round_trips == 1
+        db.get_all.assert_not_called()
+
+        # The maps are not created yet: blocking read goes through the connector
+        del client.hashes['COUNTERS_RIF_TYPE_MAP']
+        assert port_util.get_vlan_interface_oid_map(db, blocking=False, bulk=True) == {}
+        db.get_all.assert_not_called()
+        assert port_util.get_vlan_interface_oid_map(db, blocking=True, bulk=True) == {}
+        assert db.get_all.call_count == 2
+
+    def test_port_map_cache(self):
+        from sonic_py_common import port_util
+        db, client = get_asic_db()
+        cache = port_util.AsicPortMapCache(db)
+        assert cache.get_bridge_port_map() == self.BRIDGE_PORT_MAP
+        assert cache.get_rif_port_map() == self.RIF_PORT_MAP
+        assert cache.get_stats() == {'full_loads': 1, 'updates': 0, 'updated_objects': 0}
+
+        client.round_trips = 0
+        client.hset('ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000004', {'SAI_BRIDGE_PORT_ATTR_PORT_ID': 'oid:0x100000000004'})
+        client.delete('ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000001')
+        client.hset('ASIC_STATE:SAI_OBJECT_TYPE_ROUTER_INTERFACE:oid:0x60000000000002', {'SAI_ROUTER_INTERFACE_ATTR_PORT_ID': 'oid:0x100000000009'})
+        bridge_port_map = dict(self.BRIDGE_PORT_MAP)
+        del bridge_port_map['3a000000000001']
+        bridge_port_map['3a000000000004'] = '100000000004'
+        assert cache.get_bridge_port_map() == bridge_port_map
+        rif_port_map = dict(self.RIF_PORT_MAP)
+        rif_port_map['60000000000002'] = '100000000009'
+        assert cache.get_rif_port_map() == rif_port_map
+        # Only the changed objects are fetched, without SCAN
+        assert client.round_trips == 1
+        assert cache.get_stats() == {'full_loads': 1, 'updates': 1, 'updated_objects': 3}
+
+        # Notifications are lost: the maps are reloaded on the next call
+        client.pipeline = mock.MagicMock(side_effect=ConnectionError)
+        client.hset('ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000005', {'SAI_BRIDGE_PORT_ATTR_PORT_ID': 'oid:0x100000000005'})
+        bridge_port_map['3a000000000005'] = '100000000005'
+        assert cache.get_bridge_port_map() == bridge_port_map
+        assert cache.maps is None
+        del client.pipeline
+        assert cache.get_bridge_port_map() == bridge_port_map
+        assert cache.get_stats()['full_loads'] == 2
+
+    def test_port_map_cache_without_notifications(self):
+        from sonic_py_common import port_util
+        db, client = get_asic_db(notify_keyspace_events='')
+        cache = port_util.AsicPortMapCache(db)
+        assert cache.get_bridge_port_map() == self.BRIDGE_PORT_MAP
+        assert cache.notifications_enabled is False
+        assert not client.subscribers
+
+        # Changes are not published, every call loads the maps again
+        client.hset('ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT:oid:0x3a000000000004', {'SAI_BRIDGE_PORT_ATTR_PORT_ID': 'oid:0x100000000004'})
+        bridge_port_map = dict(self.BRIDGE_PORT_MAP)
+        bridge_port_map['3a000000000004'] = '100000000004'
+        assert cache.get_bridge_port_map() == bridge_port_map
+        assert cache.get_stats() == {'full_loads': 2, 'updates': 0, 'updated_objects': 0}
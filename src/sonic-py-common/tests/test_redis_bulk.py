@@ -0,0 +1,34 @@
+import os
+import sys
+
+if sys.version_info.major == 3:
+    from unittest import mock
+else:
+    import mock
+
+modules_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(modules_path, 'src'))
+
+from .test_port_util import FakeRedis
+
+
+class TestRedisBulk:
+    def test_scan_entries(self):
+        from sonic_py_common import redis_bulk
+        client = FakeRedis({'FAN_INFO|fan1': {'speed': '50'}, 'PSU_INFO|PSU 1': {'presence': 'true'}, 'PORT|Ethernet0': {}})
+        entries = redis_bulk.scan_entries(client, ['FAN_INFO|*', 'PSU_INFO|*', 'FAN_*'])
+        assert entries == [('FAN_INFO|fan1', {'speed': '50'}), ('PSU_INFO|PSU 1', {'presence': 'true'})]
+        # One SCAN per pattern and one pipeline
+        assert client.round_trips == 4
+
+        # Missing keys have an empty entry
+        assert redis_bulk.hgetall_pipelined(client, ['FAN_INFO|fan1', 'FAN_INFO|fan2']) == [{'speed': '50'}, {}]
+
+    def test_keyspace_notifications_enabled(self):
+        from sonic_py_common import redis_bulk
+        for events, enabled in [('AKE', True), ('Khg', True), ('gh$K', True), ('KEg', False), ('', False)]:
+            assert redis_bulk.keyspace_notifications_enabled(FakeRedis({}, events)) == enabled
+
+        client = mock.MagicMock()
+        client.config_get.return_value = {b'notify-keyspace-events': b'AK'}
+        assert redis_bulk.keyspace_notifications_enabled(client)
@@ -80,4 +80,136 @@ def test_sonic_db_load_multi_asic(mock_getDbHostname, mock_getDbPort, mock_getDb
             "encoding": "utf-8",
         }
     )
-    mock_getDbHostname.assert_called_once_with("APPL_DB", SonicDBKey("asic0"))
\ No newline at end of file
+    mock_getDbHostname.assert_called_once_with("APPL_DB", SonicDBKey("asic0"))
+
+class FakeStreamRedis(object):
+    """In-memory redis-py client with the commands used by the streaming engine. DUMP payload is a JSON encoding"""
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}
+        self.pttls = {}
+        self.pipelines = 0
+
+    def scan_iter(self, match='*', count=None):
+        import fnmatch
+        return iter(sorted(key for key in list(self.data) if fnmatch.fnmatchcase(key.decode(), match)))
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return FakeStreamPipeline(self)
+
+    def flushdb(self):
+        self.data.clear()
+        self.pttls.clear()
+
+
+class FakeStreamPipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        import json
+        data, pttls = self.client.data, self.client.pttls
+        replies = []
+        for name, args, kwargs in self.commands:
+            key = args[0] if isinstance(args[0], bytes) else args[0].encode()
+            value = data.get(key)
+            if name == 'type':
+                reply = {bytes: b'string', dict: b'hash', list: b'list', set: b'set', tuple: b'zset'}.get(type(value), b'none')
+            elif name == 'pttl':
+                reply = pttls.get(key, -1) if key in data else -2
+            elif name == 'dump':
+                reply = None if value is None else json.dumps([type(value).__name__, repr(value)]).encode()
+            elif name == 'restore':
+                value_type, value_repr = json.loads(args[2])
+                data[key] = eval(value_repr)
+                if args[1]:
+                    pttls[key] = args[1]
+                reply = True
+            elif name in ('get', 'hgetall', 'lrange', 'smembers'):
+                reply = value
+            elif name == 'zrange':
+                reply = list(value)
+            elif name == 'delete':
+                reply = data.pop(key, None) is not None
+                pttls.pop(key, None)
+            elif name == 'set':
+                data[key] = args[1].encode()
+            elif name == 'hset':
+                data[key] = {f.encode(): v.encode() for f, v in kwargs['mapping'].items()}
+            elif name == 'rpush':
+                data[key] = [v.encode() for v in args[1:]]
+            elif name == 'sadd':
+                data[key] = {v.encode() for v in args[1:]}
+            elif name == 'zadd':
+                data[key] = tuple((m.encode(), s) for m, s in args[1].items())
+            elif name == 'pexpire':
+                pttls[key] = args[1]
+            replies.append(reply if name not in ('set', 'hset', 'rpush', 'sadd', 'zadd', 'pexpire') else True)
+        return replies
+
+
+def get_stream_data():
+    data = {b'PORT_TABLE:Ethernet%d' % idx: {b'admin_status': b'up', b'mtu': b'9100'} for idx in range(0, 100, 4)}
+    data[b'SYSTEM_READY'] = b'true'
+    data[b'ROUTE_LIST'] = [b'10.0.0.0/24', b'10.0.1.0/24']
+    data[b'MEMBERS'] = {b'Ethernet0', b'Ethernet4'}
+    data[b'PRIORITIES'] = ((b'low', 1.0), (b'high', 2.0))
+    return data
+
+
+import pytest
+from sonic_py_common.sonic_db_dump_load import stream_dump, stream_load
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_stream_dump_load(fmt, jobs):
+    import io
+    source = FakeStreamRedis(get_stream_data())
+    source.pttls[b'SYSTEM_READY'] = 5000
+    output = io.BytesIO()
+    assert stream_dump(source, output, fmt=fmt, jobs=jobs, chunk_size=4) == 29
+    # One or two pipelines per chunk
+    assert source.pipelines == (8 if fmt == 'binary' else 16)
+
+    target = FakeStreamRedis({b'STALE': b'1', b'SYSTEM_READY': b'false'})
+    assert stream_load(target, io.BytesIO(output.getvalue()), empty=True, jobs=jobs, chunk_size=4) == 29
+    assert target.data == source.data
+    assert target.pttls == {b'SYSTEM_READY': 5000}
+
+
+def test_stream_dump_keys_pattern():
+    import io
+    import json
+    output = io.BytesIO()
+    assert stream_dump(FakeStreamRedis(get_stream_data()), output, keys='PORT_TABLE:Ethernet1*') == 2
+    lines = output.getvalue().splitlines()
+    assert json.loads(lines[0]) == {'sonic_db_dump': 1, 'format': 'jsonl', 'compression': None}
+    assert json.loads(lines[1]) == {'key': 'PORT_TABLE:Ethernet12', 'type': 'hash', 'value': {'admin_status': 'up', 'mtu': '9100'}}
+
+
+def test_stream_load_errors():
+    import io
+    with pytest.raises(ValueError):
+        stream_load(FakeStreamRedis(), io.BytesIO(b'{"PORT_TABLE:Ethernet0": {"type": "hash"}}\n'))
+    output = io.BytesIO()
+    stream_dump(FakeStreamRedis(get_stream_data()), output, fmt='binary')
+    with pytest.raises(ValueError):
+        stream_load(FakeStreamRedis(), io.BytesIO(output.getvalue()[:-3]))
+
+
+@patch("redis.Redis")
+@patch("sonic_py_common.sonic_db_dump_load.stream_dump")
+@patch("swsscommon.swsscommon.SonicDBConfig.getDbHostname", return_value="127.0.0.1")
+@patch("swsscommon.swsscommon.SonicDBConfig.getDbPort", return_value=6379)
+@patch("swsscommon.swsscommon.SonicDBConfig.getDbId", return_value=0)
+@patch("sys.argv", ["sonic-db-dump", "-n", "APPL_DB", "-S", "-f", "binary", "-j", "4"])
+def test_sonic_db_dump_streaming(mock_getDbId, mock_getDbPort, mock_getDbHostname, mock_stream_dump, mock_redis):
+    sonic_db_dump_load()
+    mock_redis.assert_called_once_with(encoding="utf-8", host="127.0.0.1", port=6379, db=0)
+    mock_stream_dump.assert_called_once_with(mock_redis.return_value, sys.stdout.buffer, fmt="binary", compress=None,
+                                             keys="*", encoding="utf-8", jobs=4)
@@ -6,7 +6,7 @@ import syslog
 from json import dump
 from glob import glob
 from typing import Optional, Dict, List, Tuple, Set, Any, cast
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, SCHEMA_SNAPSHOT_FILE
 from sonic_yang_path import SonicYangPathMixin
 
 """
@@ -32,6 +32,24 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         self.confDbYangMap: Dict[str, Any] = dict()
         # map of backlinks dict()[]
         self.backlinkMap: Optional[Dict[str, List[str]]] = None
+        # table -> tables referenced by its leafrefs and must/when expressions,
+        # and the reverse map. Used to scope the validation of applyPatch()
+        self.tableReferences: Optional[Dict[str, Set[str]]] = None
+        self.tableDependents: Optional[Dict[str, Set[str]]] = None
+        # yang JSON of each table loaded by loadData(), tables changed by
+        # applyPatch() since their yang JSON was translated, and tables of
+        # self.jIn copied before they were changed
+        self._tableYang: Dict[str, Any] = dict()
+        self._dirtyTables: Set[str] = set()
+        self._ownedTables: Set[str] = set()
+        # seconds spent in each phase of the last loadYangModel()
+        self.loadTimes: Dict[str, float] = dict()
+        # True if modules are loaded on first use, from a schema snapshot
+        self._lazyModules: bool = False
+        # names of the modules loaded by loadYangModel() or on first use
+        self._loadedModules: Set[str] = set()
+        # hash of the yang models, which keys the schema snapshot
+        self._schemaSnapshotKey: Optional[str] = None
         # config DB json input, will be cropped as yang models
         self.jIn: Dict[str, Any] = dict()
         # YANG JSON, this is traslated from config DB json
@@ -87,6 +105,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         should walk SNode iteration instead.
         """
         if self._yJsonCache is None:
+            self._loadAllYangModules()
             self._yJsonCache = self._build_yjson_compat()
         return self._yJsonCache
 
@@ -271,6 +290,8 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     returns: Schema_Node object
     """
     def _get_module(self, module_name):
+        if self._lazyModules and module_name in self.yangFiles:
+            return self._loadYangModule(module_name)
         mod = self.ctx.get_module(module_name)
         return mod
 
@@ -352,7 +373,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
         result = None
 
         try:
-            module = self.ctx.get_module(str(module_name))
+            module = self._get_module(str(module_name))
         except Exception as e:
             self.sysLog(msg="Could not get module: " + str(module_name), debug=syslog.LOG_ERR, doPrint=True)
             self.fail(e)
@@ -443,6 +464,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     def _new_data_node(self, xpath, value):
         val = str(value)
         try:
+            self._loadYangModuleForXpath(xpath)
             data_node = self.ctx.create_data_path(xpath, parent=self.root, value=val, update=False, force_return_value=False)
         except Exception as e:
             self.sysLog(msg="Failed to add data node for path: " + str(xpath), debug=syslog.LOG_ERR, doPrint=True)
@@ -480,6 +502,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def _find_schema_node(self, schema_xpath):
         try:
+            self._loadYangModuleForXpath(schema_xpath)
             schema_set = self.ctx.find_path(schema_xpath)
             for schema_node in schema_set:
                 if (schema_xpath == schema_node.schema_path()):
@@ -538,6 +561,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
             # See _load_data_file: use FILEPATH mode so libyang reads the file
             # via its own runtime; avoids issues with mocked builtins.open in
             # tests and lets libyang handle encoding/EOL details.
+            self._loadAllYangModules()
             source_node = self.ctx.parse_data("json", in_type=ly.IOType.FILEPATH,
                                               in_data=str(data_file),
                                               no_state=True, strict=True,
@@ -590,6 +614,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def _set_data_node_value(self, data_xpath, value):
         try:
+            self._loadYangModuleForXpath(data_xpath)
             self.ctx.create_data_path(data_xpath, parent=self.root, value=str(value), update=True, force_return_value=False)
         except Exception as e:
             self.sysLog(msg="set data node value failed for xpath: " + str(data_xpath), debug=syslog.LOG_ERR, doPrint=True)
@@ -880,6 +905,7 @@ class SonicYang(SonicYangExtMixin, SonicYangPathMixin):
     """
     def _get_leafref_path(self, schema_xpath: str) -> Optional[str]:
         try:
+            self._loadYangModuleForXpath(schema_xpath)
             schemas = self.ctx.find_path(schema_xpath)
 
             for schema_node in schemas:
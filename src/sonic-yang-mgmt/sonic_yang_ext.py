@@ -4,11 +4,15 @@
 from __future__ import print_function, annotations
 import libyang as ly
 import syslog
-from json import dump, dumps, loads
+from json import dump, dumps, load, loads
 from glob import glob
 import copy
+import hashlib
+import os
+import re
+import time
 import traceback
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
 from sonic_yang_path import SonicYangPathMixin
 
 if TYPE_CHECKING:
@@ -41,12 +45,35 @@ LEAF_LIST_WITH_STRING_VALUE_DICT = {
     ('PORT', 'adv_interface_types'): ',',
 }
 
+# Layout version of the schema snapshot written by loadYangModel(). Bump it
+# whenever the content of the snapshot changes, so older snapshots are rebuilt.
+SCHEMA_SNAPSHOT_VERSION = 2
+SCHEMA_SNAPSHOT_FILE = "sonic_yang_schema.json"
+
 """
 This is the Exception thrown out of all public function of this class.
 """
 class SonicYangException(Exception):
     pass
 
+class _YangTableEntry(dict):
+    """
+    confDbYangMap entry restored from a schema snapshot. The table container
+    SNode is looked up when it is first used, which loads the module in lazy
+    mode.
+    """
+    def __init__(self, loader, table, module, topLevelContainer):
+        super().__init__(module=module, topLevelContainer=topLevelContainer)
+        self._loader = loader
+        self._table = table
+
+    def __missing__(self, key):
+        if key != 'container':
+            raise KeyError(key)
+        container = self._loader(self['module'], self._table)
+        self['container'] = container
+        return container
+
 # class sonic_yang methods, use mixin to extend sonic_yang
 class SonicYangExtMixin(SonicYangPathMixin):
 
@@ -60,6 +87,16 @@ class SonicYangExtMixin(SonicYangPathMixin):
         print_log_enabled: bool
         yangFiles: List[str]
         confDbYangMap: Dict[str, Any]
+        backlinkMap: Optional[Dict[str, List[str]]]
+        tableReferences: Optional[Dict[str, Set[str]]]
+        tableDependents: Optional[Dict[str, Set[str]]]
+        _dirtyTables: Set[str]
+        _tableYang: Dict[str, Any]
+        _ownedTables: Set[str]
+        loadTimes: Dict[str, float]
+        _lazyModules: bool
+        _loadedModules: set
+        _schemaSnapshotKey: Optional[str]
         _yJsonCache: Optional[List[Dict[str, Any]]]
         jIn: Dict[str, Any]
         xlateJson: Dict[str, Any]
@@ -69,6 +106,8 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
         def sysLog(self, debug: int = ..., msg: Optional[str] = ..., doPrint: bool = ...) -> None: ...
         def fail(self, e: Exception) -> None: ...
+        def _cache_schema_dependencies(self) -> None: ...
+        def _get_module_name(self, schema_xpath: str) -> str: ...
         def _load_schema_module(self, yang_file: str) -> Optional[ly.Module]: ...
         def _find_data_node(self, data_xpath: str) -> Optional[ly.DNode]: ...
         def _find_parent_data_node(self, data_xpath: str) -> Optional[ly.DNode]: ...
@@ -77,32 +116,67 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
     """
     load all YANG models, build the table-to-schema map. (Public function)
+    input:    schema_cache_dir - directory of the schema snapshot. The table
+                                 map and schema dependencies are restored
+                                 from the snapshot if it matches the yang
+                                 files, otherwise they are built and saved.
+              lazy - with a valid snapshot, load a module only when one of
+                     its tables or schema paths is used.
+    returns:  True on success
+    raises:   SonicYangException on failure
     """
-    def loadYangModel(self):
+    def loadYangModel(self, schema_cache_dir=None, lazy=False):
 
         try:
-            # Invalidate any cached YIN-shape view from a previous load.
+            # Invalidate any cached YIN-shape view and dependencies from a previous load.
             self._yJsonCache = None
+            self.backlinkMap = None
+            self.tableReferences = None
+            self.tableDependents = None
+            self.loadTimes = dict()
+            start = time.monotonic()
             # get all files
-            self.yangFiles = glob(self.yang_dir +"/*.yang")
-            # load yang modules
-            for file in self.yangFiles:
-                m = self._load_schema_module(file)
-                if m is not None:
-                    self.sysLog(msg="module: {} is loaded successfully".format(m.name()))
-                else:
-                    raise(Exception("Could not load module {}".format(file)))
-
+            yangFiles = glob(self.yang_dir +"/*.yang")
             # keep only modules name in self.yangFiles
-            self.yangFiles = [f.split('/')[-1] for f in self.yangFiles]
+            self.yangFiles = [f.split('/')[-1] for f in yangFiles]
             self.yangFiles = [f.split('.')[0] for f in self.yangFiles]
-            self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
-            self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # libyang3 already resolves uses/grouping/augment/deviation when it
-            # compiles each schema, so the SNode tree we walk below has all of
-            # that pre-resolved — no manual uses/grouping inlining is needed.
-            self._createDBTableToModuleMap()
+            snapshot = None
+            if schema_cache_dir is not None:
+                snapshot = self._readSchemaSnapshot(schema_cache_dir, yangFiles)
+                self.loadTimes['snapshot'] = time.monotonic() - start
+                start = time.monotonic()
+
+            self._lazyModules = lazy and snapshot is not None
+            if not self._lazyModules:
+                # load yang modules
+                for file in yangFiles:
+                    m = self._load_schema_module(file)
+                    if m is not None:
+                        self.sysLog(msg="module: {} is loaded successfully".format(m.name()))
+                    else:
+                        raise(Exception("Could not load module {}".format(file)))
+                self._loadedModules = set(self.yangFiles)
+                self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
+                self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
+            self.loadTimes['modules'] = time.monotonic() - start
+            start = time.monotonic()
+
+            if snapshot is None:
+                # libyang3 already resolves uses/grouping/augment/deviation when it
+                # compiles each schema, so the SNode tree we walk below has all of
+                # that pre-resolved — no manual uses/grouping inlining is needed.
+                self._createDBTableToModuleMap()
+            else:
+                self._restoreDBTableToModuleMap(snapshot)
+            self.loadTimes['table_map'] = time.monotonic() - start
+
+            if schema_cache_dir is not None and snapshot is None and self._schemaSnapshotKey is not None:
+                start = time.monotonic()
+                self._cache_schema_dependencies()
+                self._cacheTableDependencies()
+                self.loadTimes['dependencies'] = time.monotonic() - start
+                self._writeSchemaSnapshot(schema_cache_dir)
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -110,6 +184,115 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
         return True
 
+    def _getSchemaSnapshotKey(self, yangFiles):
+        """
+        Hash of the snapshot layout version and of the name and content of
+        every yang file. A snapshot is valid only for the same key.
+        """
+        key = hashlib.sha256(str(SCHEMA_SNAPSHOT_VERSION).encode())
+        for file in sorted(yangFiles):
+            with open(file, 'rb') as f:
+                key.update(os.path.basename(file).encode() + b'\0' + hashlib.sha256(f.read()).digest())
+        return key.hexdigest()
+
+    def _readSchemaSnapshot(self, schema_cache_dir, yangFiles):
+        """
+        Return the schema snapshot in schema_cache_dir if it is valid for the
+        yang files, None otherwise
+        """
+        self._schemaSnapshotKey = None
+        try:
+            self._schemaSnapshotKey = self._getSchemaSnapshotKey(yangFiles)
+        except OSError as e:
+            self.sysLog(msg="Could not hash yang models, schema snapshot is not used: {}".format(str(e)), \
+                debug=syslog.LOG_WARNING)
+            return None
+
+        path = os.path.join(schema_cache_dir, SCHEMA_SNAPSHOT_FILE)
+        try:
+            with open(path) as f:
+                snapshot = load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SCHEMA_SNAPSHOT_VERSION \
+                or snapshot.get('key') != self._schemaSnapshotKey:
+            self.sysLog(syslog.LOG_DEBUG, "Schema snapshot {} does not match the yang models".format(path))
+            return None
+        return snapshot
+
+    def _writeSchemaSnapshot(self, schema_cache_dir):
+        """
+        Save the table map and schema dependencies to schema_cache_dir. The
+        file is replaced atomically, errors are logged and ignored.
+        """
+        snapshot = {
+            'version': SCHEMA_SNAPSHOT_VERSION,
+            'key': self._schemaSnapshotKey,
+            'tables': {table: {'module': cmap['module'], 'topLevelContainer': cmap['topLevelContainer']}
+                       for table, cmap in self.confDbYangMap.items()},
+            'backlinkMap': self.backlinkMap,
+            'tableReferences': {table: sorted(refs) for table, refs in self.tableReferences.items()},
+        }
+        path = os.path.join(schema_cache_dir, SCHEMA_SNAPSHOT_FILE)
+        tmpPath = "{}.{}".format(path, os.getpid())
+        try:
+            os.makedirs(schema_cache_dir, exist_ok=True)
+            with open(tmpPath, 'w') as f:
+                dump(snapshot, f)
+            os.replace(tmpPath, path)
+        except OSError as e:
+            self.sysLog(msg="Could not write schema snapshot {}: {}".format(path, str(e)), \
+                debug=syslog.LOG_WARNING)
+
+    def _restoreDBTableToModuleMap(self, snapshot):
+        for table, entry in snapshot['tables'].items():
+            self.confDbYangMap[table] = _YangTableEntry(self._getTableContainer, table, \
+                entry['module'], entry['topLevelContainer'])
+        self.backlinkMap = snapshot.get('backlinkMap')
+        self._setTableReferences({table: set(refs) for table, refs in snapshot['tableReferences'].items()})
+
+    def _getTableContainer(self, module_name, table):
+        """
+        Return the container SNode of a config DB table, loading its module
+        first in lazy mode
+        """
+        m = self._loadYangModule(module_name)
+        top = next(iter(m.children(types=(ly.SNode.CONTAINER,))), None)
+        if top is not None:
+            for container in top.children(types=(ly.SNode.CONTAINER,)):
+                if container.name() == table:
+                    return container
+        raise SonicYangException("Table {} not found in module {}".format(table, module_name))
+
+    def _loadYangModule(self, module_name):
+        """
+        Return the module, loading it from the yang directory if it was not
+        loaded yet. Modules which were only imported by other modules are
+        implemented by load_module().
+        """
+        if module_name not in self._loadedModules:
+            self.ctx.load_module(module_name)
+            self._loadedModules.add(module_name)
+            self.sysLog(syslog.LOG_DEBUG, "module: {} is loaded on demand".format(module_name))
+        return self.ctx.get_module(module_name)
+
+    def _loadYangModuleForXpath(self, xpath):
+        """
+        In lazy mode, load the module of the first node of a schema or data xpath
+        """
+        if self._lazyModules and xpath:
+            module_name = self._get_module_name(xpath)
+            if module_name in self.yangFiles:
+                self._loadYangModule(module_name)
+
+    def _loadAllYangModules(self):
+        """
+        In lazy mode, load every module which is not loaded yet
+        """
+        if self._lazyModules:
+            for module_name in self.yangFiles:
+                self._loadYangModule(module_name)
+
     def _createDBTableToModuleMap(self):
         """
         Populate self.confDbYangMap[<table_name>] = {
@@ -954,11 +1137,22 @@ class SonicYangExtMixin(SonicYangPathMixin):
           # reset xlate and tablesWithOutYang
           self.xlateJson = dict()
           self.tablesWithOutYang = dict()
+          # reset incremental state, see applyPatch()
+          self._dirtyTables = set()
+          self._ownedTables = set()
+          self._tableYang = dict()
           # self.jIn will be cropped if needed, however it will duplicate the object
           # so the original is not modified
           self._cropConfigDB()
+          # applyPatch() changes the tables of its own copy of the config
+          self.jIn = dict(self.jIn)
           # xlated result will be in self.xlateJson
           self._xlateConfigDB(xlateFile=xlateFile)
+          # yang JSON of each table, kept up to date by applyPatch()
+          for table in self.jIn:
+              cmap = self.confDbYangMap[table]
+              self._tableYang[table] = self.xlateJson[cmap['module']+":"+cmap['topLevelContainer']] \
+                  [cmap['topLevelContainer']+":"+table]
           if not quiet:
               self.sysLog(msg="Try to load Data in the tree")
           self.root = self.ctx.parse_data_mem(dumps(self.xlateJson), "json", no_state=True, strict=True, json_string_datatypes=True)
@@ -972,6 +1166,268 @@ class SonicYangExtMixin(SonicYangPathMixin):
 
        return True
 
+    """
+    Apply a JSON patch to the config loaded by loadData() and validate the
+    result incrementally. (Public)
+    Only the changed entries are translated and replaced in the data tree.
+    Validation covers the changed tables, the tables which reference them,
+    and the tables those reference in turn, as given by the table dependency
+    index built from leafref paths and must/when expressions.
+    input:    patch - list of JSON patch operations (add, replace, remove) on
+                      config DB json, e.g.
+                      [{"op": "replace", "path": "/PORT/Ethernet0/mtu", "value": "9000"}]
+              validate - validate the changed tables and their dependencies
+              dry_run - only validate, leave the config and data tree unchanged
+              quiet - do not log failures, see loadData()
+    returns:  True on success
+    raises:   SonicYangException if the patch can not be applied or the result
+              is not valid. The config and data tree are left unchanged.
+    """
+    def applyPatch(self, patch, validate=True, dry_run=False, quiet=False):
+
+        try:
+            if self.root is None:
+                raise Exception("data not loaded")
+            changes = self._patchEntries(patch)
+            previous = self._applyEntryChanges(changes)
+            try:
+                if validate:
+                    self._validateTables({table for table, _ in changes})
+            except Exception:
+                self._applyEntryChanges(previous)
+                raise
+            if dry_run:
+                self._applyEntryChanges(previous)
+        except Exception as e:
+            if not quiet:
+                self.sysLog(msg="Patch Apply Failed:{}".format(str(e)), \
+                    debug=syslog.LOG_ERR, doPrint=True)
+            raise SonicYangException("Patch Apply Failed\n{}".format(str(e)))
+
+        return True
+
+    def _getConfigTable(self, table):
+        if table in self.confDbYangMap:
+            return self.jIn.get(table, dict())
+        return self.tablesWithOutYang.get(table, dict())
+
+    def _patchEntries(self, patch):
+        """
+        Apply JSON patch operations to copies of the affected config entries.
+        Return dict of (table, key) -> new entry, None for a deleted entry.
+        """
+        changes = dict()
+
+        def getEntry(table, key):
+            if (table, key) in changes:
+                return changes[(table, key)]
+            return self._getConfigTable(table).get(key)
+
+        for operation in patch:
+            op = operation.get('op')
+            if op not in ('add', 'replace', 'remove'):
+                raise Exception("Unsupported patch operation {}".format(op))
+            tokens = self.configdb_path_split(operation.get('path'))
+            if len(tokens) == 0:
+                raise Exception("Patch of the whole config is not supported")
+            table = tokens[0]
+
+            if len(tokens) == 1:
+                keys = set(self._getConfigTable(table)) | {k for t, k in changes if t == table}
+                if op != 'add' and not any(getEntry(table, key) is not None for key in keys):
+                    raise Exception("Table {} not found".format(table))
+                for key in keys:
+                    changes[(table, key)] = None
+                if op != 'remove':
+                    for key, entry in operation['value'].items():
+                        changes[(table, key)] = copy.deepcopy(entry)
+                continue
+
+            key = tokens[1]
+            entry = getEntry(table, key)
+            if len(tokens) == 2:
+                if op != 'add' and entry is None:
+                    raise Exception("Entry {} not found".format(operation['path']))
+                changes[(table, key)] = None if op == 'remove' else copy.deepcopy(operation['value'])
+                continue
+
+            if entry is None:
+                raise Exception("Entry {} not found".format(operation['path']))
+            entry = copy.deepcopy(entry)
+            parent = entry
+            for token in tokens[2:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+            last = tokens[-1]
+            if isinstance(parent, list):
+                if op == 'add':
+                    parent.insert(len(parent) if last == '-' else int(last), copy.deepcopy(operation['value']))
+                elif op == 'replace':
+                    parent[int(last)] = copy.deepcopy(operation['value'])
+                else:
+                    del parent[int(last)]
+            else:
+                if op != 'add' and last not in parent:
+                    raise Exception("Field {} not found".format(operation['path']))
+                if op == 'remove':
+                    del parent[last]
+                else:
+                    parent[last] = copy.deepcopy(operation['value'])
+            changes[(table, key)] = entry
+
+        return changes
+
+    def _applyEntryChanges(self, changes):
+        """
+        Set the changed entries in the loaded config and the data tree.
+        Tables of the config are copied before their first change, so the
+        config passed to loadData() is not modified.
+        Return the previous entries, in the form of changes.
+        """
+        previous = dict()
+        try:
+            for (table, key), entry in changes.items():
+                hasYang = table in self.confDbYangMap
+                tables = self.jIn if hasYang else self.tablesWithOutYang
+                if table not in self._ownedTables:
+                    tables[table] = dict(tables.get(table, dict()))
+                    self._ownedTables.add(table)
+
+                previous[(table, key)] = tables[table].get(key)
+                if entry is None:
+                    tables[table].pop(key, None)
+                else:
+                    tables[table][key] = entry
+                if len(tables[table]) == 0:
+                    del tables[table]
+                    self._ownedTables.discard(table)
+
+                if hasYang:
+                    self._dirtyTables.add(table)
+                    self._replaceDataEntry(table, key, entry)
+        except Exception:
+            # Restore the entries changed so far, including the failed one
+            self._applyEntryChanges(previous)
+            raise
+
+        return previous
+
+    def _replaceDataEntry(self, table, key, entry):
+        """
+        Replace the data node of a config entry, delete it if entry is None
+        """
+        xpath = self.configdb_path_to_xpath(self.configdb_path_join([table, key]))
+        node = self._find_data_node(xpath)
+        if node is not None:
+            node.unlink()
+        if entry is None:
+            return
+
+        yangJ = dict()
+        self._xlateConfigDBtoYang({table: {key: entry}}, yangJ)
+        node = self.ctx.parse_data_mem(dumps(yangJ), "json", no_state=True, strict=True, \
+            json_string_datatypes=True, parse_only=True)
+        self.root.merge(node, destruct=True, with_siblings=True)
+
+    def _getTableYang(self, table):
+        """
+        Return yang JSON of a table, translating it again if it changed since
+        it was last translated
+        """
+        if table in self._dirtyTables:
+            self._dirtyTables.discard(table)
+            self._tableYang.pop(table, None)
+            if table in self.jIn:
+                cmap = self.confDbYangMap[table]
+                yangJ = dict()
+                self._xlateConfigDBtoYang({table: self.jIn[table]}, yangJ)
+                self._tableYang[table] = yangJ[cmap['module']+":"+cmap['topLevelContainer']] \
+                    [cmap['topLevelContainer']+":"+table]
+        return self._tableYang.get(table)
+
+    def _validateTables(self, tables):
+        """
+        Validate the config of tables and their dependencies in a separate
+        data tree
+        """
+        yangJ = dict()
+        for table in self._getValidationScope(tables):
+            value = self._getTableYang(table)
+            if value is not None:
+                cmap = self.confDbYangMap[table]
+                key = cmap['module']+":"+cmap['topLevelContainer']
+                yangJ.setdefault(key, dict())[cmap['topLevelContainer']+":"+table] = value
+        if len(yangJ) == 0:
+            return
+
+        node = self.ctx.parse_data_mem(dumps(yangJ), "json", no_state=True, strict=True, \
+            json_string_datatypes=True, parse_only=True)
+        try:
+            node.validate(no_state=True)
+        finally:
+            node.free()
+
+    def _getValidationScope(self, tables):
+        """
+        Return the tables to validate when tables change: the tables and their
+        dependents, and every table referenced by those, recursively
+        """
+        self._cacheTableDependencies()
+        pending = [table for table in tables if table in self.confDbYangMap]
+        for table in list(pending):
+            pending.extend(self.tableDependents.get(table, ()))
+        scope = set()
+        while pending:
+            table = pending.pop()
+            if table in scope:
+                continue
+            scope.add(table)
+            pending.extend(self.tableReferences.get(table, ()))
+        return scope
+
+    def _getTableFromSchemaPath(self, schema_xpath):
+        tokens = self.xpath_split(schema_xpath)
+        if len(tokens) < 2:
+            return None
+        return tokens[1].split(':')[-1]
+
+    def _cacheTableDependencies(self):
+        """
+        Build self.tableReferences[<table>] = set of tables referenced by the
+        leafref paths and must/when expressions of the table, and the reverse
+        index self.tableDependents
+        """
+        if self.tableReferences is not None:
+            return
+
+        self._cache_schema_dependencies()
+        references = {table: set() for table in self.confDbYangMap}
+        for target, leafrefs in (self.backlinkMap or dict()).items():
+            targetTable = self._getTableFromSchemaPath(target)
+            for leafref in leafrefs:
+                table = self._getTableFromSchemaPath(leafref)
+                if table in references and targetTable in references and table != targetTable:
+                    references[table].add(targetTable)
+
+        nameRe = re.compile(r'[A-Za-z_][A-Za-z0-9_.-]*')
+        for table in references:
+            container = self.confDbYangMap[table]['container']
+            for snode in [container] + list(container.iter_tree()):
+                conditions = [must.condition() for must in (snode.musts() or [])]
+                conditions.extend(snode.when_conditions())
+                for condition in conditions:
+                    for name in nameRe.findall(condition):
+                        if name in references and name != table:
+                            references[table].add(name)
+
+        self._setTableReferences(references)
+
+    def _setTableReferences(self, references):
+        self.tableReferences = references
+        self.tableDependents = {table: set() for table in references}
+        for table, refs in references.items():
+            for ref in refs:
+                self.tableDependents.setdefault(ref, set()).add(table)
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
@@ -0,0 +1,80 @@
+"""Benchmark of single-field config patches: full reload and validation of
+the config after every patch, against SonicYang.applyPatch().
+
+Usage (from src/sonic-yang-mgmt):
+    python -m tests.benchmark_incremental [--yang-dir DIR] [--config config_db.json]
+                                          [--patches N] [--full-patches N]
+
+Each patch replaces the description of a PORT entry, going round the ports.
+The full reload is slow on large configs, so it is measured on --full-patches
+patches and reported per patch.
+"""
+import argparse
+import copy
+import json
+import time
+
+import sonic_yang
+
+from .benchmark_startup import load_sample_config
+
+
+def get_patches(config, n_patches):
+    ports = sorted(config['PORT'])
+    return [[{'op': 'add', 'path': '/PORT/{}/description'.format(ports[idx % len(ports)]),
+              'value': 'patch {}'.format(idx)}] for idx in range(n_patches)]
+
+
+def run_full(sy, config, patches):
+    config = copy.deepcopy(config)
+    start = time.monotonic()
+    for patch in patches:
+        for op in patch:
+            _, table, key, field = op['path'].split('/')
+            config[table][key][field] = op['value']
+        sy.loadData(config, quiet=True)
+        sy.validate_data_tree()
+    return time.monotonic() - start
+
+
+def run_incremental(sy, config, patches):
+    sy.loadData(config, quiet=True)
+    start = time.monotonic()
+    for patch in patches:
+        sy.applyPatch(patch)
+    return time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sonic_yang incremental validation benchmark')
+    parser.add_argument('--yang-dir', default='/usr/local/yang-models', help='directory of the yang models')
+    parser.add_argument('--config', help='config DB json, sample config by default')
+    parser.add_argument('--patches', type=int, default=1000, help='number of incremental patches')
+    parser.add_argument('--full-patches', type=int, default=50, help='number of patches with full reload')
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    else:
+        config = load_sample_config()
+
+    sy = sonic_yang.SonicYang(args.yang_dir, print_log_enabled=False)
+    sy.loadYangModel()
+    patches = get_patches(config, args.patches)
+    full = run_full(sy, config, patches[:args.full_patches])
+    start = time.monotonic()
+    sy._cacheTableDependencies()
+    index = time.monotonic() - start
+    incremental = run_incremental(sy, config, patches)
+
+    print('tables            %d, %d PORT entries' % (len(config), len(config['PORT'])))
+    print('validation scope  %d tables' % len(sy._getValidationScope({'PORT'})))
+    print('full reload       %.2f ms per patch (%d patches)' % (full * 1e3 / len(patches[:args.full_patches]),
+                                                                len(patches[:args.full_patches])))
+    print('dependency index  %.2f ms' % (index * 1e3))
+    print('applyPatch        %.2f ms per patch (%d patches)' % (incremental * 1e3 / len(patches), len(patches)))
+
+
+if __name__ == '__main__':
+    main()
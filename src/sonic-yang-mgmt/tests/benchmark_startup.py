@@ -0,0 +1,65 @@
+"""Startup benchmark of SonicYang: time per phase of loading the yang models
+and validating a config, without schema snapshot, when the snapshot is
+written, and when it is restored with lazy module loading.
+
+Usage (from src/sonic-yang-mgmt):
+    python -m tests.benchmark_startup [--yang-dir DIR] [--config config_db.json]
+
+The snapshot is written to a temporary directory. Without --config, the
+sample config of sonic-yang-models is used.
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import sonic_yang
+
+SAMPLE_CONFIG = "../sonic-yang-models/tests/files/sample_config_db.json"
+
+
+def load_sample_config():
+    with open(SAMPLE_CONFIG) as f:
+        return json.load(f)['SAMPLE_CONFIG_DB_JSON']
+
+
+def run(yang_dir, config, schema_cache_dir=None, lazy=False):
+    phases = []
+    start = time.monotonic()
+    sy = sonic_yang.SonicYang(yang_dir, print_log_enabled=False)
+    phases.append(('context', time.monotonic() - start))
+    sy.loadYangModel(schema_cache_dir=schema_cache_dir, lazy=lazy)
+    phases.extend(sorted(sy.loadTimes.items()))
+    start = time.monotonic()
+    sy.loadData(config, quiet=True)
+    phases.append(('load_data', time.monotonic() - start))
+    start = time.monotonic()
+    sy.validate_data_tree()
+    phases.append(('validate', time.monotonic() - start))
+    return phases, len(sy._loadedModules), len(sy.yangFiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='sonic_yang startup benchmark')
+    parser.add_argument('--yang-dir', default='/usr/local/yang-models', help='directory of the yang models')
+    parser.add_argument('--config', help='config DB json to validate, sample config by default')
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    else:
+        config = load_sample_config()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, kwargs in [('no snapshot', {}),
+                             ('write snapshot', {'schema_cache_dir': cache_dir}),
+                             ('lazy snapshot', {'schema_cache_dir': cache_dir, 'lazy': True})]:
+            phases, n_loaded, n_modules = run(args.yang_dir, config, **kwargs)
+            print('%-16s total %.3f s, %d/%d modules loaded' % (name, sum(t for _, t in phases), n_loaded, n_modules))
+            for phase, elapsed in phases:
+                print('  %-14s %.3f s' % (phase, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -632,5 +632,84 @@ class Test_SonicYang(object):
 
         return
 
+    def test_schema_snapshot(self, sonic_yang_data, tmp_path):
+        # The first load builds and saves the snapshot, the second load
+        # restores the table map and dependencies from it and only loads the
+        # modules of the tables in the config.
+        sonic_yang_dir = sonic_yang_data['yang_dir']
+        syc = sonic_yang_data['syc']
+        jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], 'SAMPLE_CONFIG_DB_JSON'))
+        cache_dir = str(tmp_path)
+
+        sy_full = sy.SonicYang(sonic_yang_dir)
+        sy_full.loadYangModel(schema_cache_dir=cache_dir)
+        assert 'snapshot' in sy_full.loadTimes and 'dependencies' in sy_full.loadTimes
+        assert os.path.exists(os.path.join(cache_dir, sy.SCHEMA_SNAPSHOT_FILE))
+
+        sy_lazy = sy.SonicYang(sonic_yang_dir)
+        sy_lazy.loadYangModel(schema_cache_dir=cache_dir, lazy=True)
+        assert 'dependencies' not in sy_lazy.loadTimes
+        assert len(sy_lazy._loadedModules) == 0
+        assert set(sy_lazy.confDbYangMap) == set(syc.confDbYangMap)
+        assert sy_lazy.confDbYangMap['PORT']['module'] == 'sonic-port'
+        assert sy_lazy.backlinkMap == sy_full.backlinkMap
+
+        port_config = {'PORT': jIn['PORT']}
+        sy_lazy.loadData(port_config)
+        sy_lazy.validate_data_tree()
+        assert 'sonic-port' in sy_lazy._loadedModules
+        assert len(sy_lazy._loadedModules) < len(sy_lazy.yangFiles)
+        assert sy_lazy.getData() == port_config
+        assert sy_lazy._get_data_type("/sonic-vlan:sonic-vlan/VLAN/VLAN_LIST/name") == "string"
+        assert 'sonic-vlan' in sy_lazy._loadedModules
+
+        # A changed set of yang models invalidates the snapshot
+        sy_lazy._schemaSnapshotKey = 'stale'
+        sy_lazy._writeSchemaSnapshot(cache_dir)
+        sy_stale = sy.SonicYang(sonic_yang_dir)
+        sy_stale.loadYangModel(schema_cache_dir=cache_dir, lazy=True)
+        assert len(sy_stale._loadedModules) == len(sy_stale.yangFiles)
+        assert 'dependencies' in sy_stale.loadTimes
+
+        return
+
+    def test_apply_patch(self, sonic_yang_data):
+        # Patches are applied to the loaded config and data tree entry by
+        # entry, and validated on the changed tables and their dependencies.
+        syc = sonic_yang_data['syc']
+        jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], 'SAMPLE_CONFIG_DB_JSON'))
+        syc.loadData(jIn)
+
+        scope = syc._getValidationScope({'VLAN_MEMBER'})
+        assert {'VLAN_MEMBER', 'VLAN', 'PORT', 'PORTCHANNEL'} <= scope
+        assert len(scope) < len(syc.confDbYangMap)
+
+        syc.applyPatch([{'op': 'replace', 'path': '/VLAN/Vlan111/mtu', 'value': '9100'},
+                        {'op': 'add', 'path': '/VLAN/Vlan111/dhcp_servers/-', 'value': '10.222.72.117'}])
+        assert syc.jIn['VLAN']['Vlan111']['mtu'] == '9100'
+        # The config passed to loadData() is not changed
+        assert jIn['VLAN']['Vlan111']['mtu'] == '9216'
+        assert syc._find_data_node_value("/sonic-vlan:sonic-vlan/VLAN/VLAN_LIST[name='Vlan111']/mtu") == '9100'
+        syc.validate_data_tree()
+        config = syc.getData()
+        assert config['VLAN']['Vlan111']['dhcp_servers'] == ['10.222.72.116', '10.222.72.117']
+
+        # Invalid value, and removal of an entry which is referenced by VLAN_MEMBER
+        for patch in [[{'op': 'replace', 'path': '/VLAN/Vlan111/mtu', 'value': 'jumbo'}],
+                      [{'op': 'remove', 'path': '/PORT/Ethernet0'}],
+                      [{'op': 'remove', 'path': '/VLAN/Vlan999'}]]:
+            with pytest.raises(sy.SonicYangException):
+                syc.applyPatch(patch, quiet=True)
+        assert syc.jIn['VLAN']['Vlan111']['mtu'] == '9100'
+        assert 'Ethernet0' in syc.jIn['PORT']
+        syc.validate_data_tree()
+
+        syc.applyPatch([{'op': 'remove', 'path': '/VLAN_MEMBER/Vlan111|Ethernet0'}], dry_run=True)
+        assert 'Vlan111|Ethernet0' in syc.jIn['VLAN_MEMBER']
+        syc.applyPatch([{'op': 'remove', 'path': '/VLAN_MEMBER/Vlan111|Ethernet0'}])
+        assert 'Vlan111|Ethernet0' not in syc.getData()['VLAN_MEMBER']
+
+        return
+
     def teardown_class(self):
         pass
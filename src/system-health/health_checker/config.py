@@ -12,6 +12,12 @@ class Config(object):
     # Default system health check interval
     DEFAULT_INTERVAL = 60
 
+    # Default number of checkers that run concurrently
+    DEFAULT_CHECKER_WORKERS = 4
+
+    # Default time in seconds to wait for a checker before its last good result is used
+    DEFAULT_CHECKER_TIMEOUT = 30
+
     # Default boot up timeout. When reboot system, system health will wait a few seconds before starting to work.
     DEFAULT_BOOTUP_TIMEOUT = 300
 
@@ -41,10 +47,16 @@ class Config(object):
         self._last_mtime = None
         self.config_data = None
         self.interval = Config.DEFAULT_INTERVAL
+        self.polling_interval = Config.DEFAULT_INTERVAL
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
         self.include_devices = None
+        self.checker_workers = Config.DEFAULT_CHECKER_WORKERS
+        self.checker_intervals = {}
+        self.checker_timeouts = {}
+        self.hardware_keyspace_notifications = False
+
     def config_file_exists(self):
         return os.path.exists(self._config_file)
 
@@ -68,11 +80,17 @@ class Config(object):
                 with open(self._config_file, 'r') as f:
                     self.config_data = json.load(f)
 
-                self.interval = self.config_data.get('polling_interval', Config.DEFAULT_INTERVAL)
+                self.polling_interval = self.config_data.get('polling_interval', Config.DEFAULT_INTERVAL)
                 self.ignore_services = self._get_list_data('services_to_ignore')
                 self.ignore_devices = self._get_list_data('devices_to_ignore')
                 self.user_defined_checkers = self._get_list_data('user_defined_checkers')
                 self.include_devices = self._get_list_data('include_devices')
+                self.checker_workers = self.config_data.get('checker_workers', Config.DEFAULT_CHECKER_WORKERS)
+                self.checker_intervals = self._get_dict_data('checker_intervals')
+                self.checker_timeouts = self._get_dict_data('checker_timeouts')
+                self.hardware_keyspace_notifications = self.config_data.get('hardware_keyspace_notifications', False)
+                # The daemon runs a cycle as often as the most frequent checker
+                self.interval = min([self.polling_interval] + list(self.checker_intervals.values()))
             except Exception as e:
                 self._reset()
 
@@ -84,10 +102,40 @@ class Config(object):
         self._last_mtime = None
         self.config_data = None
         self.interval = Config.DEFAULT_INTERVAL
+        self.polling_interval = Config.DEFAULT_INTERVAL
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
         self.include_devices = None
+        self.checker_workers = Config.DEFAULT_CHECKER_WORKERS
+        self.checker_intervals = {}
+        self.checker_timeouts = {}
+        self.hardware_keyspace_notifications = False
+
+    def get_checker_interval(self, checker):
+        """
+        Get the interval of a checker. An entry of "checker_intervals" matches the checker name, for example
+        "UserDefinedChecker - my_check.sh", or the checker class name.
+        :param checker: A checker object.
+        :return: Interval in seconds, the polling interval if the checker has no entry
+        """
+        return self._get_checker_value(self.checker_intervals, checker, self.polling_interval)
+
+    def get_checker_timeout(self, checker):
+        """
+        Get the time to wait for a checker in one check cycle. Entries of "checker_timeouts" are matched the same way
+        as "checker_intervals".
+        :param checker: A checker object.
+        :return: Timeout in seconds
+        """
+        return self._get_checker_value(self.checker_timeouts, checker, Config.DEFAULT_CHECKER_TIMEOUT)
+
+    @staticmethod
+    def _get_checker_value(data, checker, default):
+        for name in (str(checker), checker.__class__.__name__):
+            if name in data:
+                return data[name]
+        return default
 
     def get_led_color(self, status):
         """
@@ -144,3 +192,14 @@ class Config(object):
             if isinstance(data, list):
                 return set(data)
         return None
+
+    def _get_dict_data(self, key):
+        """
+        Get dictionary type configuration data by key.
+        :param key: Key of the configuration entry
+        :return: The configuration data, an empty dictionary if key does not exist
+        """
+        data = self.config_data.get(key)
+        if isinstance(data, dict):
+            return data
+        return {}
@@ -0,0 +1,309 @@
+"""
+Container state cache fed by the docker events stream. The cache does one full sync of all containers when it starts
+and every time the events stream is reconnected, then only inspects containers that docker reports events for.
+
+The cache can be read in process through ContainerStateCache, and by other processes such as the container_checker of
+monit from STATE_DB:
+    CONTAINER_STATE|<container name>  - state of a container, see ContainerStateCache.get_containers
+    CONTAINER_STATE_CACHE             - 'synced' is 'true' while the cache is in sync with docker, 'heartbeat' is the
+                                        time of the latest update, it is refreshed at least every HEARTBEAT_INTERVAL
+"""
+import threading
+import time
+
+import docker
+from sonic_py_common.logger import Logger
+from swsscommon.swsscommon import SonicV2Connector
+
+SYSLOG_IDENTIFIER = 'container_state'
+logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
+
+CONTAINER_STATE_TABLE = 'CONTAINER_STATE'
+CONTAINER_STATE_CACHE_KEY = 'CONTAINER_STATE_CACHE'
+
+DOCKER_SOCKET = 'unix://var/run/docker.sock'
+
+
+class ContainerStateCache(object):
+    """
+    Keep the state of all containers from the docker events stream. A background thread syncs all containers, follows
+    the events and writes every change to STATE_DB.
+    """
+
+    # Container events that change the cached state
+    CONTAINER_EVENTS = ['create', 'start', 'restart', 'stop', 'die', 'kill', 'oom', 'pause', 'unpause',
+                        'health_status', 'rename', 'destroy']
+
+    # Image events that invalidate the image lookups
+    IMAGE_EVENTS = ['pull', 'load', 'import', 'tag', 'untag', 'delete']
+
+    # The events stream is reopened at this interval to refresh the heartbeat
+    HEARTBEAT_INTERVAL = 30
+
+    # Time in seconds to wait before reconnecting to docker, doubled after every failure
+    MIN_RETRY_INTERVAL = 1
+    MAX_RETRY_INTERVAL = 30
+
+    def __init__(self, use_db=True):
+        """
+        Constructor.
+        :param use_db: Whether to write the cache to STATE_DB.
+        """
+        self._lock = threading.Lock()
+        self._containers = {}
+        self._images = {}
+        self._synced = False
+        self._since = None
+        self._client = None
+        self._stream = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._use_db = use_db
+        self._db = None
+        self.sync_count = 0
+        self.event_count = 0
+
+    def start(self):
+        """
+        Start the background thread.
+        :return:
+        """
+        if self._thread:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='container_state', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread and remove the cache from STATE_DB.
+        :return:
+        """
+        self._stop_event.set()
+        stream = self._stream
+        if stream:
+            stream.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._synced = False
+        if self._db:
+            self._db.delete_all_by_pattern(self._db.STATE_DB, CONTAINER_STATE_TABLE + '|*')
+            self._db.delete(self._db.STATE_DB, CONTAINER_STATE_CACHE_KEY)
+
+    def is_synced(self):
+        return self._synced
+
+    def get_containers(self):
+        """
+        Get the state of all containers.
+        :return: A dictionary of container name to a dictionary with fields id, image, status, health, oom_killed,
+                 exit_code, merged_dir, k8s_namespace, k8s_type and k8s_container. All values are strings.
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._containers.items()}
+
+    def get_running_containers(self):
+        """
+        Get the state of running containers.
+        :return: A dictionary of container name to container state.
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._containers.items() if entry['status'] == 'running'}
+
+    def image_exists(self, image_name):
+        """
+        Check if a docker image exists. The result is kept until docker reports an image event.
+        :param image_name: Image name.
+        :return: True if the image exists, otherwise False.
+        """
+        with self._lock:
+            if image_name in self._images:
+                return self._images[image_name]
+
+        try:
+            self._get_client().images.get(image_name)
+            exists = True
+        except docker.errors.ImageNotFound:
+            exists = False
+        except docker.errors.APIError:
+            # Do not cache errors
+            return False
+
+        with self._lock:
+            self._images[image_name] = exists
+        return exists
+
+    def _get_client(self):
+        if not self._client:
+            self._client = docker.DockerClient(base_url=DOCKER_SOCKET)
+        return self._client
+
+    def _run(self):
+        retry_interval = ContainerStateCache.MIN_RETRY_INTERVAL
+        while not self._stop_event.is_set():
+            try:
+                self._follow()
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.log_warning('Lost docker events stream, resync in {} seconds: {}'.format(retry_interval, repr(e)))
+                self._set_synced(False)
+                self._client = None
+                self._stop_event.wait(retry_interval)
+                retry_interval = min(retry_interval * 2, ContainerStateCache.MAX_RETRY_INTERVAL)
+            else:
+                retry_interval = ContainerStateCache.MIN_RETRY_INTERVAL
+
+    def _follow(self):
+        """
+        Sync all containers if not in sync, then apply events until the stream ends at the next heartbeat.
+        Events are read from the start of the sync, so no change between the sync and the stream is lost.
+        :return:
+        """
+        client = self._get_client()
+        if not self._synced:
+            self._since = int(time.time())
+            self._sync(client)
+
+        until = self._since + ContainerStateCache.HEARTBEAT_INTERVAL
+        self._stream = client.events(since=self._since, until=until, decode=True,
+                                     filters={'type': ['container', 'image'],
+                                              'event': ContainerStateCache.CONTAINER_EVENTS +
+                                                       ContainerStateCache.IMAGE_EVENTS})
+        try:
+            for event in self._stream:
+                if self._stop_event.is_set():
+                    return
+                self._handle_event(client, event)
+        finally:
+            self._stream.close()
+            self._stream = None
+        self._since = until
+        self._write_meta()
+
+    def _sync(self, client):
+        """
+        Replace the cache with the state of all containers.
+        :param client: Docker client.
+        :return:
+        """
+        containers = {}
+        for ctr in client.containers.list(all=True):
+            containers[ctr.name] = self._get_entry(ctr.attrs)
+
+        with self._lock:
+            removed = set(self._containers) - set(containers)
+            self._containers = containers
+            self._images = {}
+        for name in removed:
+            self._db_delete(name)
+        for name, entry in containers.items():
+            self._db_update(name, entry)
+        self.sync_count += 1
+        self._set_synced(True)
+
+    def _handle_event(self, client, event):
+        """
+        Apply a docker event to the cache. The container is inspected, so events can be applied more than once.
+        :param client: Docker client.
+        :param event: Decoded docker event.
+        :return:
+        """
+        self.event_count += 1
+        if event.get('Type') == 'image':
+            with self._lock:
+                self._images = {}
+            return
+
+        actor = event.get('Actor', {})
+        container_id = actor.get('ID') or event.get('id')
+        name = actor.get('Attributes', {}).get('name')
+        action = event.get('Action') or event.get('status') or ''
+        if action == 'rename':
+            old_name = actor.get('Attributes', {}).get('oldName', '').lstrip('/')
+            self._remove(old_name)
+
+        if action == 'destroy':
+            self._remove(name)
+            return
+
+        try:
+            attrs = client.api.inspect_container(container_id)
+        except docker.errors.NotFound:
+            self._remove(name)
+            return
+
+        entry = self._get_entry(attrs)
+        if action == 'oom':
+            entry['oom_killed'] = 'true'
+        name = attrs.get('Name', '').lstrip('/') or name
+        with self._lock:
+            self._containers[name] = entry
+        self._db_update(name, entry)
+
+    def _remove(self, name):
+        if not name:
+            return
+        with self._lock:
+            if self._containers.pop(name, None) is None:
+                return
+        self._db_delete(name)
+
+    @staticmethod
+    def _get_entry(attrs):
+        """
+        Get the cached state of a container from its inspect data.
+        :param attrs: Container inspect data.
+        :return: A dictionary of field name to string value.
+        """
+        state = attrs.get('State') or {}
+        config = attrs.get('Config') or {}
+        labels = config.get('Labels') or {}
+        graph_data = (attrs.get('GraphDriver') or {}).get('Data') or {}
+        return {
+            'id': attrs.get('Id', '')[:12],
+            'image': config.get('Image', ''),
+            'status': state.get('Status', ''),
+            'health': (state.get('Health') or {}).get('Status', ''),
+            'oom_killed': 'true' if state.get('OOMKilled') else 'false',
+            'exit_code': str(state.get('ExitCode', '')),
+            'merged_dir': graph_data.get('MergedDir', ''),
+            'k8s_namespace': labels.get('io.kubernetes.pod.namespace', ''),
+            'k8s_type': labels.get('io.kubernetes.docker.type', ''),
+            'k8s_container': labels.get('io.kubernetes.container.name', '')
+        }
+
+    def _get_db(self):
+        if self._use_db and not self._db:
+            self._db = SonicV2Connector(use_unix_socket_path=True)
+            self._db.connect(self._db.STATE_DB)
+        return self._db
+
+    def _db_update(self, name, entry):
+        db = self._get_db()
+        if db:
+            db.hmset(db.STATE_DB, '{}|{}'.format(CONTAINER_STATE_TABLE, name), entry)
+
+    def _db_delete(self, name):
+        db = self._get_db()
+        if db:
+            db.delete(db.STATE_DB, '{}|{}'.format(CONTAINER_STATE_TABLE, name))
+
+    def _set_synced(self, synced):
+        self._synced = synced
+        self._write_meta()
+
+    def _write_meta(self):
+        db = self._get_db()
+        if not db:
+            return
+        try:
+            db.hmset(db.STATE_DB, CONTAINER_STATE_CACHE_KEY, {
+                'synced': 'true' if self._synced else 'false',
+                'heartbeat': str(time.time())
+            })
+        except Exception as e:
+            # Readers ignore the cache once the heartbeat is stale
+            logger.log_warning('Failed to update {} in STATE_DB: {}'.format(CONTAINER_STATE_CACHE_KEY, repr(e)))
+            self._db = None
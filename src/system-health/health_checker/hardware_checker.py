@@ -3,6 +3,7 @@ from swsscommon import swsscommon
 from swsscommon.swsscommon import SonicV2Connector
 
 from .health_checker import HealthChecker
+from .state_db_snapshot import StateDbSnapshot
 
 EVENTS_PUBLISHER_SOURCE = "sonic-events-host"
 EVENTS_PUBLISHER_TAG = "liquid-cooling-leak"
@@ -17,10 +18,15 @@ class HardwareChecker(HealthChecker):
     PSU_TABLE_NAME = 'PSU_INFO'
     LIQUID_COOLING_TABLE_NAME = 'LIQUID_COOLING_INFO'
 
+    # STATE_DB keys read by the checks, refreshed once per check
+    SNAPSHOT_PATTERNS = [ASIC_TEMPERATURE_KEY + '*', FAN_TABLE_NAME + '*', PSU_TABLE_NAME + '*',
+                         LIQUID_COOLING_TABLE_NAME + '|*']
+
     def __init__(self):
         HealthChecker.__init__(self)
         self._db = SonicV2Connector(use_unix_socket_path=True)
         self._db.connect(self._db.STATE_DB)
+        self._snapshot = StateDbSnapshot(self._db, HardwareChecker.SNAPSHOT_PATTERNS)
 
         self.leaking_sensors = []
 
@@ -29,6 +35,8 @@ class HardwareChecker(HealthChecker):
 
     def check(self, config):
         self.reset()
+        self._snapshot.use_notifications = config.hardware_keyspace_notifications
+        self._snapshot.refresh()
         self._check_asic_status(config)
         self._check_fan_status(config)
         self._check_psu_status(config)
@@ -43,13 +51,10 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'asic' in config.ignore_devices:
             return
 
-        ASIC_TEMPERATURE_KEY_LIST = self._db.keys(self._db.STATE_DB,
-                                                  HardwareChecker.ASIC_TEMPERATURE_KEY + '*')
+        ASIC_TEMPERATURE_KEY_LIST = self._snapshot.keys(HardwareChecker.ASIC_TEMPERATURE_KEY + '*')
         for asic_key in ASIC_TEMPERATURE_KEY_LIST:
-            temperature = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'temperature')
-            temperature_threshold = self._db.get(self._db.STATE_DB, asic_key,
-                                                          'high_threshold')
+            temperature = self._snapshot.get(asic_key, 'temperature')
+            temperature_threshold = self._snapshot.get(asic_key, 'high_threshold')
             asic_name = asic_key.split('|')[1]
             if not temperature:
                 self.set_object_not_ok('ASIC', asic_name,
@@ -85,7 +90,7 @@ class HardwareChecker(HealthChecker):
         if config.ignore_devices and 'fan' in config.ignore_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.FAN_TABLE_NAME + '*')
+        keys = self._snapshot.keys(HardwareChecker.FAN_TABLE_NAME + '*')
         if not keys:
             self.set_object_not_ok('Fan', 'Fan', 'Failed to get fan information')
             return
@@ -100,7 +105,7 @@ class HardwareChecker(HealthChecker):
             name = key_list[1]
             if config.ignore_devices and name in config.ignore_devices:
                 continue
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = self._snapshot.get_all(key)
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('Fan', name, '{} is missing'.format(name))
@@ -176,7 +181,7 @@ class HardwareChecker(HealthChecker):
         if ignore_psu and ignore_pdb:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.PSU_TABLE_NAME + '*')
+        keys = self._snapshot.keys(HardwareChecker.PSU_TABLE_NAME + '*')
         if not keys:
             # An empty PSU_INFO table is only a failure when PSU monitoring is expected.
             # Platforms without PSUs (e.g. DPUs) ignore 'psu' to suppress this alarm.
@@ -200,7 +205,7 @@ class HardwareChecker(HealthChecker):
             if (is_pdb and ignore_pdb) or (not is_pdb and ignore_psu):
                 continue
 
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = self._snapshot.get_all(key)
             presence = data_dict.get('presence', 'false')
             if presence.lower() != 'true':
                 self.set_object_not_ok('PSU', name, '{} is missing or not available'.format(name))
@@ -321,7 +326,7 @@ class HardwareChecker(HealthChecker):
         if not config.include_devices or 'liquid_cooling' not in config.include_devices:
             return
 
-        keys = self._db.keys(self._db.STATE_DB, HardwareChecker.LIQUID_COOLING_TABLE_NAME + '|*')
+        keys = self._snapshot.keys(HardwareChecker.LIQUID_COOLING_TABLE_NAME + '|*')
         if not keys:
             self.set_object_not_ok('Liquid Cooling', 'Liquid Cooling', 'Failed to get liquid cooling information')
             return
@@ -337,7 +342,7 @@ class HardwareChecker(HealthChecker):
             if config.ignore_devices and name in config.ignore_devices:
                 continue
 
-            data_dict = self._db.get_all(self._db.STATE_DB, key)
+            data_dict = self._snapshot.get_all(key)
             leak_status = data_dict.get('leak_status', None)
             if leak_status is None or leak_status == 'N/A':
                 self.set_object_not_ok('Liquid Cooling', name, 'Failed to get leakage sensor status for {}'.format(name))
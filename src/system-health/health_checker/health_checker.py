@@ -10,6 +10,8 @@ class HealthChecker(object):
     STATUS_OK = 'OK'
     STATUS_NOT_OK = 'Not OK'
 
+    # Summary of the latest HealthCheckerManager.check(), only set by the manager. Checkers run in worker threads
+    # and must not change it
     summary = STATUS_OK
 
     def __init__(self):
@@ -72,7 +74,6 @@ class HealthChecker(object):
         self.add_info(object_name, self.INFO_FIELD_OBJECT_TYPE, object_type)
         self.add_info(object_name, self.INFO_FIELD_OBJECT_MSG, message)
         self.add_info(object_name, self.INFO_FIELD_OBJECT_STATUS, self.STATUS_NOT_OK)
-        HealthChecker.summary = HealthChecker.STATUS_NOT_OK
 
     def set_object_ok(self, object_type, object_name):
         """
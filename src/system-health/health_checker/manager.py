@@ -1,3 +1,7 @@
+import concurrent.futures
+import copy
+import time
+
 from .config import Config
 from .health_checker import HealthChecker
 from .service_checker import ServiceChecker
@@ -6,12 +10,79 @@ from .user_defined_checker import UserDefinedChecker
 from . import utils
 
 
+class CheckerState(object):
+    """
+    Scheduling state and duration statistic of a checker. The latest successful result is kept so that it can be
+    reported while the checker is not due or did not finish in time.
+    """
+
+    # Upper bounds in seconds of the duration histogram buckets
+    DURATION_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60)
+
+    # Cycles do not start exactly one interval apart, a checker is due slightly before its interval expires
+    INTERVAL_TOLERANCE = 1
+
+    def __init__(self, checker):
+        self.checker = checker
+        self.future = None
+        self.start_time = None
+        self.last_run = None
+        # Internal error entry if the latest finished run failed
+        self.error = None
+        # Latest successful (category, info), also reported while the checker runs longer than its timeout
+        self.last_good = None
+        self.count = 0
+        self.timeouts = 0
+        self.duration_sum = 0.0
+        self.last_duration = 0.0
+        self.buckets = [0] * len(self.DURATION_BUCKETS)
+
+    def is_due(self, now, interval):
+        return self.last_run is None or now - self.last_run >= interval - self.INTERVAL_TOLERANCE
+
+    def add_duration(self, duration):
+        self.count += 1
+        self.duration_sum += duration
+        self.last_duration = duration
+        for index, bound in enumerate(self.DURATION_BUCKETS):
+            if duration <= bound:
+                self.buckets[index] += 1
+
+    def get_stats(self):
+        """
+        Get the duration histogram of the checker. Bucket counts are cumulative.
+        :return: A dictionary of field name to string value.
+        """
+        stats = {
+            'count': str(self.count),
+            'sum': '{:.3f}'.format(self.duration_sum),
+            'last': '{:.3f}'.format(self.last_duration),
+            'timeouts': str(self.timeouts)
+        }
+        for bound, count in zip(self.DURATION_BUCKETS, self.buckets):
+            stats['le_{}'.format(bound)] = str(count)
+        stats['le_inf'] = str(self.count)
+        return stats
+
+
 class HealthCheckerManager(object):
     """
-    Manage all system health checkers and system health configuration.
+    Manage all system health checkers and system health configuration. Checkers run concurrently on a bounded thread
+    pool. Each checker runs when its interval expires, and a checker that does not finish within its timeout keeps
+    reporting its last good result until it finishes.
     """
-    def __init__(self):
+    def __init__(self, container_state=None):
+        """
+        Constructor.
+        :param container_state: A ContainerStateCache shared by the checkers, None to query docker directly.
+        """
         self._checkers = []
+        self._user_defined_checkers = {}
+        self._states = {}
+        self._executor = None
+        self._executor_workers = None
+        self.container_state = container_state
+        self.summary = HealthChecker.STATUS_OK
         self.config = Config()
         self.initialize()
 
@@ -20,7 +91,7 @@ class HealthCheckerManager(object):
         Initialize the manager. Create service checker and hardware checker by default.
         :return:
         """
-        self._checkers.append(ServiceChecker())
+        self._checkers.append(ServiceChecker(self.container_state))
         self._checkers.append(HardwareChecker())
 
     def check(self, chassis):
@@ -29,48 +100,159 @@ class HealthCheckerManager(object):
         :param chassis: A chassis object.
         :return: A dictionary that contains the status for all objects that was checked.
         """
-        HealthChecker.summary = HealthChecker.STATUS_OK
         stats = {}
         self.config.load_config()
 
-        for checker in self._checkers:
-            self._do_check(checker, stats)
+        checkers = self._get_checkers()
+        executor = self._get_executor()
+        now = time.monotonic()
+        for checker in checkers:
+            state = self._states[checker]
+            if state.future is None and state.is_due(now, self.config.get_checker_interval(checker)):
+                state.start_time = now
+                state.future = executor.submit(self._do_check, checker)
 
-        if self.config.user_defined_checkers:
-            for udc in self.config.user_defined_checkers:
-                checker = UserDefinedChecker(udc)
-                self._do_check(checker, stats)
+        for checker in checkers:
+            state = self._states[checker]
+            if state.future is not None:
+                deadline = state.start_time + self.config.get_checker_timeout(checker)
+                concurrent.futures.wait([state.future], timeout=max(0, deadline - time.monotonic()))
+                self._collect(state)
+            self._add_result(state, stats)
+
+        self.summary = self.get_summary(stats)
+        # Kept for the callers which read the summary from the checker class
+        HealthChecker.summary = self.summary
 
         self._set_system_led(chassis)
         return stats
 
-    def _do_check(self, checker, stats):
+    @staticmethod
+    def get_summary(stats):
         """
-        Do check for a particular checker and collect the check statistic.
-        :param checker: A checker object.
-        :param stats: Check statistic.
+        Get the summary of a check result.
+        :param stats: A dictionary returned by check().
+        :return: HealthChecker.STATUS_NOT_OK if any object is not OK, HealthChecker.STATUS_OK otherwise.
+        """
+        for info in stats.values():
+            for obj_data in info.values():
+                if obj_data.get(HealthChecker.INFO_FIELD_OBJECT_STATUS) == HealthChecker.STATUS_NOT_OK:
+                    return HealthChecker.STATUS_NOT_OK
+        return HealthChecker.STATUS_OK
+
+    def get_checker_stats(self):
+        """
+        Get the duration histogram of all checkers.
+        :return: A dictionary of checker name to histogram fields.
+        """
+        return {str(state.checker): state.get_stats() for state in self._states.values()}
+
+    def shutdown(self):
+        """
+        Stop the worker threads. Checkers that are running are not waited for.
         :return:
         """
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_checkers(self):
+        """
+        Get all checkers of this cycle. User defined checkers are created once per command and reused while the
+        command is configured.
+        :return: A list of checker objects.
+        """
+        commands = self.config.user_defined_checkers or set()
+        for cmd in list(self._user_defined_checkers):
+            if cmd not in commands:
+                del self._states[self._user_defined_checkers.pop(cmd)]
+        for cmd in sorted(commands):
+            if cmd not in self._user_defined_checkers:
+                self._user_defined_checkers[cmd] = UserDefinedChecker(cmd)
+
+        checkers = self._checkers + [self._user_defined_checkers[cmd] for cmd in sorted(commands)]
+        for checker in checkers:
+            if checker not in self._states:
+                self._states[checker] = CheckerState(checker)
+        return checkers
+
+    def _get_executor(self):
+        workers = max(1, self.config.checker_workers)
+        if self._executor_workers != workers:
+            # Running checkers finish on the old pool
+            self.shutdown()
+        if not self._executor:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                                   thread_name_prefix='health_checker')
+            self._executor_workers = workers
+        return self._executor
+
+    def _do_check(self, checker):
+        """
+        Do check for a particular checker, runs in a worker thread.
+        :param checker: A checker object.
+        :return: A tuple of check result as (category, info) or None, internal error entry or None, and the check
+                 duration.
+        """
+        begin = time.monotonic()
         try:
             checker.check(self.config)
-            category = checker.get_category()
-            info = checker.get_info()
-            if category not in stats:
-                stats[category] = info
-            else:
-                stats[category].update(info)
+            result = checker.get_category(), copy.deepcopy(checker.get_info())
+            return result, None, time.monotonic() - begin
         except Exception as e:
-            HealthChecker.summary = HealthChecker.STATUS_NOT_OK
             error_msg = 'Failed to perform health check for {} due to exception - {}'.format(checker, repr(e))
-            entry = {str(checker): {
+            error = {str(checker): {
                 HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
                 HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
                 HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
             }}
-            if 'Internal' not in stats:
-                stats['Internal'] = entry
-            else:
-                stats['Internal'].update(entry)
+            return None, error, time.monotonic() - begin
+
+    def _collect(self, state):
+        """
+        Save the outcome of a finished check.
+        :param state: Checker state.
+        :return:
+        """
+        if not state.future.done():
+            state.timeouts += 1
+            return
+        if state.future.cancelled():
+            # Queued on a pool that was shut down, run again in this cycle's pool next time
+            state.future = None
+            return
+
+        result, state.error, duration = state.future.result()
+        state.future = None
+        state.last_run = state.start_time
+        if result:
+            state.last_good = result
+        state.add_duration(duration)
+
+    def _add_result(self, state, stats):
+        """
+        Add the result of a checker to the check statistic. A checker that is still running reports its last good
+        result, or an internal error if it never finished.
+        :param state: Checker state.
+        :param stats: Check statistic.
+        :return:
+        """
+        if state.error and state.future is None:
+            category, info = 'Internal', state.error
+        elif state.last_good:
+            category, info = state.last_good
+        else:
+            category = 'Internal'
+            info = {str(state.checker): {
+                HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
+                HealthChecker.INFO_FIELD_OBJECT_MSG: 'Health check for {} did not finish in time'.format(state.checker),
+                HealthChecker.INFO_FIELD_OBJECT_TYPE: "Internal"
+            }}
+
+        if category not in stats:
+            stats[category] = copy.deepcopy(info)
+        else:
+            stats[category].update(copy.deepcopy(info))
 
     def _set_system_led(self, chassis):
         try:
@@ -86,7 +268,7 @@ class HealthCheckerManager(object):
         Returns:
             str: LED color
         """
-        if HealthChecker.summary == HealthChecker.STATUS_OK:
+        if self.summary == HealthChecker.STATUS_OK:
             return self.config.get_led_color('normal')
         else:
             uptime = utils.get_uptime()
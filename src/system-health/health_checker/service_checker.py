@@ -7,6 +7,7 @@ from swsscommon import swsscommon
 from sonic_py_common import multi_asic, device_info
 from sonic_py_common.logger import Logger
 from .health_checker import HealthChecker
+from . import supervisor_client
 from . import utils
 
 SYSLOG_IDENTIFIER = 'service_checker'
@@ -27,6 +28,35 @@ def check_docker_image(image_name):
     except (docker.errors.ImageNotFound, docker.errors.APIError) as err:
         return False
 
+def resolve_container_path(container_folder, path):
+    """
+    @summary: Resolve a path inside of a container from the host. Symbolic links are followed inside of the
+              container folder, an absolute link such as /var/run -> /run points into the container, not the host.
+    @return:  The resolved path under container_folder, None if there are too many links.
+    """
+    parts = path.strip('/').split('/')
+    resolved = []
+    links = 0
+    while parts:
+        part = parts.pop(0)
+        if part in ('', '.'):
+            continue
+        if part == '..':
+            resolved = resolved[:-1]
+            continue
+        candidate = os.path.join(container_folder, *(resolved + [part]))
+        if os.path.islink(candidate):
+            links += 1
+            if links > 40:
+                return None
+            target = os.readlink(candidate)
+            if target.startswith('/'):
+                resolved = []
+            parts = target.strip('/').split('/') + parts
+            continue
+        resolved.append(part)
+    return os.path.join(container_folder, *resolved)
+
 class ServiceChecker(HealthChecker):
     """
     Checker that checks critical system service status via monit service.
@@ -37,6 +67,12 @@ class ServiceChecker(HealthChecker):
 
     CRITICAL_PROCESSES_PATH = 'etc/supervisor/critical_processes'
 
+    # Path of the supervisord XML-RPC socket inside a container, /var/run is usually a link to /run
+    SUPERVISOR_SOCKET_PATH = 'var/run/supervisor.sock'
+
+    # Command to get process status of a container when its supervisord socket is not reachable
+    SUPERVISORCTL_STATUS_CMD = 'docker exec {} bash -c "supervisorctl status"'
+
     # Command to get merged directory of a container
     GET_CONTAINER_FOLDER_CMD = 'docker inspect {} --format "{{{{.GraphDriver.Data.MergedDir}}}}"'
 
@@ -55,7 +91,12 @@ class ServiceChecker(HealthChecker):
     # These containers will be excluded from both expected and running container sets.
     CONTAINER_K8S_WHITELIST = {'telemetry', 'acms', 'restapi'}
 
-    def __init__(self):
+    def __init__(self, container_state=None):
+        """
+        Constructor.
+        :param container_state: A ContainerStateCache to read containers from instead of listing them from docker
+                                every check.
+        """
         HealthChecker.__init__(self)
         self.container_critical_processes = {}
         # Containers that has invalid critical_processes file
@@ -67,6 +108,16 @@ class ServiceChecker(HealthChecker):
 
         self.config_db = None
 
+        self.docker_client = None
+
+        self.container_state = container_state
+
+        # Merged directory of running containers, taken from the container list
+        self.container_folders = {}
+
+        # Process status of containers fetched from supervisord in the current check
+        self.process_status = {}
+
         self.load_critical_process_cache()
 
     def get_expected_running_containers(self, feature_table):
@@ -105,12 +156,12 @@ class ServiceChecker(HealthChecker):
                 continue
             # slim image does not have telemetry container and corresponding docker image
             if container_name == "telemetry":
-                ret = check_docker_image("docker-sonic-telemetry")
+                ret = self._image_exists("docker-sonic-telemetry")
                 if not ret:
                     # If telemetry container image is not present, check gnmi container image
                     # If gnmi container image is not present, ignore telemetry container check
                     # if gnmi container image is present, check gnmi container instead of telemetry
-                    ret = check_docker_image("docker-sonic-gnmi")
+                    ret = self._image_exists("docker-sonic-gnmi")
                     if not ret:
                         logger.log_debug("Ignoring telemetry container check on image which has no corresponding docker image")
                     else:
@@ -118,7 +169,7 @@ class ServiceChecker(HealthChecker):
                     continue
             # Some platforms may not include the OTEL container; skip expecting it when image absent
             if container_name == "otel":
-                if not check_docker_image("docker-sonic-otel"):
+                if not self._image_exists("docker-sonic-otel"):
                     logger.log_debug("Ignoring otel container check on image which has no corresponding docker image")
                     continue
 
@@ -146,6 +197,11 @@ class ServiceChecker(HealthChecker):
             container_feature_dict["database-chassis"] = "database"
         return expected_running_containers, container_feature_dict
 
+    def _image_exists(self, image_name):
+        if self.container_state and self.container_state.is_synced():
+            return self.container_state.image_exists(image_name)
+        return check_docker_image(image_name)
+
     def get_current_running_containers(self):
         """Get current running containers, if the running container is not in self.container_critical_processes,
            try get the critical process list
@@ -153,9 +209,14 @@ class ServiceChecker(HealthChecker):
         Returns:
             running_containers: A set of running container names
         """
-        DOCKER_CLIENT = docker.DockerClient(base_url='unix://var/run/docker.sock')
+        if self.container_state and self.container_state.is_synced():
+            return self._get_running_containers_from_cache()
+
+        if not self.docker_client:
+            self.docker_client = docker.DockerClient(base_url='unix://var/run/docker.sock')
         running_containers = set()
-        ctrs = DOCKER_CLIENT.containers
+        self.container_folders = {}
+        ctrs = self.docker_client.containers
         try:
             lst = ctrs.list(filters={"status": "running"})
 
@@ -169,6 +230,9 @@ class ServiceChecker(HealthChecker):
                 if ctr.name in ServiceChecker.CONTAINER_K8S_WHITELIST:
                     continue
                 running_containers.add(ctr.name)
+                merged_dir = ((ctr.attrs or {}).get('GraphDriver') or {}).get('Data', {}).get('MergedDir')
+                if isinstance(merged_dir, str) and merged_dir:
+                    self.container_folders[ctr.name] = merged_dir
                 if ctr.name not in self.container_critical_processes:
                     self.fill_critical_process_by_container(ctr.name)
         except docker.errors.APIError as err:
@@ -176,6 +240,27 @@ class ServiceChecker(HealthChecker):
 
         return running_containers
 
+    def _get_running_containers_from_cache(self):
+        """Get current running containers from the container state cache
+
+        Returns:
+            running_containers: A set of running container names
+        """
+        running_containers = set()
+        self.container_folders = {}
+        for name, entry in self.container_state.get_running_containers().items():
+            if entry['k8s_namespace'] == 'sonic':
+                continue
+            if name in ServiceChecker.CONTAINER_K8S_WHITELIST:
+                continue
+            running_containers.add(name)
+            if entry['merged_dir']:
+                self.container_folders[name] = entry['merged_dir']
+            if name not in self.container_critical_processes:
+                self.fill_critical_process_by_container(name)
+
+        return running_containers
+
     def get_critical_process_list_from_file(self, container, critical_processes_file):
         """Read critical process and group name lists from critical processes file
 
@@ -239,10 +324,8 @@ class ServiceChecker(HealthChecker):
         # Expand group: entries to individual "group:process" names via supervisorctl status.
         if critical_group_list:
             count_before_expansion = len(critical_process_list)
-            cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container)
-            status_output = utils.run_command(cmd, timeout=15)
-            if status_output:
-                process_status = self._parse_supervisorctl_status(status_output.strip().splitlines())
+            process_status = self._get_process_status(container)
+            if process_status:
                 for proc_name in process_status:
                     if ':' in proc_name:
                         group_name = proc_name.split(':')[0]
@@ -266,12 +349,74 @@ class ServiceChecker(HealthChecker):
         self.need_save_cache = True
 
     def _get_container_folder(self, container):
+        if container in self.container_folders:
+            return self.container_folders[container]
+
         container_folder = utils.run_command(ServiceChecker.GET_CONTAINER_FOLDER_CMD.format(container))
         if container_folder is None:
             return container_folder
 
         return container_folder.strip()
 
+    def _get_supervisor_socket(self, container):
+        """Get path of the supervisord socket of a container
+
+        Args:
+            container (str): container name
+
+        Returns:
+            Socket path, None if the socket does not exist
+        """
+        container_folder = self._get_container_folder(container)
+        if not container_folder:
+            return None
+
+        socket_path = resolve_container_path(container_folder, ServiceChecker.SUPERVISOR_SOCKET_PATH)
+        return socket_path if socket_path and os.path.exists(socket_path) else None
+
+    def collect_process_status(self, containers):
+        """Fetch process status of containers from their supervisord sockets concurrently
+
+        Args:
+            containers (iterable): container names
+        """
+        socket_paths = {}
+        for container in containers:
+            socket_path = self._get_supervisor_socket(container)
+            if socket_path:
+                socket_paths[container] = socket_path
+
+        for container, status in supervisor_client.get_all_process_status(socket_paths).items():
+            if isinstance(status, Exception):
+                logger.log_debug('Failed to get process status from supervisord of {}: {}'.format(container, repr(status)))
+            else:
+                self.process_status[container] = status
+
+    def _get_process_status(self, container):
+        """Get process status of a container. The status is read from supervisord socket of the container, and
+           "supervisorctl status" is run in the container if the socket is not reachable.
+
+        Args:
+            container (str): container name
+
+        Returns:
+            A dictionary of process name to state, None if the status cannot be retrieved
+        """
+        if container in self.process_status:
+            return self.process_status[container]
+
+        socket_path = self._get_supervisor_socket(container)
+        if socket_path:
+            try:
+                return supervisor_client.get_process_status(socket_path)
+            except Exception as e:
+                logger.log_debug('Failed to get process status from supervisord of {}: {}'.format(container, repr(e)))
+
+        status_output = utils.run_command(ServiceChecker.SUPERVISORCTL_STATUS_CMD.format(container), timeout=15)
+        if status_output is None:
+            return None
+        return self._parse_supervisorctl_status(status_output.strip().splitlines())
+
     def save_critical_process_cache(self):
         """Save self.container_critical_processes to a cache file
         """
@@ -349,6 +494,7 @@ class ServiceChecker(HealthChecker):
             self.config_db = swsscommon.ConfigDBConnector(use_unix_socket_path=True)
             self.config_db.connect()
         feature_table = self.config_db.get_table("FEATURE")
+        self.process_status = {}
         expected_running_containers, self.container_feature_dict = self.get_expected_running_containers(feature_table)
         current_running_containers = self.get_current_running_containers()
 
@@ -367,6 +513,8 @@ class ServiceChecker(HealthChecker):
             self.set_object_not_ok('Service', 'system', 'no critical process found')
             return
 
+        self.collect_process_status(container for container in self.container_critical_processes
+                                    if container in current_running_containers)
         for container, critical_process_list in self.container_critical_processes.items():
             self.check_process_existence(container, critical_process_list, config, feature_table)
 
@@ -427,18 +575,16 @@ class ServiceChecker(HealthChecker):
             if ("state" in feature_table[feature_name]
                     and feature_table[feature_name]["state"] not in ["disabled", "always_disabled"]):
 
-                # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
+                # We are using supervisord process status to check the critical process status. We cannot leverage psutil here because
                 # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
                 # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
-                cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
-                process_status = utils.run_command(cmd, timeout=15)
+                process_status = self._get_process_status(container_name)
                 if process_status is None:
                     for process_name in critical_process_list:
                         self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
                     self.publish_events(container_name, critical_process_list)
                     return
 
-                process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
                 for process_name in critical_process_list:
                     if config and config.ignore_services and process_name in config.ignore_services:
                         continue
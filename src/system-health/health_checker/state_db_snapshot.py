@@ -0,0 +1,194 @@
+"""
+In-memory view of STATE_DB tables shared by the checks of one checker. The tables are read with SCAN and pipelined
+HGETALL, so a refresh takes a few round trips instead of one KEYS and one HGETALL per key. With keyspace
+notifications enabled, a refresh only reads the keys that changed since the previous refresh.
+
+If redis-py or the database configuration is not available, the tables are read through the SonicV2Connector.
+"""
+import fnmatch
+
+from sonic_py_common import redis_bulk
+from sonic_py_common.logger import Logger
+
+SYSLOG_IDENTIFIER = 'state_db_snapshot'
+logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
+
+class StateDbSnapshot(object):
+    """
+    Snapshot of the STATE_DB keys that match a list of patterns. refresh() updates the snapshot, keys(), get_all()
+    and get() read it like the SonicV2Connector methods without the database argument.
+    """
+
+    def __init__(self, db, patterns, client=None):
+        """
+        Constructor.
+        :param db: A SonicV2Connector connected to STATE_DB.
+        :param patterns: Key patterns of the tables in the snapshot, for example ['FAN_INFO|*'].
+        :param client: A redis-py client of STATE_DB, by default it is created from the database configuration.
+        """
+        self._db = db
+        self._patterns = list(patterns)
+        self._client = client if client is not None else self._get_redis_client(db)
+        self._pubsub = None
+        self._notifications_enabled = None
+        self._data = {}
+        self._loaded = False
+        # Whether to follow keyspace notifications and only read the changed keys on refresh
+        self.use_notifications = False
+        self.full_load_count = 0
+        self.update_count = 0
+        self.read_key_count = 0
+
+    def refresh(self):
+        """
+        Update the snapshot. Any failure of the redis-py client falls back to a full load through the connector.
+        :return:
+        """
+        if not self.use_notifications and self._pubsub:
+            self._close()
+
+        if self._client is None:
+            self._load_from_connector()
+            return
+
+        try:
+            if self._pubsub and self._loaded:
+                self._update()
+            else:
+                self._load()
+        except Exception as e:
+            logger.log_warning('Failed to refresh STATE_DB snapshot, read it through the connector: {}'.format(
+                repr(e)))
+            self._close()
+            self._load_from_connector()
+
+    def close(self):
+        """
+        Stop following keyspace notifications.
+        :return:
+        """
+        self._close()
+
+    def keys(self, pattern):
+        """
+        Get the keys of the snapshot that match a pattern.
+        :param pattern: Glob style pattern, it must be covered by the patterns of the snapshot.
+        :return: A list of keys.
+        """
+        return [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+
+    def get_all(self, key):
+        """
+        Get all fields of a key.
+        :param key: Key name.
+        :return: A dictionary of field name to value, an empty dictionary if the key does not exist.
+        """
+        return self._data.get(key, {})
+
+    def get(self, key, field):
+        """
+        Get a field of a key.
+        :param key: Key name.
+        :param field: Field name.
+        :return: The field value, None if the key or the field does not exist.
+        """
+        return self._data.get(key, {}).get(field)
+
+    def _load(self):
+        """
+        Replace the snapshot with all keys that match the patterns. In notification mode, the notifications are
+        subscribed before the keys are read, so no change after the read is lost.
+        :return:
+        """
+        self._loaded = False
+        if self.use_notifications and not self._pubsub:
+            self._subscribe()
+
+        self._data = dict(redis_bulk.scan_entries(self._client, self._patterns))
+        self._loaded = True
+        self.full_load_count += 1
+        self.read_key_count += len(self._data)
+
+    def _update(self):
+        """
+        Read again the keys that changed since the previous refresh.
+        :return:
+        """
+        changed = set()
+        while True:
+            message = self._pubsub.get_message()
+            if message is None:
+                break
+            if message['type'] == 'pmessage':
+                changed.add(message['channel'].split(':', 1)[1])
+
+        if not changed:
+            return
+
+        changed = list(changed)
+        for key, entry in zip(changed, redis_bulk.hgetall_pipelined(self._client, changed)):
+            if entry:
+                self._data[key] = entry
+            else:
+                self._data.pop(key, None)
+        self.update_count += 1
+        self.read_key_count += len(changed)
+
+    def _subscribe(self):
+        """
+        Subscribe to the keyspace notifications of the patterns if the database publishes them. Without
+        notifications, every refresh is a full load.
+        :return:
+        """
+        if self._notifications_enabled is None:
+            try:
+                self._notifications_enabled = redis_bulk.keyspace_notifications_enabled(self._client)
+            except Exception as e:
+                logger.log_warning('Failed to get keyspace notification configuration: {}'.format(repr(e)))
+                self._notifications_enabled = False
+            if not self._notifications_enabled:
+                logger.log_notice('Keyspace notifications are not enabled, STATE_DB snapshot is fully loaded on '
+                                  'refresh')
+        if not self._notifications_enabled:
+            return
+
+        db_id = self._client.connection_pool.connection_kwargs.get('db', 0)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(*['__keyspace@{}__:{}'.format(db_id, pattern) for pattern in self._patterns])
+
+    @staticmethod
+    def _get_redis_client(db):
+        """
+        Get a redis-py client of STATE_DB.
+        :param db: A SonicV2Connector.
+        :return: A redis.Redis object, None if redis-py or the database configuration is not available.
+        """
+        try:
+            return redis_bulk.get_redis_client(db, 'STATE_DB')
+        except Exception as e:
+            logger.log_info('Read STATE_DB through the connector: {}'.format(repr(e)))
+            return None
+
+    def _close(self):
+        if self._pubsub:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        self._loaded = False
+
+    def _load_from_connector(self):
+        """
+        Replace the snapshot with all keys that match the patterns, read with KEYS and one HGETALL per key.
+        :return:
+        """
+        data = {}
+        for pattern in self._patterns:
+            for key in self._db.keys(self._db.STATE_DB, pattern) or []:
+                entry = self._db.get_all(self._db.STATE_DB, key)
+                if entry:
+                    data[key] = entry
+        self._data = data
+        self.full_load_count += 1
+        self.read_key_count += len(data)
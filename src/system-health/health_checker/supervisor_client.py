@@ -0,0 +1,91 @@
+"""
+Query supervisord of containers over its XML-RPC unix socket. This gives the same process status as
+"docker exec <container> supervisorctl status" without starting a process in the container.
+"""
+import concurrent.futures
+import http.client
+import socket
+import xmlrpc.client
+
+# Time in seconds to wait for supervisord of one container
+DEFAULT_TIMEOUT = 5
+
+# Maximum number of containers queried concurrently
+DEFAULT_MAX_WORKERS = 8
+
+
+class UnixSocketHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a unix socket.
+    """
+    def __init__(self, socket_path, timeout=DEFAULT_TIMEOUT):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixSocketTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport over a unix socket.
+    """
+    def __init__(self, socket_path, timeout=DEFAULT_TIMEOUT):
+        xmlrpc.client.Transport.__init__(self)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        return UnixSocketHTTPConnection(self.socket_path, self.timeout)
+
+
+def get_process_status(socket_path, timeout=DEFAULT_TIMEOUT):
+    """
+    Get the state of all processes of a supervisord.
+    :param socket_path: Path of the supervisord unix socket.
+    :param timeout: Socket timeout in seconds.
+    :return: A dictionary of process name to state name, for example {'dhcp-relay:dhcp6relay': 'RUNNING'}. Process
+             names are formatted like supervisorctl does, "<group>:<name>" if the group name differs from the
+             process name.
+    """
+    transport = UnixSocketTransport(socket_path, timeout)
+    with xmlrpc.client.ServerProxy('http://localhost', transport=transport) as proxy:
+        process_info = proxy.supervisor.getAllProcessInfo()
+
+    status = {}
+    for info in process_info:
+        name = info['name']
+        group = info.get('group', name)
+        status[name if group == name else '{}:{}'.format(group, name)] = info['statename']
+    return status
+
+
+def get_all_process_status(socket_paths, timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Get the state of all processes of several supervisord instances concurrently.
+    :param socket_paths: A dictionary of container name to supervisord socket path.
+    :param timeout: Socket timeout in seconds.
+    :param max_workers: Maximum number of concurrent queries.
+    :return: A dictionary of container name to process status as returned by get_process_status, or to the
+             exception if the query failed.
+    """
+    if not socket_paths:
+        return {}
+
+    result = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(socket_paths))) as executor:
+        futures = {container: executor.submit(get_process_status, socket_path, timeout)
+                   for container, socket_path in socket_paths.items()}
+        for container, future in futures.items():
+            try:
+                result[container] = future.result()
+            except Exception as e:
+                result[container] = e
+    return result
@@ -31,6 +31,150 @@ SUBSCRIPTION_READY_TIMEOUT_SEC = 60
 logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
 exclude_srv_list = ['ztp.service']
 
+SYSTEMD_BUS_NAME = 'org.freedesktop.systemd1'
+SYSTEMD_OBJECT_PATH = '/org/freedesktop/systemd1'
+SYSTEMD_MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+SYSTEMD_UNIT_INTERFACE = 'org.freedesktop.systemd1.Unit'
+DBUS_PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+
+#Keeps the properties of systemd units in memory. Loaded with one ListUnits call
+#and GetAll per unit, then kept current by PropertiesChanged signals. All D-Bus calls
+#are made from the system bus thread; other threads only read the cache.
+class UnitPropertyCache(object):
+
+    # Properties of org.freedesktop.systemd1.Unit, as returned by run_systemctl_show
+    UNIT_PROPERTIES = ('Id', 'LoadState', 'UnitFileState', 'ActiveState', 'SubState', 'ConditionResult',
+                       'ConditionTimestampMonotonic')
+    # Properties of the unit type interface, e.g. org.freedesktop.systemd1.Service
+    TYPE_PROPERTIES = ('Type', 'Result')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._units = {}
+        self._unit_paths = {}
+        self._path_units = {}
+        self._bus = None
+        self._schedule = None
+        self._ready = False
+        self._requested = set()
+
+    def is_ready(self):
+        return self._ready
+
+    #Loads all service units and subscribes to property changes.
+    #schedule(func, *args) runs func in the system bus thread, e.g. GLib.idle_add
+    def attach(self, bus, schedule):
+        self._bus = bus
+        self._schedule = schedule
+        manager = bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_OBJECT_PATH)
+        units = manager.ListUnits(dbus_interface=SYSTEMD_MANAGER_INTERFACE)
+        for unit in units:
+            name, path = str(unit[0]), str(unit[6])
+            if name.endswith('.service'):
+                self._load(name, path)
+
+        bus.add_signal_receiver(self.on_properties_changed, signal_name='PropertiesChanged',
+                                dbus_interface=DBUS_PROPERTIES_INTERFACE, bus_name=SYSTEMD_BUS_NAME,
+                                path_keyword='path')
+        bus.add_signal_receiver(self.on_reloading, signal_name='Reloading',
+                                dbus_interface=SYSTEMD_MANAGER_INTERFACE, bus_name=SYSTEMD_BUS_NAME)
+        bus.add_signal_receiver(self.refresh_all, signal_name='UnitFilesChanged',
+                                dbus_interface=SYSTEMD_MANAGER_INTERFACE, bus_name=SYSTEMD_BUS_NAME)
+        self._ready = True
+
+    #Returns the unit properties like run_systemctl_show, or None if the unit is not cached
+    def get(self, unit):
+        with self._lock:
+            props = self._units.get(unit)
+            return dict(props) if props is not None else None
+
+    #Asks the system bus thread to load a unit that is not cached yet
+    def request(self, unit):
+        if not self.is_ready():
+            return
+        with self._lock:
+            if unit in self._requested:
+                return
+            self._requested.add(unit)
+        self._schedule(self._load_requested, unit)
+
+    def _load_requested(self, unit):
+        try:
+            manager = self._bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_OBJECT_PATH)
+            path = str(manager.LoadUnit(unit, dbus_interface=SYSTEMD_MANAGER_INTERFACE))
+            self._load(unit, path)
+        except Exception as e:
+            logger.log_warning("Failed to load properties of {}: {}".format(unit, str(e)))
+        with self._lock:
+            self._requested.discard(unit)
+        # Do not repeat as a GLib idle callback
+        return False
+
+    def _load(self, unit, path):
+        props = self._get_properties(self._bus.get_object(SYSTEMD_BUS_NAME, path), unit)
+        with self._lock:
+            self._units[unit] = props
+            self._unit_paths[unit] = path
+            self._path_units[path] = unit
+
+    def _get_properties(self, obj, unit):
+        props = {}
+        values = obj.GetAll(SYSTEMD_UNIT_INTERFACE, dbus_interface=DBUS_PROPERTIES_INTERFACE)
+        for name in self.UNIT_PROPERTIES:
+            if name in values:
+                props[name] = self._format(values[name])
+        type_interface = '{}.{}'.format(SYSTEMD_BUS_NAME, unit.rsplit('.', 1)[-1].capitalize())
+        try:
+            values = obj.GetAll(type_interface, dbus_interface=DBUS_PROPERTIES_INTERFACE)
+        except Exception:
+            # Unit types such as target have no interface of their own
+            values = {}
+        for name in self.TYPE_PROPERTIES:
+            if name in values:
+                props[name] = self._format(values[name])
+        return props
+
+    #Formats a D-Bus value the way systemctl show prints it
+    @staticmethod
+    def _format(value):
+        if isinstance(value, bool) or type(value).__name__ == 'Boolean':
+            return 'yes' if value else 'no'
+        return str(value)
+
+    #Reloads the properties of a cached unit
+    def refresh(self, unit):
+        with self._lock:
+            path = self._unit_paths.get(unit)
+        if path is None:
+            return
+        try:
+            self._load(unit, path)
+        except Exception as e:
+            logger.log_warning("Failed to refresh properties of {}: {}".format(unit, str(e)))
+
+    def refresh_all(self, *args):
+        with self._lock:
+            units = list(self._units)
+        for unit in units:
+            self.refresh(unit)
+
+    def on_reloading(self, active):
+        # Unit files may have changed once the daemon reload is done
+        if not active:
+            self.refresh_all()
+
+    def on_properties_changed(self, interface, changed, invalidated, path=None):
+        with self._lock:
+            unit = self._path_units.get(str(path))
+            if unit is None:
+                return
+            props = self._units[unit]
+            for name in self.UNIT_PROPERTIES + self.TYPE_PROPERTIES:
+                if name in changed:
+                    props[name] = self._format(changed[name])
+        if any(name in invalidated for name in self.UNIT_PROPERTIES + self.TYPE_PROPERTIES):
+            self.refresh(unit)
+
 #Thread which subscribes to STATE_DB FEATURE table for any update
 #and push service events to main thread via queue
 class MonitorStateDbTask(ThreadTaskBase):
@@ -80,15 +224,19 @@ class MonitorStateDbTask(ThreadTaskBase):
 #and push service events to main thread via queue
 class MonitorSystemBusTask(ThreadTaskBase):
 
-    def __init__(self, myQ, subscription_ready=None):
+    def __init__(self, myQ, subscription_ready=None, unit_cache=None):
         ThreadTaskBase.__init__(self)
         self.task_queue = myQ
         self.loop = None
         self.GLib = None
         self._subscription_ready = subscription_ready
+        self.unit_cache = unit_cache
 
     def on_job_removed(self, id, job, unit, result):
         if result == "done" or result == "failed":
+            #Refresh before the event is handled, signals may not cover all properties
+            if self.unit_cache is not None:
+                self.unit_cache.refresh(str(unit))
             timestamp = "{}".format(datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"))
             msg = {"unit": unit, "evt_src":"sysbus", "time":timestamp}
             self.task_notify(msg)
@@ -107,6 +255,11 @@ class MonitorSystemBusTask(ThreadTaskBase):
         manager = dbus.Interface(systemd, 'org.freedesktop.systemd1.Manager')
         manager.Subscribe()
         manager.connect_to_signal('JobRemoved', self.on_job_removed)
+        if self.unit_cache is not None:
+            try:
+                self.unit_cache.attach(bus, GLib.idle_add)
+            except Exception as e:
+                logger.log_error("Failed to load unit properties from systemd, using systemctl: {}".format(str(e)))
         if self._subscription_ready is not None:
             self._subscription_ready.set()
 
@@ -150,6 +303,7 @@ class Sysmonitor(ThreadTaskBase):
         self.config_db = None
         self.config = Config()
         self.myQ = queue.Queue()
+        self.unit_cache = UnitPropertyCache()
 
     #Sets system ready status to state db
     def post_system_status(self, state):
@@ -325,6 +479,15 @@ class Sysmonitor(ThreadTaskBase):
 
         return prop_dict
 
+    #Gets the service properties from the unit cache, or from systemctl if the unit is not cached
+    def get_unit_properties(self, service):
+        prop_dict = self.unit_cache.get(service)
+        if prop_dict is not None:
+            return prop_dict
+
+        self.unit_cache.request(service)
+        return self.run_systemctl_show(service)
+
     #Sets the service status to state db
     def post_unit_status(self, srv_name, srv_status, app_status, fail_reason, update_time):
         if not self.state_db:
@@ -351,7 +514,7 @@ class Sysmonitor(ThreadTaskBase):
             service_up_status = "Down"
             service_name,last_name = event.rsplit('.', 1)
 
-            sysctl_show = self.run_systemctl_show(event)
+            sysctl_show = self.get_unit_properties(event)
 
             load_state = sysctl_show.get('LoadState')
             if load_state == "loaded":
@@ -557,7 +720,8 @@ class Sysmonitor(ThreadTaskBase):
         statedb_ready = threading.Event()
 
         try:
-            monitor_system_bus = MonitorSystemBusTask(self.myQ, subscription_ready=dbus_ready)
+            monitor_system_bus = MonitorSystemBusTask(self.myQ, subscription_ready=dbus_ready,
+                                                      unit_cache=self.unit_cache)
             monitor_system_bus.task_run()
             monitor_statedb_table = MonitorStateDbTask(self.myQ, subscription_ready=statedb_ready)
             monitor_statedb_table.task_run()
@@ -44,7 +44,9 @@ class UserDefinedChecker(HealthChecker):
         """
         self.reset()
 
-        output = utils.run_command(self._cmd)
+        # Kill the command when the manager stops waiting for it
+        timeout = config.get_checker_timeout(self) if config else None
+        output = utils.run_command(self._cmd, timeout=timeout)
         if not output:
             self.set_object_not_ok('UserDefine', str(self), 'Failed to get output of command \"{}\"'.format(self._cmd))
             return
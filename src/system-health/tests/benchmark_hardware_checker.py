@@ -0,0 +1,100 @@
+"""
+Benchmark of a HardwareChecker check cycle: STATE_DB read with KEYS and one request per key, against the STATE_DB
+snapshot read with SCAN and pipelined HGETALL, and the snapshot refreshed from keyspace notifications.
+
+Usage (from src/system-health):
+    python -m tests.benchmark_hardware_checker [--fans N] [--psus N] [--changes N] [--latency MS] [--iterations N]
+
+STATE_DB is replaced by a mocked redis client, every round trip to it takes --latency milliseconds. --changes
+fans are updated before each cycle.
+"""
+import argparse
+import time
+from unittest import mock
+
+from health_checker import hardware_checker
+from health_checker.config import Config
+from health_checker.state_db_snapshot import StateDbSnapshot
+
+from .mock_redis import MockRedis
+
+
+class MockRedisConnector(object):
+    """
+    SonicV2Connector over a mocked redis client, without the database configuration needed for the redis-py client.
+    """
+    STATE_DB = 'STATE_DB'
+    client = None
+
+    def __init__(self, use_unix_socket_path=True):
+        pass
+
+    def connect(self, db_name):
+        pass
+
+    def keys(self, db_name, pattern):
+        return MockRedisConnector.client.keys(pattern)
+
+    def get(self, db_name, key, field):
+        return MockRedisConnector.client.hget(key, field)
+
+    def get_all(self, db_name, key):
+        return MockRedisConnector.client.hgetall(key)
+
+
+def measure(checker, config, client, args):
+    client.call_count = 0
+    elapsed = 0
+    for iteration in range(args.iterations):
+        for idx in range(args.changes):
+            client.hset('FAN_INFO|fan{}'.format(idx + 1), mapping={'speed': str(60 + iteration % 2)})
+        start = time.monotonic()
+        checker.check(config)
+        elapsed += time.monotonic() - start
+        assert len(checker._info) == args.fans + args.psus + 1
+    return elapsed / args.iterations, client.call_count / args.iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HardwareChecker STATE_DB snapshot benchmark')
+    parser.add_argument('--fans', type=int, default=32, help='number of fans')
+    parser.add_argument('--psus', type=int, default=4, help='number of PSUs')
+    parser.add_argument('--changes', type=int, default=2, help='number of fans updated before each cycle')
+    parser.add_argument('--latency', type=float, default=0.1, help='time of a STATE_DB round trip in milliseconds')
+    parser.add_argument('--iterations', type=int, default=20, help='number of check cycles per mode')
+    args = parser.parse_args()
+
+    client = MockRedis(latency=args.latency / 1e3)
+    client.hset('TEMPERATURE_INFO|ASIC', mapping={'temperature': '20', 'high_threshold': '100'})
+    for idx in range(args.fans):
+        client.hset('FAN_INFO|fan{}'.format(idx + 1), mapping={
+            'presence': 'True', 'status': 'True', 'speed': '60', 'speed_target': '60',
+            'is_under_speed': 'False', 'is_over_speed': 'False', 'direction': 'intake'})
+    for idx in range(args.psus):
+        client.hset('PSU_INFO|PSU {}'.format(idx + 1), mapping={
+            'presence': 'True', 'status': 'True', 'temp': '40', 'temp_threshold': '100',
+            'voltage': '12', 'voltage_min_threshold': '11', 'voltage_max_threshold': '13'})
+    MockRedisConnector.client = client
+
+    config = Config()
+    with mock.patch.object(hardware_checker, 'SonicV2Connector', MockRedisConnector):
+        checker = hardware_checker.HardwareChecker()
+    per_key, per_key_calls = measure(checker, config, client, args)
+
+    checker._snapshot = StateDbSnapshot(checker._db, hardware_checker.HardwareChecker.SNAPSHOT_PATTERNS,
+                                        client=client)
+    pipelined, pipelined_calls = measure(checker, config, client, args)
+
+    config.hardware_keyspace_notifications = True
+    checker.check(config)
+    notified, notified_calls = measure(checker, config, client, args)
+    checker._snapshot.close()
+
+    print('keys              %d' % len(client.data))
+    print('per key reads     %.2f ms per cycle, %.1f round trips' % (per_key * 1e3, per_key_calls))
+    print('snapshot          %.2f ms per cycle, %.1f round trips' % (pipelined * 1e3, pipelined_calls))
+    print('notifications     %.2f ms per cycle, %.1f round trips' % (notified * 1e3, notified_calls))
+
+
+if __name__ == '__main__':
+    main()
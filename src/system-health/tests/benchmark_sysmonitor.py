@@ -0,0 +1,71 @@
+"""Benchmark of the Sysmonitor system ready computation: unit properties read with
+one `systemctl show` per unit, against the D-Bus unit property cache.
+
+Usage (from src/system-health):
+    python -m tests.benchmark_sysmonitor [--units N] [--iterations N]
+
+systemd is replaced by a mocked bus. In the systemctl pass, every unit still
+starts a process that prints the unit properties, so the process creation cost
+is measured. STATE_DB writes and FEATURE table reads are not measured.
+"""
+import argparse
+import time
+from unittest import mock
+
+from health_checker import sysmonitor, utils
+
+from .mock_systemd_bus import MockSystemdBus
+
+SYSTEMCTL_SHOW_OUTPUT = ('Id={}\nLoadState=loaded\nUnitFileState=enabled\nType=simple\nActiveState=active\n'
+                         'SubState=running\nResult=success\nConditionResult=yes\nConditionTimestampMonotonic=1000\n')
+
+# utils.run_command is patched while measuring
+run_command = utils.run_command
+
+
+def fake_systemctl_show(command):
+    unit = command.split()[2]
+    return run_command("printf '{}'".format(SYSTEMCTL_SHOW_OUTPUT.format(unit).replace('\n', '\\n')))
+
+
+def measure(sysmon, iterations):
+    start = time.monotonic()
+    for _ in range(iterations):
+        state = sysmon.get_all_system_status()
+        assert state == 'UP' and not sysmon.dnsrvs_name
+    return (time.monotonic() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sysmonitor unit property cache benchmark')
+    parser.add_argument('--units', type=int, default=100, help='number of monitored units')
+    parser.add_argument('--iterations', type=int, default=10, help='number of system ready computations per mode')
+    args = parser.parse_args()
+
+    units = ['mock_service{}.service'.format(idx) for idx in range(args.units)]
+    bus = MockSystemdBus()
+    for unit in units:
+        bus.add_unit(unit)
+
+    with mock.patch.object(sysmonitor.Sysmonitor, 'get_all_service_list', return_value=units), \
+            mock.patch.object(sysmonitor.Sysmonitor, 'get_app_ready_status', return_value=('Up', '-', '-')), \
+            mock.patch.object(sysmonitor.Sysmonitor, 'post_unit_status'), \
+            mock.patch.object(sysmonitor.utils, 'run_command', side_effect=fake_systemctl_show):
+        sysmon = sysmonitor.Sysmonitor()
+        systemctl = measure(sysmon, args.iterations)
+
+        start = time.monotonic()
+        sysmon.unit_cache.attach(bus, lambda func, *func_args: func(*func_args))
+        attach = time.monotonic() - start
+        attach_calls = bus.call_count
+        cached = measure(sysmon, args.iterations)
+        assert bus.call_count == attach_calls
+
+    print('units             %d' % args.units)
+    print('systemctl show    %.2f ms per computation' % (systemctl * 1e3))
+    print('cache attach      %.2f ms, %d D-Bus calls' % (attach * 1e3, attach_calls))
+    print('unit cache        %.2f ms per computation, no D-Bus calls' % (cached * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import socketserver
+import threading
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCDispatcher
+
+
+class UnixXMLRPCRequestHandler(SimpleXMLRPCRequestHandler):
+    # TCP_NODELAY is not supported on unix socket
+    disable_nagle_algorithm = False
+
+
+class UnixXMLRPCServer(socketserver.UnixStreamServer, SimpleXMLRPCDispatcher):
+    def __init__(self, socket_path):
+        SimpleXMLRPCDispatcher.__init__(self, allow_none=True)
+        socketserver.UnixStreamServer.__init__(self, socket_path, UnixXMLRPCRequestHandler)
+        # Unix socket has no client address, avoid logging requests
+        self.logRequests = False
+
+
+class FakeSupervisord(object):
+    """
+    A supervisord that serves supervisor.getAllProcessInfo on a unix socket.
+    """
+    def __init__(self, socket_path, processes):
+        """
+        Constructor.
+        :param socket_path: Path of the unix socket.
+        :param processes: A list of (group, name, statename).
+        """
+        self.socket_path = socket_path
+        self.processes = processes
+        self.call_count = 0
+        os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+        self._server = UnixXMLRPCServer(socket_path)
+        self._server.register_function(self.get_all_process_info, 'supervisor.getAllProcessInfo')
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def get_all_process_info(self):
+        self.call_count += 1
+        return [{'group': group, 'name': name, 'statename': statename, 'pid': 0}
+                for group, name, statename in self.processes]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+        os.remove(self.socket_path)
@@ -34,3 +34,6 @@ class MockConnector(object):
         self.data[key] = {}
         for field,value in fieldsvalues.items():
             self.data[key][field] = value
+
+    def delete(self, db_id, key):
+        self.data.pop(key, None)
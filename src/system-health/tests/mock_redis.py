@@ -0,0 +1,102 @@
+import fnmatch
+import time
+from types import SimpleNamespace
+
+
+class MockPubSub(object):
+    def __init__(self, client):
+        self.client = client
+        self.patterns = []
+        self.messages = []
+
+    def psubscribe(self, *patterns):
+        self.client.round_trip()
+        self.patterns.extend(patterns)
+        self.client.pubsubs.append(self)
+
+    def get_message(self):
+        return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        if self in self.client.pubsubs:
+            self.client.pubsubs.remove(self)
+
+
+class MockPipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def hgetall(self, key):
+        self.commands.append(key)
+
+    def execute(self):
+        self.client.round_trip()
+        return [dict(self.client.data.get(key, {})) for key in self.commands]
+
+
+class MockRedis(object):
+    """
+    A redis-py client of one database with hashes, SCAN, pipelines and keyspace notifications. call_count is the
+    number of round trips to the database, each one takes latency seconds.
+    """
+    def __init__(self, db=6, notify_keyspace_events='AKE', latency=0):
+        self.data = {}
+        self.pubsubs = []
+        self.call_count = 0
+        self.latency = latency
+        self.notify_keyspace_events = notify_keyspace_events
+        self.connection_pool = SimpleNamespace(connection_kwargs={'db': db})
+
+    def round_trip(self):
+        self.call_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def scan_iter(self, match='*', count=10):
+        keys = [key for key in self.data if fnmatch.fnmatchcase(key, match)]
+        # One SCAN call for every count keys, and the last call that returns cursor 0
+        for _ in range(len(self.data) // count + 1):
+            self.round_trip()
+        return iter(keys)
+
+    def keys(self, pattern):
+        self.round_trip()
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    def hgetall(self, key):
+        self.round_trip()
+        return dict(self.data.get(key, {}))
+
+    def hget(self, key, field):
+        self.round_trip()
+        return self.data.get(key, {}).get(field)
+
+    def pipeline(self, transaction=True):
+        return MockPipeline(self)
+
+    def config_get(self, pattern):
+        self.round_trip()
+        return {'notify-keyspace-events': self.notify_keyspace_events}
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return MockPubSub(self)
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+        self._notify(key, 'hset')
+
+    def delete(self, key):
+        if self.data.pop(key, None) is not None:
+            self._notify(key, 'del')
+
+    def _notify(self, key, event):
+        if 'K' not in self.notify_keyspace_events:
+            return
+        channel = '__keyspace@{}__:{}'.format(self.connection_pool.connection_kwargs['db'], key)
+        for pubsub in self.pubsubs:
+            for pattern in pubsub.patterns:
+                if fnmatch.fnmatchcase(channel, pattern):
+                    pubsub.messages.append({'type': 'pmessage', 'pattern': pattern, 'channel': channel,
+                                            'data': event})
+                    break
@@ -0,0 +1,66 @@
+class MockSystemdObject(object):
+    def __init__(self, bus, path):
+        self.bus = bus
+        self.path = path
+
+    def ListUnits(self, dbus_interface=None):
+        self.bus.call_count += 1
+        return [(name, '', unit['Unit']['LoadState'], unit['Unit']['ActiveState'], unit['Unit']['SubState'], '',
+                 unit['path'], 0, '', '/') for name, unit in self.bus.units.items()
+                if unit['Unit']['LoadState'] == 'loaded']
+
+    def LoadUnit(self, name, dbus_interface=None):
+        self.bus.call_count += 1
+        return self.bus.units[name]['path']
+
+    def GetAll(self, interface, dbus_interface=None):
+        self.bus.call_count += 1
+        unit = self.bus.get_unit(self.path)
+        if interface.rsplit('.', 1)[-1] not in unit:
+            raise RuntimeError('Unknown interface {}'.format(interface))
+        return dict(unit[interface.rsplit('.', 1)[-1]])
+
+
+class MockSystemdBus(object):
+    """
+    A system bus with a systemd manager and units. Units are added with add_unit and changed with set_properties,
+    which emits PropertiesChanged like systemd.
+    """
+    def __init__(self):
+        self.units = {}
+        self.receivers = {}
+        self.call_count = 0
+
+    def add_unit(self, name, load_state='loaded', unit_file_state='enabled', active_state='active',
+                 sub_state='running', service_type='simple', result='success'):
+        path = '/org/freedesktop/systemd1/unit/{}'.format(name.replace('.', '_2e').replace('-', '_2d'))
+        self.units[name] = {
+            'path': path,
+            'Unit': {
+                'Id': name,
+                'LoadState': load_state,
+                'UnitFileState': unit_file_state,
+                'ActiveState': active_state,
+                'SubState': sub_state,
+                'ConditionResult': True,
+                'ConditionTimestampMonotonic': 1000
+            },
+            'Service': {
+                'Type': service_type,
+                'Result': result
+            }
+        }
+
+    def get_unit(self, path):
+        return next(unit for unit in self.units.values() if unit['path'] == path)
+
+    def set_properties(self, name, interface='Unit', **changed):
+        self.units[name][interface].update(changed)
+        for handler in self.receivers.get('PropertiesChanged', []):
+            handler('org.freedesktop.systemd1.' + interface, changed, [], path=self.units[name]['path'])
+
+    def get_object(self, bus_name, path):
+        return MockSystemdObject(self, path)
+
+    def add_signal_receiver(self, handler, signal_name=None, **kwargs):
+        self.receivers.setdefault(signal_name, []).append(handler)
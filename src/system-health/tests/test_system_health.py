@@ -10,8 +10,10 @@
         3. Config
 """
 import copy
+import json
 import os
 import sys
+import threading
 import docker
 import importlib.util
 import importlib.machinery
@@ -20,7 +22,10 @@ from swsscommon import swsscommon
 from mock import Mock, MagicMock, patch, call
 from sonic_py_common import device_info, multi_asic
 
+from .fake_supervisord import FakeSupervisord
 from .mock_connector import MockConnector
+from .mock_redis import MockRedis
+from .mock_systemd_bus import MockSystemdBus
 
 swsscommon.SonicV2Connector = MockConnector
 swsscommon.RestartWaiter = MagicMock()
@@ -32,16 +37,19 @@ modules_path = os.path.dirname(test_path)
 scripts_path = os.path.join(modules_path, 'scripts')
 sys.path.insert(0, modules_path)
 sys.path.insert(0, scripts_path)
-from health_checker import utils
+from health_checker import supervisor_client, utils
 from health_checker.config import Config
+from health_checker.container_state import ContainerStateCache
 from health_checker.hardware_checker import HardwareChecker
 from health_checker.health_checker import HealthChecker
 from health_checker.manager import HealthCheckerManager
-from health_checker.service_checker import ServiceChecker
+from health_checker.service_checker import ServiceChecker, resolve_container_path
+from health_checker.state_db_snapshot import StateDbSnapshot
 from health_checker.user_defined_checker import UserDefinedChecker
 from health_checker.sysmonitor import Sysmonitor
 from health_checker.sysmonitor import MonitorStateDbTask
 from health_checker.sysmonitor import MonitorSystemBusTask
+from health_checker.sysmonitor import UnitPropertyCache
 from health_checker import sysmonitor as sysmonitor_module
 
 def load_source(modname, filename):
@@ -197,6 +205,210 @@ def test_service_checker_single_asic(mock_config_db, mock_run, mock_docker_clien
     assert origin_container_critical_processes == checker.container_critical_processes
 
 
+def test_supervisor_client(tmp_path):
+    processes = [('snmpd', 'snmpd', 'RUNNING'), ('dhcp-relay', 'dhcp6relay', 'EXITED')]
+    socket_path = str(tmp_path / 'supervisor.sock')
+    with FakeSupervisord(socket_path, processes):
+        assert supervisor_client.get_process_status(socket_path) == {
+            'snmpd': 'RUNNING',
+            'dhcp-relay:dhcp6relay': 'EXITED'
+        }
+
+        result = supervisor_client.get_all_process_status({'snmp': socket_path,
+                                                           'stopped': str(tmp_path / 'missing.sock')})
+        assert result['snmp']['snmpd'] == 'RUNNING'
+        assert isinstance(result['stopped'], Exception)
+
+    assert supervisor_client.get_all_process_status({}) == {}
+
+
+def test_resolve_container_path(tmp_path):
+    (tmp_path / 'run').mkdir()
+    (tmp_path / 'var').mkdir()
+    (tmp_path / 'var' / 'run').symlink_to('/run')
+    (tmp_path / 'var' / 'lock').symlink_to('../run/lock')
+    (tmp_path / 'loop').symlink_to('loop')
+    assert resolve_container_path(str(tmp_path), 'var/run/supervisor.sock') == str(tmp_path / 'run' / 'supervisor.sock')
+    assert resolve_container_path(str(tmp_path), '/var/lock/file') == str(tmp_path / 'run' / 'lock' / 'file')
+    assert resolve_container_path(str(tmp_path), '../../etc/passwd') == str(tmp_path / 'etc' / 'passwd')
+    assert resolve_container_path(str(tmp_path), 'loop/file') is None
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
+@patch('docker.DockerClient')
+@patch('health_checker.utils.run_command')
+@patch('swsscommon.swsscommon.ConfigDBConnector')
+def test_service_checker_supervisord_socket(mock_config_db, mock_run, mock_docker_client, tmp_path):
+    """Verify that process status is read from supervisord sockets and the docker client is reused."""
+    setup()
+    mock_config_db.return_value.get_table.return_value = {
+        'snmp': {'state': 'enabled', 'has_global_scope': 'True', 'has_per_asic_scope': 'False'},
+        'dhcp_relay': {'state': 'enabled', 'has_global_scope': 'True', 'has_per_asic_scope': 'False'}
+    }
+    containers = []
+    for name, source in [('snmp', test_path), ('dhcp_relay', dhcp_relay_path)]:
+        merged_dir = tmp_path / name
+        (merged_dir / 'etc' / 'supervisor').mkdir(parents=True)
+        with open(os.path.join(source, ServiceChecker.CRITICAL_PROCESSES_PATH)) as f:
+            (merged_dir / ServiceChecker.CRITICAL_PROCESSES_PATH).write_text(f.read())
+        container = MagicMock(labels={}, attrs={'GraphDriver': {'Data': {'MergedDir': str(merged_dir)}}})
+        container.name = name
+        containers.append(container)
+    mock_docker_client.return_value.containers.list.return_value = containers
+    mock_run.return_value = None
+
+    # /var/run of snmp is an absolute link to /run, like in the docker images
+    (tmp_path / 'snmp' / 'var').mkdir()
+    (tmp_path / 'snmp' / 'var' / 'run').symlink_to('/run')
+    snmp = FakeSupervisord(str(tmp_path / 'snmp' / 'run' / 'supervisor.sock'),
+                           [('snmpd', 'snmpd', 'RUNNING'), ('snmp-subagent', 'snmp-subagent', 'EXITED')])
+    dhcp_relay = FakeSupervisord(str(tmp_path / 'dhcp_relay' / ServiceChecker.SUPERVISOR_SOCKET_PATH),
+                                 [('dhcp-relay', 'dhcprelayd', 'RUNNING'), ('dhcp-relay', 'dhcp6relay', 'RUNNING')])
+    with snmp, dhcp_relay:
+        checker = ServiceChecker()
+        checker.check(Config())
+        checker.check(Config())
+
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert checker._info['snmp:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['dhcp_relay:dhcp-relay:dhcp6relay'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    # One query per container and cycle, plus the group expansion of dhcp_relay
+    assert snmp.call_count == 2
+    assert dhcp_relay.call_count == 3
+    assert mock_docker_client.call_count == 1
+    for args, _ in mock_run.call_args_list:
+        assert 'docker exec' not in args[0]
+        assert 'docker inspect' not in args[0]
+
+
+def container_attrs(name, status='running', labels=None, merged_dir=''):
+    return {
+        'Id': name * 12,
+        'Name': '/' + name,
+        'State': {'Status': status, 'OOMKilled': False, 'ExitCode': 0},
+        'Config': {'Image': 'docker-' + name + ':latest', 'Labels': labels or {}},
+        'GraphDriver': {'Data': {'MergedDir': merged_dir}}
+    }
+
+
+class FakeEventStream(object):
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+def fake_docker_container(name, attrs):
+    container = MagicMock(attrs=attrs)
+    container.name = name
+    return container
+
+
+def fake_docker_client(containers):
+    client = MagicMock()
+    client.containers.list.side_effect = lambda all=False: [fake_docker_container(name, attrs)
+                                                            for name, attrs in containers.items()]
+    client.api.inspect_container.side_effect = lambda container_id: next(
+        attrs for attrs in containers.values() if attrs['Id'] == container_id)
+    return client
+
+
+@patch('docker.DockerClient')
+def test_container_state_cache(mock_docker_client):
+    MockConnector.data.clear()
+    containers = {'snmp': container_attrs('snmp', merged_dir='/merged/snmp'),
+                  'lldp': container_attrs('lldp', status='exited')}
+    client = fake_docker_client(containers)
+    mock_docker_client.return_value = client
+
+    cache = ContainerStateCache()
+    client.events.return_value = FakeEventStream([])
+    cache._follow()
+    assert cache.is_synced()
+    assert cache.sync_count == 1
+    assert set(cache.get_containers()) == {'snmp', 'lldp'}
+    assert list(cache.get_running_containers()) == ['snmp']
+    assert cache.get_running_containers()['snmp']['merged_dir'] == '/merged/snmp'
+    assert MockConnector.data['CONTAINER_STATE_CACHE']['synced'] == 'true'
+    assert MockConnector.data['CONTAINER_STATE|snmp']['status'] == 'running'
+
+    # Only containers with events are inspected, no resync while in sync
+    containers['lldp']['State']['Status'] = 'running'
+    containers['snmp']['State'].update({'Status': 'exited', 'OOMKilled': True})
+    client.events.return_value = FakeEventStream([
+        {'Type': 'container', 'Action': 'start', 'Actor': {'ID': containers['lldp']['Id'], 'Attributes': {'name': 'lldp'}}},
+        {'Type': 'container', 'Action': 'oom', 'Actor': {'ID': containers['snmp']['Id'], 'Attributes': {'name': 'snmp'}}},
+        {'Type': 'container', 'Action': 'die', 'Actor': {'ID': containers['snmp']['Id'], 'Attributes': {'name': 'snmp'}}}
+    ])
+    cache._follow()
+    assert cache.sync_count == 1
+    assert client.api.inspect_container.call_count == 3
+    assert list(cache.get_running_containers()) == ['lldp']
+    assert cache.get_containers()['snmp']['oom_killed'] == 'true'
+    assert MockConnector.data['CONTAINER_STATE|lldp']['status'] == 'running'
+    assert MockConnector.data['CONTAINER_STATE|snmp']['status'] == 'exited'
+
+    client.events.return_value = FakeEventStream([
+        {'Type': 'container', 'Action': 'destroy', 'Actor': {'ID': containers['snmp']['Id'], 'Attributes': {'name': 'snmp'}}}
+    ])
+    cache._follow()
+    assert set(cache.get_containers()) == {'lldp'}
+    assert 'CONTAINER_STATE|snmp' not in MockConnector.data
+
+    # Image lookups are cached until an image event
+    assert cache.image_exists('docker-sonic-telemetry')
+    assert cache.image_exists('docker-sonic-telemetry')
+    assert client.images.get.call_count == 1
+    client.events.return_value = FakeEventStream([{'Type': 'image', 'Action': 'delete'}])
+    cache._follow()
+    client.images.get.side_effect = docker.errors.ImageNotFound('not found')
+    assert not cache.image_exists('docker-sonic-telemetry')
+
+    # A broken stream marks the cache not in sync, it is synced again on reconnection
+    client.events.return_value = FakeEventStream([docker.errors.APIError('stream lost')])
+    with patch.object(cache, '_stop_event') as mock_stop_event:
+        mock_stop_event.is_set.side_effect = [False, False, False, False, True]
+        cache._run()
+    assert cache.sync_count == 2
+    assert MockConnector.data['CONTAINER_STATE_CACHE']['synced'] == 'false'
+    client.events.return_value = FakeEventStream([])
+    cache._follow()
+    assert cache.sync_count == 3
+    assert cache.is_synced()
+
+
+@patch('health_checker.service_checker.check_docker_image', MagicMock(side_effect=AssertionError('docker queried')))
+@patch('docker.DockerClient', MagicMock(side_effect=AssertionError('docker queried')))
+def test_service_checker_container_state():
+    container_state = MagicMock()
+    container_state.is_synced.return_value = True
+    container_state.image_exists.return_value = False
+    container_state.get_running_containers.return_value = {
+        'snmp': {'k8s_namespace': '', 'merged_dir': test_path},
+        'k8s_pod': {'k8s_namespace': 'sonic', 'merged_dir': ''},
+        'telemetry': {'k8s_namespace': '', 'merged_dir': ''}
+    }
+    checker = ServiceChecker(container_state)
+    assert checker.get_current_running_containers() == {'snmp'}
+    assert checker.container_folders == {'snmp': test_path}
+    assert checker.container_critical_processes['snmp'] == ['snmpd', 'snmp-subagent']
+
+    with patch('sonic_py_common.multi_asic.get_asic_presence_list', MagicMock(return_value=[])), \
+            patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False)):
+        expected, _ = checker.get_expected_running_containers({'otel': {'state': 'enabled'}})
+    assert not expected
+    container_state.image_exists.assert_called_once_with('docker-sonic-otel')
+
+
 @patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
 @patch('health_checker.service_checker.ServiceChecker._get_container_folder', MagicMock(return_value=dhcp_relay_path))
 @patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
@@ -937,6 +1149,111 @@ def test_hardware_checker_psu_ignore_skips_psu_but_checks_pdb():
     assert checker._info['PDB 1'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
 
+def test_state_db_snapshot():
+    client = MockRedis()
+    client.hset('FAN_INFO|fan1', mapping={'presence': 'True', 'status': 'True'})
+    client.hset('FAN_INFO|fan2', mapping={'presence': 'True', 'status': 'False'})
+    client.hset('PSU_INFO|PSU 1', mapping={'presence': 'True'})
+    client.hset('TEMPERATURE_INFO|ASIC', mapping={'temperature': '20'})
+    snapshot = StateDbSnapshot(MockConnector(use_unix_socket_path=True), ['FAN_INFO*', 'PSU_INFO*'], client=client)
+
+    # Full load: one SCAN per pattern and one pipeline
+    snapshot.refresh()
+    assert client.call_count == 3
+    assert sorted(snapshot.keys('FAN_INFO*')) == ['FAN_INFO|fan1', 'FAN_INFO|fan2']
+    assert snapshot.keys('PSU_INFO*') == ['PSU_INFO|PSU 1']
+    assert snapshot.keys('TEMPERATURE_INFO*') == []
+    assert snapshot.get('FAN_INFO|fan2', 'status') == 'False'
+    assert snapshot.get('FAN_INFO|fan3', 'status') is None
+    assert snapshot.get_all('FAN_INFO|fan3') == {}
+
+    # Without notifications every refresh is a full load
+    client.hset('FAN_INFO|fan2', mapping={'status': 'True'})
+    snapshot.refresh()
+    assert snapshot.get('FAN_INFO|fan2', 'status') == 'True'
+    assert snapshot.full_load_count == 2
+
+    # Notification mode reads only the changed keys
+    snapshot.use_notifications = True
+    snapshot.refresh()
+    assert snapshot.full_load_count == 3
+    call_count = client.call_count
+    snapshot.refresh()
+    assert client.call_count == call_count
+    client.hset('FAN_INFO|fan1', mapping={'status': 'False'})
+    client.hset('PSU_INFO|PSU 2', mapping={'presence': 'False'})
+    client.delete('PSU_INFO|PSU 1')
+    client.hset('TEMPERATURE_INFO|ASIC', mapping={'temperature': '30'})
+    read_key_count = snapshot.read_key_count
+    snapshot.refresh()
+    assert client.call_count == call_count + 1
+    assert snapshot.read_key_count == read_key_count + 3
+    assert snapshot.full_load_count == 3
+    assert snapshot.get('FAN_INFO|fan1', 'status') == 'False'
+    assert snapshot.keys('PSU_INFO*') == ['PSU_INFO|PSU 2']
+
+    # Leaving notification mode unsubscribes
+    snapshot.use_notifications = False
+    snapshot.refresh()
+    assert not client.pubsubs
+    assert snapshot.full_load_count == 4
+
+    # Any client error falls back to the connector
+    MockConnector.data.clear()
+    MockConnector.data.update({'FAN_INFO|fan9': {'presence': 'False'}})
+    with patch.object(client, 'scan_iter', side_effect=ConnectionError):
+        snapshot.refresh()
+    assert snapshot.keys('FAN_INFO*') == ['FAN_INFO|fan9']
+    assert snapshot.keys('PSU_INFO*') == []
+
+
+def test_state_db_snapshot_notifications_disabled():
+    client = MockRedis(notify_keyspace_events='')
+    client.hset('FAN_INFO|fan1', mapping={'presence': 'True'})
+    snapshot = StateDbSnapshot(MockConnector(use_unix_socket_path=True), ['FAN_INFO*'], client=client)
+    snapshot.use_notifications = True
+    snapshot.refresh()
+    client.hset('FAN_INFO|fan1', mapping={'presence': 'False'})
+    snapshot.refresh()
+    assert not client.pubsubs
+    assert snapshot.full_load_count == 2
+    assert snapshot.get('FAN_INFO|fan1', 'presence') == 'False'
+
+
+def test_hardware_checker_snapshot():
+    client = MockRedis()
+    client.hset('TEMPERATURE_INFO|ASIC', mapping={'temperature': '20', 'high_threshold': '21'})
+    for idx in range(1, 9):
+        client.hset('FAN_INFO|fan{}'.format(idx), mapping={
+            'presence': 'True', 'status': 'True', 'speed': '60', 'speed_target': '60',
+            'is_under_speed': 'False', 'is_over_speed': 'False', 'direction': 'intake'})
+    for idx in range(1, 3):
+        client.hset('PSU_INFO|PSU {}'.format(idx), mapping={
+            'presence': 'True', 'status': 'True', 'temp': '55', 'temp_threshold': '100',
+            'voltage': '10', 'voltage_min_threshold': '8', 'voltage_max_threshold': '15'})
+    client.hset('LIQUID_COOLING_INFO|leakage1', mapping={'leak_status': 'No'})
+
+    config = Config()
+    config.include_devices = ['liquid_cooling']
+    config.hardware_keyspace_notifications = True
+    checker = HardwareChecker()
+    checker._snapshot = StateDbSnapshot(checker._db, HardwareChecker.SNAPSHOT_PATTERNS, client=client)
+    checker.check(config)
+    assert len(checker._info) == 12
+    assert all(info[HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+               for info in checker._info.values())
+    # Subscribe, check notifications configuration, one SCAN per table and one pipeline
+    assert client.call_count == 7
+
+    client.hset('FAN_INFO|fan3', mapping={'presence': 'False'})
+    client.delete('PSU_INFO|PSU 2')
+    checker.check(config)
+    assert client.call_count == 8
+    assert 'PSU 2' not in checker._info
+    assert checker._info['fan3'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['fan3'][HealthChecker.INFO_FIELD_OBJECT_MSG] == 'fan3 is missing'
+
+
 def test_config():
     config = Config()
     config._config_file = os.path.join(test_path, Config.CONFIG_FILE)
@@ -987,6 +1304,8 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
 
     manager = HealthCheckerManager()
     manager.config.user_defined_checkers = ['some check']
+    # Every checker is due on each check() call
+    manager.config.polling_interval = 0
     assert len(manager._checkers) == 2
 
     mock_hw_info.return_value = {
@@ -1041,6 +1360,148 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
     chassis.set_status_led.side_effect = RuntimeError()
     manager._set_system_led(chassis)
 
+class SlowChecker(HealthChecker):
+    def __init__(self, name, category='Hardware'):
+        HealthChecker.__init__(self)
+        self.name = name
+        self.category = category
+        self.run_count = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.status_ok = True
+
+    def get_category(self):
+        return self.category
+
+    def check(self, config):
+        self._info = {}
+        self.run_count += 1
+        self.release.wait()
+        if self.status_ok:
+            self.set_object_ok('Fan', self.name)
+        else:
+            self.set_object_not_ok('Fan', self.name, 'broken')
+
+    def __str__(self):
+        return self.name
+
+
+@patch('health_checker.manager.HealthCheckerManager.initialize', MagicMock())
+@patch('health_checker.config.Config.load_config', MagicMock())
+def test_manager_scheduler():
+    chassis = MagicMock()
+    manager = HealthCheckerManager()
+    fast = SlowChecker('fast')
+    slow = SlowChecker('slow', category='Services')
+    manager._checkers = [fast, slow]
+    manager.config.checker_intervals = {'fast': 0, 'slow': 3600}
+    manager.config.checker_timeouts = {'slow': 0.1}
+
+    # First run of a checker that times out reports an internal error
+    slow.release.clear()
+    stat = manager.check(chassis)
+    assert stat['Hardware']['fast']['status'] == 'OK'
+    assert stat['Internal']['slow']['status'] == 'Not OK'
+    assert manager.summary == HealthChecker.STATUS_NOT_OK
+    assert manager.get_checker_stats()['slow']['timeouts'] == '1'
+
+    # A running checker is not started again, its result is collected once it finishes
+    stat = manager.check(chassis)
+    assert slow.run_count == 1
+    slow.release.set()
+    manager._states[slow].future.result()
+    stat = manager.check(chassis)
+    assert stat['Services']['slow']['status'] == 'OK'
+    assert 'Internal' not in stat
+    assert manager.summary == HealthChecker.STATUS_OK
+    assert fast.run_count == 3
+
+    # The slow checker is not due, its result is reused
+    slow.status_ok = False
+    fast.status_ok = False
+    stat = manager.check(chassis)
+    assert slow.run_count == 1
+    assert stat['Services']['slow']['status'] == 'OK'
+    assert stat['Hardware']['fast']['status'] == 'Not OK'
+
+    # A checker that times out keeps reporting the last good result
+    fast.status_ok = True
+    manager._states[slow].last_run = None
+    slow.release.clear()
+    stat = manager.check(chassis)
+    assert stat['Services']['slow']['status'] == 'OK'
+    assert manager.summary == HealthChecker.STATUS_OK
+    # A checker which finds a problem after the timeout doesn't change the summary of the finished cycle
+    slow.release.set()
+    manager._states[slow].future.result()
+    assert manager.summary == HealthChecker.STATUS_OK
+    assert HealthChecker.summary == HealthChecker.STATUS_OK
+    stat = manager.check(chassis)
+    assert stat['Services']['slow']['status'] == 'Not OK'
+    assert manager.summary == HealthChecker.STATUS_NOT_OK
+
+    stats = manager.get_checker_stats()
+    assert stats['fast']['count'] == '6'
+    assert stats['fast']['le_inf'] == '6'
+    assert stats['slow']['count'] == '2'
+    assert stats['slow']['timeouts'] == '3'
+    manager.shutdown()
+
+
+@patch('health_checker.manager.HealthCheckerManager.initialize', MagicMock())
+@patch('health_checker.config.Config.load_config', MagicMock())
+@patch('health_checker.user_defined_checker.UserDefinedChecker.check', MagicMock())
+def test_manager_reuse_user_defined_checkers():
+    manager = HealthCheckerManager()
+    manager.config.user_defined_checkers = {'check1', 'check2'}
+    checkers = manager._get_checkers()
+    assert [str(checker) for checker in checkers] == ['UserDefinedChecker - check1', 'UserDefinedChecker - check2']
+    assert manager._get_checkers() == checkers
+
+    manager.config.user_defined_checkers = {'check2'}
+    assert manager._get_checkers() == checkers[1:]
+    assert list(manager._states) == checkers[1:]
+
+
+def test_config_checker_schedule(tmp_path):
+    config_file = tmp_path / Config.CONFIG_FILE
+    config_file.write_text(json.dumps({
+        'polling_interval': 60,
+        'checker_workers': 2,
+        'checker_intervals': {'HardwareChecker': 10, 'ServiceChecker': 60, 'UserDefinedChecker - my_check': 120},
+        'checker_timeouts': {'UserDefinedChecker': 5},
+        'hardware_keyspace_notifications': True
+    }))
+    config = Config()
+    config._config_file = str(config_file)
+    config.load_config()
+    assert config.interval == 10
+    assert config.checker_workers == 2
+    assert config.hardware_keyspace_notifications
+    assert config.get_checker_interval(HardwareChecker.__new__(HardwareChecker)) == 10
+    assert config.get_checker_interval(ServiceChecker.__new__(ServiceChecker)) == 60
+    assert config.get_checker_interval(UserDefinedChecker('my_check')) == 120
+    assert config.get_checker_interval(UserDefinedChecker('other_check')) == 60
+    assert config.get_checker_timeout(UserDefinedChecker('other_check')) == 5
+    assert config.get_checker_timeout(ServiceChecker.__new__(ServiceChecker)) == Config.DEFAULT_CHECKER_TIMEOUT
+
+    config._reset()
+    assert config.interval == Config.DEFAULT_INTERVAL
+    assert not config.checker_intervals
+    assert not config.hardware_keyspace_notifications
+
+    # Checkers without an entry keep running at the polling interval when another checker runs faster
+    config_file.write_text(json.dumps({
+        'polling_interval': 60,
+        'checker_intervals': {'HardwareChecker': 10}
+    }))
+    config.load_config()
+    assert config.interval == 10
+    assert config.get_checker_interval(HardwareChecker.__new__(HardwareChecker)) == 10
+    assert config.get_checker_interval(ServiceChecker.__new__(ServiceChecker)) == 60
+    assert config.get_checker_interval(UserDefinedChecker('my_check')) == 60
+
+
 def test_utils():
     output = utils.run_command('some invalid command')
     assert not output
@@ -1469,6 +1930,72 @@ def test_monitor_system_bus_subscribe_sets_subscription_ready_event():
     assert ready.is_set()
 
 
+def test_unit_property_cache():
+    bus = MockSystemdBus()
+    bus.add_unit('mock_bgp.service')
+    bus.add_unit('mock_oneshot.service', active_state='inactive', sub_state='dead', service_type='oneshot')
+    bus.add_unit('mock_timer.timer')
+    bus.add_unit('mock_gc.service', load_state='not-found')
+    cache = UnitPropertyCache()
+    assert not cache.is_ready()
+    cache.request('mock_gc.service')
+    cache.attach(bus, lambda func, *args: func(*args))
+    assert cache.is_ready()
+
+    # Only loaded services are loaded on attach
+    assert cache.get('mock_bgp.service') == {
+        'Id': 'mock_bgp.service',
+        'LoadState': 'loaded',
+        'UnitFileState': 'enabled',
+        'ActiveState': 'active',
+        'SubState': 'running',
+        'ConditionResult': 'yes',
+        'ConditionTimestampMonotonic': '1000',
+        'Type': 'simple',
+        'Result': 'success'
+    }
+    assert cache.get('mock_oneshot.service')['Type'] == 'oneshot'
+    assert cache.get('mock_timer.timer') is None
+    assert cache.get('mock_gc.service') is None
+
+    # Signals update the cache without D-Bus calls
+    call_count = bus.call_count
+    bus.set_properties('mock_bgp.service', ActiveState='failed', SubState='failed')
+    bus.set_properties('mock_bgp.service', interface='Service', Result='exit-code')
+    assert bus.call_count == call_count
+    assert cache.get('mock_bgp.service')['ActiveState'] == 'failed'
+    assert cache.get('mock_bgp.service')['Result'] == 'exit-code'
+
+    # Units that are not cached are loaded on request
+    cache.request('mock_gc.service')
+    assert cache.get('mock_gc.service')['LoadState'] == 'not-found'
+    cache.request('mock_timer.timer')
+    assert 'Type' not in cache.get('mock_timer.timer')
+
+    bus.units['mock_oneshot.service']['Unit']['UnitFileState'] = 'masked'
+    cache.on_reloading(False)
+    assert cache.get('mock_oneshot.service')['UnitFileState'] == 'masked'
+
+
+@patch('health_checker.sysmonitor.Sysmonitor.run_systemctl_show', MagicMock(side_effect=AssertionError('systemctl called')))
+@patch('health_checker.sysmonitor.Sysmonitor.get_app_ready_status', MagicMock(return_value=('Up', '-', '-')))
+@patch('health_checker.sysmonitor.Sysmonitor.post_unit_status', MagicMock())
+def test_get_unit_status_from_cache():
+    bus = MockSystemdBus()
+    bus.add_unit('mock_bgp.service')
+    sysmon = Sysmonitor()
+    sysmon.unit_cache.attach(bus, lambda func, *args: func(*args))
+    assert sysmon.get_unit_status('mock_bgp.service') == 'OK'
+
+    bus.set_properties('mock_bgp.service', ActiveState='inactive', SubState='dead')
+    assert sysmon.get_unit_status('mock_bgp.service') == 'NOT OK'
+
+    task = MonitorSystemBusTask(queue.Queue(), unit_cache=sysmon.unit_cache)
+    bus.units['mock_bgp.service']['Unit'].update({'ActiveState': 'active', 'SubState': 'running'})
+    task.on_job_removed(1, '/job/1', 'mock_bgp.service', 'done')
+    assert sysmon.get_unit_status('mock_bgp.service') == 'OK'
+
+
 @patch('sonic_py_common.device_info.get_device_runtime_metadata', MagicMock(return_value=device_runtime_metadata))
 def test_get_service_from_feature_table():
     sysmon = Sysmonitor()
@@ -1695,3 +2222,25 @@ def test_get_all_service_list_multi_asic(mock_config_db, mock_run, mock_docker_c
     # Global-scope services should remain
     assert 'radv.service' in result
     assert 'database.service' in result
+
+
+def test_healthd_process_checker_stats():
+    daemon = HealthDaemon()
+    daemon._db = MagicMock()
+    daemon._process_checker_stats({'ServiceChecker': {'count': '1'}, 'HardwareChecker': {'count': '2'}})
+    daemon._db.hmset.assert_any_call(daemon._db.STATE_DB, 'SYSTEM_HEALTH_CHECKER_STATS|ServiceChecker', {'count': '1'})
+    daemon._db.hmset.assert_any_call(daemon._db.STATE_DB, 'SYSTEM_HEALTH_CHECKER_STATS|HardwareChecker', {'count': '2'})
+
+    daemon._process_checker_stats({'HardwareChecker': {'count': '3'}})
+    daemon._db.delete.assert_called_once_with(daemon._db.STATE_DB, 'SYSTEM_HEALTH_CHECKER_STATS|ServiceChecker')
+
+
+def test_healthd_process_stat_summary():
+    daemon = HealthDaemon()
+    daemon._db = MagicMock()
+    daemon._clear_system_health_table = MagicMock()
+    HealthChecker.summary = HealthChecker.STATUS_OK
+    stat = {'Hardware': {'fan1': {'type': 'Fan', 'status': 'Not OK', 'message': 'broken'}}}
+    daemon._process_stat(MagicMock(), MagicMock(), stat)
+    daemon._db.set.assert_called_with(daemon._db.STATE_DB, HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, 'summary',
+                                      HealthChecker.STATUS_NOT_OK)